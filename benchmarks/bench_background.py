@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Benchmark of the latency of console updates on a large store, with
+synchronous saves and with the background flusher thread (each in its
+own process, as the storage mode is read from the environment).
+
+Usage: python3 benchmarks/bench_background.py [count] [commands] [delay ms]
+"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from timeit import default_timer
+
+
+def run(count, commands):
+    """
+    Prints the latencies of commands updates on count places, and the
+    time taken by the final flush.
+    """
+    from console import HBNBCommand
+    from models import storage
+    from models.place import Place
+
+    with storage.batch():
+        ids = [Place().id for _ in range(count)]
+    console = HBNBCommand()
+    latencies = []
+    with redirect_stdout(io.StringIO()):
+        for i in range(commands):
+            start = default_timer()
+            console.onecmd("update Place {} name {}".format(
+                ids[i % count], i))
+            latencies.append(default_timer() - start)
+    start = default_timer()
+    storage.flush()
+    latencies.sort()
+    print("{:<11} {:8.3f} ms median {:8.3f} ms max {:8.3f} ms "
+          "final flush".format(
+              "background" if storage.background else "synchronous",
+              latencies[len(latencies) // 2] * 1000,
+              latencies[-1] * 1000, (default_timer() - start) * 1000))
+
+
+if __name__ == "__main__":
+    if os.getenv("HBNB_BENCH_CHILD"):
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+                                        os.pardir))
+        os.chdir(tempfile.mkdtemp())
+        run(int(sys.argv[1]), int(sys.argv[2]))
+        sys.exit()
+    count = sys.argv[1] if len(sys.argv) > 1 else "20000"
+    commands = sys.argv[2] if len(sys.argv) > 2 else "200"
+    delay = sys.argv[3] if len(sys.argv) > 3 else "100"
+    for background in ("0", "1"):
+        environment = dict(os.environ, HBNB_BENCH_CHILD="1",
+                           HBNB_STORAGE_BACKGROUND=background,
+                           HBNB_COMMIT_DELAY_MS=delay if background == "1"
+                           else "0")
+        subprocess.run([sys.executable, os.path.abspath(__file__), count,
+                        commands], env=environment, check=True)
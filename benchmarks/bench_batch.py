@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+Benchmark of a bulk load through the console (create + update of each
+Place) saved command by command, in one batch, and with group commit.
+
+Usage: python3 benchmarks/bench_batch.py [count]
+"""
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+
+
+def load(console, count):
+    """
+    Creates and names count places through the console.
+    """
+    for i in range(count):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            console.onecmd("create Place")
+        console.onecmd('update Place {} name "Place {}"'.format(
+            output.getvalue().strip(), i))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    console = HBNBCommand()
+    for mode in ("each command", "batch", "group commit"):
+        for name in os.listdir("."):
+            os.remove(name)
+        storage.reload()
+        storage.commit_size = 1000 if mode == "group commit" else 0
+        start = default_timer()
+        if mode == "batch":
+            console.onecmd("begin")
+            load(console, count)
+            console.onecmd("commit")
+        else:
+            load(console, count)
+            storage.flush()
+        print("{:<13} {:8.3f} s".format(mode, default_timer() - start))
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""
+Benchmark of the console import and export commands on NDJSON and CSV
+files of Places.
+
+Usage: python3 benchmarks/bench_bulk.py [count]
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with open("seed.ndjson", mode="w", encoding="utf-8") as file:
+        for i in range(count):
+            file.write(json.dumps({
+                "name": "Place {}".format(i), "city_id": str(i % 100),
+                "number_rooms": i % 5, "price_by_night": i % 300,
+                "latitude": i / count, "amenity_ids": ["a", "b"]
+                }) + "\n")
+    console = HBNBCommand()
+    print("import ndjson:", end=" ")
+    console.onecmd("import Place seed.ndjson")
+    for name in ("places.ndjson", "places.csv"):
+        print("export {}:".format(name.split('.')[1]), end=" ")
+        console.onecmd("export Place " + name)
+    for obj in list(storage.all("Place").values()):
+        storage.delete(obj)
+    storage.save()
+    print("import csv:", end=" ")
+    console.onecmd("import Place places.csv")
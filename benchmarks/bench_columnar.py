@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Benchmark of the average price_by_night per city_id computed over the
+Place objects and over the columnar view, with and without NumPy.
+
+Usage: python3 benchmarks/bench_columnar.py [count]
+"""
+import os
+import sys
+import tempfile
+from timeit import default_timer
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.engine import columnar  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def objects_average():
+    """
+    Returns the average price per city computed from the objects.
+    """
+    totals = {}
+    for place in storage.all(Place).values():
+        total = totals.setdefault(place.city_id, [0, 0])
+        total[0] += place.price_by_night
+        total[1] += 1
+    return {city: total / count for city, (total, count) in totals.items()}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    for i in range(count):
+        place = Place()
+        place.city_id = "city-{}".format(i % 1000)
+        place.price_by_night = i % 300
+
+    start = default_timer()
+    objects_average()
+    print("objects          {:8.3f} s".format(default_timer() - start))
+    start = default_timer()
+    view = storage.columnar(Place)
+    print("build view       {:8.3f} s".format(default_timer() - start))
+    for numpy in (columnar.numpy, None):
+        with patch.object(columnar, "numpy", numpy):
+            start = default_timer()
+            view.aggregate("avg", "price_by_night", by="city_id")
+            print("view {:<11} {:8.3f} s".format(
+                "numpy" if numpy is not None else "python",
+                default_timer() - start))
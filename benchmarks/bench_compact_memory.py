@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark of the memory used by Place instances with and without
+compact models (HBNB_COMPACT_MODELS), each measured in a new process.
+
+Usage: python3 benchmarks/bench_compact_memory.py [count]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+
+def measure(count):
+    """
+    Builds and saves count Places with a few attributes set, then prints
+    the memory held per Place (storage included), the size of one
+    instance and the peak RSS of the process.
+    """
+    from models import storage
+    from models.place import Place
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        place = Place()
+        place.name = "Place {}".format(i)
+        place.city_id = "city"
+        place.number_rooms = i % 5
+    storage.save()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    size = sys.getsizeof(place)
+    if type(place).__dictoffset__:
+        size += sys.getsizeof(vars(place))
+    print("{:<8} {:5.0f} bytes per Place, {:4} per instance, "
+          "peak RSS {:6.1f} MiB".format(
+              "compact" if os.getenv("HBNB_COMPACT_MODELS") == "1"
+              else "dict",
+              used / count, size,
+              resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if os.getenv("HBNB_BENCH_CHILD"):
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+                                        os.pardir))
+        os.chdir(tempfile.mkdtemp())
+        measure(count)
+        sys.exit()
+    for compact in ("0", "1"):
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), str(count)],
+            env=dict(os.environ, HBNB_BENCH_CHILD="1",
+                     HBNB_COMPACT_MODELS=compact),
+            check=True)
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage.save() latency at each durability level, for
+whole file saves and for journal appends.
+
+Usage: python3 benchmarks/bench_durability.py [count] [saves]
+"""
+import os
+import sys
+import tempfile
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    users = [User() for _ in range(count)]
+    storage.save()
+    for journal in (False, True):
+        storage.journal = journal
+        storage.compact_threshold = saves + 1
+        for level in storage.durability_levels:
+            storage.durability = level
+            storage.compact()
+            start = default_timer()
+            for i in range(saves):
+                users[i % count].first_name = str(i)
+                storage.save()
+            print("{:<8} {:<6} {:8.3f} ms per save".format(
+                "journal" if journal else "file", level,
+                (default_timer() - start) * 1000 / saves))
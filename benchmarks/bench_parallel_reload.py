@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage.reload() with shard files decoded by 1 to N
+worker processes.
+
+Usage: python3 benchmarks/bench_parallel_reload.py [count] [max workers]
+"""
+import os
+import sys
+import tempfile
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    storage.shards = 8
+    storage.lazy = True
+    for i in range(count):
+        (Place, Review, User)[i % 3]()
+    storage.save()
+    print("{} objects in {} shard files, {} CPUs".format(
+        count, len(os.listdir(storage.shard_dir)), os.cpu_count()))
+
+    workers = 1
+    while workers <= max_workers:
+        storage.workers = workers
+        start = default_timer()
+        storage.reload()
+        print("{:>3} workers {:8.3f} s".format(
+            workers, default_timer() - start))
+        workers *= 2
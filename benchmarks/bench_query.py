@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Benchmark of console queries on many places against printing them all
+with the all command.
+
+Usage: python3 benchmarks/bench_query.py [count]
+"""
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with storage.batch():
+        for i in range(count):
+            place = Place()
+            place.city_id = "city-{}".format(i % 1000)
+            place.price_by_night = i % 500
+    console = HBNBCommand()
+    for line in (
+            "all Place",
+            'Place.where(city_id == "city-7")',
+            "Place.where(price_by_night > 250).limit(10)",
+            'Place.where(city_id == "city-7").order_by(-price_by_night)'
+            '.limit(10).select(price_by_night)',
+            "Place.order_by(-price_by_night).limit(10)"):
+        output = io.StringIO()
+        start = default_timer()
+        with redirect_stdout(output):
+            console.onecmd(line)
+        print("{:8.3f} s {:>10} bytes  {}".format(
+            default_timer() - start, len(output.getvalue()), line))
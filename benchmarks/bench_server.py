@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark of the network server: clients connected at once each create
+and show Places, and the commands per second are reported. The server
+runs in its own process on a Unix socket.
+
+Usage: python3 benchmarks/bench_server.py [places per run]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+PROMPT = b"(hbnb) "
+
+
+async def client(path, count):
+    """
+    Creates then shows count places over one connection.
+    """
+    reader, writer = await asyncio.open_unix_connection(path)
+    await reader.readuntil(PROMPT)
+    for _ in range(count):
+        writer.write(b"create Place\n")
+        place_id = (await reader.readuntil(PROMPT))[:-len(PROMPT)].strip()
+        writer.write(b"show Place " + place_id + b"\n")
+        await reader.readuntil(PROMPT)
+    writer.close()
+
+
+async def run(path, clients, count):
+    """
+    Runs clients clients at once and returns the seconds they took.
+    """
+    start = default_timer()
+    await asyncio.gather(*(client(path, count) for _ in range(clients)))
+    return default_timer() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    os.chdir(tempfile.mkdtemp())
+    path = os.path.abspath("hbnb.sock")
+    server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server.py"), "--unix", path],
+            stdout=subprocess.PIPE)
+    try:
+        server.stdout.readline()
+        for clients in (1, 10, 100):
+            seconds = asyncio.run(run(path, clients, count // clients))
+            commands = 2 * clients * (count // clients)
+            print("{:>3} clients {:8.3f} s {:9.0f} commands/s".format(
+                clients, seconds, commands / seconds))
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Stress benchmark of a threadsafe FileStorage shared by 1, 4 and 16
+threads. Each operation looks up a random Place, finds the Places of a
+random city, and one in writes creates a Place; one in saves also saves
+the storage. The operations per second of all the threads are reported.
+
+Usage: python3 benchmarks/bench_threads.py [places] [operations]
+                                           [writes] [saves]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+os.environ["HBNB_STORAGE_THREADSAFE"] = "1"
+
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def work(ids, operations, writes, saves):
+    """
+    Runs operations operations on the storage.
+    """
+    for i in range(operations):
+        storage.get(Place, random.choice(ids))
+        storage.find(Place, city_id="city-{}".format(random.randrange(100)))
+        if i % writes == 0:
+            place = Place()
+            place.city_id = "city-{}".format(random.randrange(100))
+            if i % saves == 0:
+                place.save()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 32000
+    writes = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    saves = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+    with storage.batch():
+        ids = []
+        for i in range(count):
+            place = Place()
+            place.city_id = "city-{}".format(i % 100)
+            ids.append(place.id)
+    for threads in (1, 4, 16):
+        workers = [
+            threading.Thread(target=work,
+                             args=(ids, operations // threads, writes, saves))
+            for _ in range(threads)
+            ]
+        start = default_timer()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        seconds = default_timer() - start
+        print("{:>2} threads {:8.3f} s {:9.0f} operations/s".format(
+            threads, seconds, operations / seconds))
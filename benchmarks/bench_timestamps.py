@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Micro-benchmark of the created_at/updated_at codec.
+
+Measures, per 100k objects, the time spent decoding timestamps with
+datetime.strptime (the previous implementation) and with
+models.engine.timestamps, then a full FileStorage save and reload.
+
+Usage: python3 benchmarks/bench_timestamps.py [count]
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+from timeit import default_timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.base_model import BaseModel  # noqa: E402
+from models.engine.timestamps import parse_datetime  # noqa: E402
+
+
+def timed(label, function, count):
+    """
+    Runs function once and prints its duration scaled to 100k objects.
+    """
+    start = default_timer()
+    function()
+    elapsed = default_timer() - start
+    print("{:<28} {:8.3f} s / 100k".format(label, elapsed * 100000 / count))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    stamps = [datetime.now().isoformat() for _ in range(count)]
+
+    timed("decode with strptime", lambda: [
+        datetime.strptime(stamp, '%Y-%m-%dT%H:%M:%S.%f') for stamp in stamps
+        ], count)
+    timed("decode with parse_datetime",
+          lambda: [parse_datetime(stamp) for stamp in stamps], count)
+
+    for _ in range(count):
+        BaseModel()
+    timed("FileStorage.save()", storage.save, count)
+    timed("FileStorage.reload()", storage.reload, count)
@@ -2,8 +2,13 @@
 """
 Command interpreter module
 """
+import ast
 import cmd
-from shlex import split
+import heapq
+import json
+import re
+from shlex import quote, split
+from timeit import default_timer
 from models.base_model import BaseModel
 from models.user import User
 from models.place import Place
@@ -12,6 +17,9 @@ from models.city import City
 from models.amenity import Amenity
 from models.review import Review
 from models import storage
+from models.engine import bulk
+from models.engine.columnar import FUNCTIONS, OPERATORS
+from models.engine.query import PARTS, parse_query
 
 
 class HBNBCommand(cmd.Cmd):
@@ -24,6 +32,14 @@ class HBNBCommand(cmd.Cmd):
     Methods:
     - do_quit(arg): Implements the 'quit' command to exit the program.
     - do_EOF(arg): Implements the 'EOF' command to exit the program.
+    - do_begin(arg): Starts a batch: changes are kept in memory until commit.
+    - do_commit(arg): Ends the batch and saves its changes at once.
+    - do_import(arg): Creates instances from the rows of an NDJSON or CSV
+      file.
+    - do_export(arg): Writes all instances of a class to an NDJSON or CSV
+      file.
+    - do_stats(arg): Prints a count, sum, average, minimum or maximum over
+      the instances of a class, optionally filtered and grouped.
     - emptyline(): Does nothing on an empty line.
     - do_create(arg): Creates a new instance of BaseModel or User, saves
       it (to the JSON file) and prints the id.
@@ -34,7 +50,7 @@ class HBNBCommand(cmd.Cmd):
     - do_all(arg): Prints all string representation of all instances based or
       not on the class name.
     - do_update(arg): Updates an instance based on the class name and id by
-      adding or updating attribute (save the change into the JSON file).
+      adding or updating attributes (save the change into the JSON file).
     """
 
     prompt = "(hbnb) "
@@ -53,6 +69,7 @@ class HBNBCommand(cmd.Cmd):
         Quit command to exit the program
         """
         if arg.strip() == "":
+            storage.flush()
             return True
         print("** Invalid command for quit. Type 'quit' to exit.")
         return False
@@ -62,8 +79,28 @@ class HBNBCommand(cmd.Cmd):
         EOF command to exit the program
         """
         print()
+        storage.flush()
         return True
 
+    def do_begin(self, _):
+        """
+        Starts a batch: the changes of the following commands are only
+        saved (at once) by commit.
+        """
+        if storage.batching:
+            print("** batch already started **")
+            return
+        storage.begin()
+
+    def do_commit(self, _):
+        """
+        Ends the batch started by begin and saves its changes.
+        """
+        if not storage.batching:
+            print("** no batch started **")
+            return
+        storage.commit()
+
     def emptyline(self):
         """
         Do nothing on empty line
@@ -109,13 +146,9 @@ class HBNBCommand(cmd.Cmd):
             instance_id = args[1]
 
             if class_name in HBNBCommand.class_mapping:
-                class_type = HBNBCommand.class_mapping[class_name]
-                instance_objects = [
-                    obj for obj in storage.all().values()
-                    if isinstance(obj, class_type) and obj.id == instance_id
-                    ]
-                if instance_objects:
-                    print(instance_objects[0])
+                obj = storage.get(class_name, instance_id)
+                if obj:
+                    print(obj)
                 else:
                     print("** no instance found **")
             else:
@@ -141,12 +174,11 @@ class HBNBCommand(cmd.Cmd):
                 return
 
             instance_id = args[1]
-            key = "{}.{}".format(class_name, instance_id)
-            obj = storage.all().get(key)
+            obj = storage.get(class_name, instance_id)
             if not obj:
                 print("** no instance found **")
                 return
-            del storage.all()[key]
+            storage.delete(obj)
             storage.save()
         except Exception as e:
             print("** {}".format(e))
@@ -154,62 +186,294 @@ class HBNBCommand(cmd.Cmd):
     def do_all(self, arg):
         """
         Prints all string representation of all instances based or
-        not on the class name
+        not on the class name, as a list, or as one JSON object per line
+        with --format ndjson. The instances are printed one at a time.
+
+        Usage: all [<class name>] [--limit N [--page N]] [--cursor KEY]
+                   [--format list|ndjson]
+
+        With --limit or --cursor, the instances are printed in the order
+        of their keys (<class name>.<id>), from the one after KEY; when
+        some are left, the cursor to continue from is printed last.
         """
-        args = split(arg)
-        obj_list = []
-        if not args or args[0] == "":
-            for obj in storage.all().values():
-                obj_list.append(str(obj))
-            print(obj_list)
+        options = {"limit": None, "page": "1", "cursor": None,
+                   "format": "list"}
+        names = []
+        words = iter(split(arg))
+        for word in words:
+            if not word.startswith("--"):
+                names.append(word)
+                continue
+            name, equal, value = word[2:].partition("=")
+            if name not in options:
+                print("** unknown option --{} **".format(name))
+                return
+            options[name] = value if equal else next(words, None)
+            if options[name] is None:
+                print("** --{} needs a value **".format(name))
+                return
+        if options["format"] not in ("list", "ndjson"):
+            print("** unknown format (use list or ndjson) **")
             return
         try:
-            class_name = args[0]
-            for obj in storage.all().values():
-                if class_name == obj.__class__.__name__:
-                    obj_list.append(str(obj))
-            if not obj_list:
+            limit = options["limit"]
+            limit = int(limit) if limit is not None else None
+            page = int(options["page"])
+            if (limit is not None and limit < 0) or page < 1:
+                raise ValueError
+        except ValueError:
+            print("** --limit and --page need whole numbers **")
+            return
+        if page > 1 and limit is None:
+            print("** --page needs --limit **")
+            return
+        try:
+            if not names:
+                objects = storage.all()
+            elif names[0] in HBNBCommand.class_mapping:
+                objects = storage.all(names[0])
+            else:
                 print("** class doesn't exist **")
                 return
-            print(obj_list)
+            cursor = None
+            if limit is None and options["cursor"] is None:
+                rows = objects.values()
+            else:
+                keys = (key for key in objects
+                        if options["cursor"] is None or
+                        key > options["cursor"])
+                if limit is None:
+                    keys = sorted(keys)
+                else:
+                    skip = (page - 1) * limit
+                    keys = heapq.nsmallest(skip + limit + 1, keys)[skip:]
+                    if len(keys) > limit:
+                        keys = keys[:limit]
+                        cursor = keys[-1] if keys else None
+                rows = (objects[key] for key in keys)
+            self._print_all(rows, options["format"], cursor)
         except Exception as e:
             print("** {}".format(e))
 
+    def _print_all(self, rows, output_format, cursor=None):
+        """
+        Prints the objects of rows one at a time: as the list of their
+        string representations, or one JSON object per line for ndjson.
+        The cursor is printed last if given.
+        """
+        if output_format == "ndjson":
+            for obj in rows:
+                print(json.dumps(obj.to_dict()))
+            if cursor is not None:
+                print(json.dumps({"next_cursor": cursor}))
+            return
+        separator = ""
+        print("[", end="")
+        for obj in rows:
+            print(separator + repr(str(obj)), end="")
+            separator = ", "
+        print("]")
+        if cursor is not None:
+            print("** next cursor: {} **".format(cursor))
+
     def do_update(self, arg):
         """
         Updates an instance based on the class name and id by adding
-        or updating attribute (save the change into the JSON file).
+        or updating attributes (save the change into the JSON file).
+        Several attributes can be given, as name value pairs or as a
+        dictionary; they are all set, then saved once. Values of the
+        attributes declared by the class are converted to their type
+        (e.g. number_rooms to an int), and nothing is changed if one of
+        them cannot be, or if the last attribute has no value.
+
+        Usage:
+            update <class name> <id> <attribute> <value> [<attribute>
+                   <value> ...]
+            update <class name> <id> <dictionary>
         """
+        parts = arg.split(None, 2)
+        if len(parts) == 3 and parts[2].startswith("{"):
+            try:
+                attributes = ast.literal_eval(parts[2])
+            except (ValueError, SyntaxError):
+                attributes = None
+            if not isinstance(attributes, dict):
+                print("** invalid dictionary **")
+                return
+            self._update(parts[:2], list(attributes.items()))
+            return
         args = split(arg)
+        self._update(args[:2], list(zip(args[2::2], args[3::2])),
+                     len(args) % 2)
+
+    def _update(self, args, pairs, value_missing=False):
+        """
+        Sets the (attribute, value) pairs on the instance of class name
+        and id args and saves it once, printing what is wrong instead if
+        anything is.
+        """
         if not args or args[0] == "":
             print("** class name missing **")
             return
+        if args[0] not in HBNBCommand.class_mapping:
+            print("** class doesn't exist **")
+            return
+        if len(args) < 2:
+            print("** instance id missing **")
+            return
         try:
-            class_name = args[0]
-
-            if len(args) < 2:
-                print("** instance id missing **")
-                return
-
-            instance_id = args[1]
-            key = "{}.{}".format(class_name, instance_id)
-            obj = storage.all().get(key)
+            obj = storage.get(args[0], args[1])
             if not obj:
                 print("** no instance found **")
                 return
-            if len(args) < 3:
+            if not pairs and not value_missing:
                 print("** attribute name missing **")
                 return
-            attribute_name = args[2]
-            if len(args) < 4:
+            if value_missing:
                 print("** value missing **")
                 return
-            value = args[3]
-            setattr(obj, attribute_name, value)
+            values = [(str(name), obj.coerce(str(name), value))
+                      for name, value in pairs]
+            for name, value in values:
+                setattr(obj, name, value)
             obj.save()
         except Exception as e:
             print("** {}".format(e))
 
+    def _transfer_args(self, arg):
+        """
+        Returns the (class, path, format) of the import and export
+        arguments, or None after printing what is wrong with them.
+        """
+        args = split(arg)
+        if not args:
+            print("** class name missing **")
+            return None
+        class_type = HBNBCommand.class_mapping.get(args[0])
+        if not class_type:
+            print("** class doesn't exist **")
+            return None
+        if len(args) < 2:
+            print("** file name missing **")
+            return None
+        file_format = args[2] if len(args) > 2 else bulk.detect_format(args[1])
+        if file_format not in bulk.FORMATS:
+            print("** unknown format (use {}) **".format(
+                " or ".join(bulk.FORMATS)))
+            return None
+        return class_type, args[1], file_format
+
+    def do_import(self, arg):
+        """
+        Creates instances of a class from the rows of an NDJSON (one JSON
+        object per line) or CSV file, saved in batches, and prints the
+        number of rows imported per second. Declared attributes are
+        checked against their type.
+
+        Usage:
+            import <class name> <file> [ndjson|csv]
+        """
+        args = self._transfer_args(arg)
+        if not args:
+            return
+        class_type, path, file_format = args
+        start = default_timer()
+        try:
+            with open(path, encoding="utf-8", newline="") as file:
+                count = bulk.import_objects(
+                        storage, class_type, file, file_format)
+        except Exception as e:
+            print("** {}".format(e))
+            return
+        self._report(count, default_timer() - start)
+
+    def do_export(self, arg):
+        """
+        Writes all instances of a class to an NDJSON or CSV file, one row
+        per instance, and prints the number of rows exported per second.
+
+        Usage:
+            export <class name> <file> [ndjson|csv]
+        """
+        args = self._transfer_args(arg)
+        if not args:
+            return
+        class_type, path, file_format = args
+        start = default_timer()
+        try:
+            with open(path, mode="w", encoding="utf-8", newline="") as file:
+                count = bulk.export_objects(
+                        storage, class_type, file, file_format)
+        except Exception as e:
+            print("** {}".format(e))
+            return
+        self._report(count, default_timer() - start)
+
+    def _report(self, count, seconds):
+        """
+        Prints the number of rows transferred and their rate.
+        """
+        print("{} rows in {:.2f} s ({:.0f} rows/s)".format(
+            count, seconds, count / seconds if seconds else count))
+
+    def do_stats(self, arg):
+        """
+        Prints the count, sum, avg, min or max of a number attribute over
+        the instances of a class, computed on its columnar view. With by,
+        prints one "<value>: <result>" line per value of a string
+        attribute. Conditions compare attributes with ==, !=, <, <=, >
+        or >=.
+
+        Usage:
+            stats <class name> count [by <attribute>] [where <condition>]
+            stats <class name> <function> <attribute> [by <attribute>]
+                  [where <attribute> <operator> <value> ...]
+
+        Examples:
+            stats Place avg price_by_night by city_id
+            stats Review count by place_id
+            stats Place max price_by_night where number_rooms >= 2
+        """
+        args = split(arg)
+        if not args:
+            print("** class name missing **")
+            return
+        if args[0] not in HBNBCommand.class_mapping:
+            print("** class doesn't exist **")
+            return
+        if len(args) < 2 or args[1] not in FUNCTIONS:
+            print("** function missing (use {}) **".format(
+                ", ".join(FUNCTIONS)))
+            return
+        class_name, function, args = args[0], args[1], args[2:]
+        field = None
+        if args and args[0] not in ("by", "where"):
+            field = args.pop(0)
+        by = None
+        if args[:1] == ["by"] and len(args) > 1:
+            by = args[1]
+            args = args[2:]
+        where = []
+        if args[:1] == ["where"]:
+            args = args[1:]
+            while len(args) >= 3 and args[1] in OPERATORS:
+                where.append(tuple(args[:3]))
+                args = args[3:]
+        if args:
+            print("** invalid syntax near: {} **".format(" ".join(args)))
+            return
+        try:
+            result = storage.columnar(class_name).aggregate(
+                    function, field, by, where)
+        except Exception as e:
+            print("** {}".format(e))
+            return
+        if by is None:
+            print(result)
+            return
+        for value in sorted(result):
+            print("{}: {}".format(value, result[value]))
+
     def do_count(self, arg):
         """
         Retrieves the number of instances of a class.
@@ -227,9 +491,7 @@ class HBNBCommand(cmd.Cmd):
             if not class_type:
                 print("** class doesn't exist **")
                 return
-            count = sum(1 for obj in storage.all().values()
-                        if isinstance(obj, class_type))
-            print(count)
+            print(storage.count(class_type))
         except Exception as e:
             print("** {}".format(e))
 
@@ -257,8 +519,14 @@ class HBNBCommand(cmd.Cmd):
             create - Create a new instance and save it to the JSON file
             show   - Display the string representation of an instance
             destroy - Delete an instance based on the class name and id
-            all    - Display string representations of all instances
+            all    - Display string representations of all instances, by
+                     page with --limit and --cursor, or as NDJSON
             update - Update an instance based on the class name and id
+            begin  - Start a batch of changes saved by commit
+            commit - Save the changes of the batch
+            import - Create instances from an NDJSON or CSV file
+            export - Write the instances of a class to an NDJSON or CSV file
+            stats  - Aggregate an attribute over the instances of a class
 
         """
         if not arg:
@@ -279,53 +547,98 @@ class HBNBCommand(cmd.Cmd):
 
     def default(self, line):
         """
-        Handles calss name followed by an argument.
-        eg: <class_name>.all()
+        Handles class name followed by a method call.
+        eg: <class_name>.all(), <class_name>.show("<id>"),
+            <class_name>.update("<id>", "<name>", <value>, ...),
+            <class_name>.update("<id>", {"<name>": <value>, ...})
+
+        The arguments are Python literals, so quoted strings may hold
+        commas, dots or parentheses; bare words (e.g. an id, a name or a
+        value without quotes) are taken as strings.
+
+        Queries chain where(), select(), order_by() and limit() (see
+        models.engine.query), e.g.
+            <class_name>.where(<name> >= <value>).order_by(-<name>).limit(5)
         """
-        args = line.split('.')
-        class_arg = args[0]
-        if len(args) == 1:
+        head = re.match(r"\s*\w+\.(\w+)\(", line)
+        if head and head.group(1) in PARTS:
+            self._query(line)
+            return
+        match = re.fullmatch(r"\s*(\w+)\.(\w+)\((.*)\)\s*", line, re.DOTALL)
+        if not match:
             print("*** Unknown syntax: {}".format(line))
             return
+        class_arg, command, text = match.groups()
         try:
-            args = args[1].split("(")
-            command = args[0]
-            if command == "all":
-                HBNBCommand.do_all(self, class_arg)
-            elif command == "count":
-                HBNBCommand.do_count(self, class_arg)
-            elif command == "show":
-                args = args[1].split(')')
-                id_arg = args[0]
-                id_arg = id_arg.strip("'")
-                id_arg = id_arg.strip('"')
-                arg = class_arg + ' ' + id_arg
-                HBNBCommand.do_show(self, arg)
-            elif command == "destroy":
-                args = args[1].split(')')
-                id_arg = args[0]
-                id_arg = id_arg.strip('"')
-                id_arg = id_arg.strip("'")
-                arg = class_arg + ' ' + id_arg
-                HBNBCommand.do_destroy(self, arg)
-            elif command == 'update':
-                args = args[1].split(',')
-                id_arg = args[0].strip("'")
-                id_arg = id_arg.strip('"')
-                name_arg = args[1].strip(',')
-                val_arg = args[2]
-                name_arg = name_arg.strip(' ')
-                name_arg = name_arg.strip("'")
-                name_arg = name_arg.strip('"')
-                val_arg = val_arg.strip(' ')
-                val_arg = val_arg.strip(')')
-                arg = class_arg + ' ' + id_arg + ' ' + name_arg + ' ' + val_arg
-                HBNBCommand.do_update(self, arg)
+            args = self._arguments(text)
+        except ValueError:
+            print("*** Unknown syntax: {}".format(line))
+            return
+
+        if command in ("all", "count") and not args:
+            getattr(self, "do_" + command)(class_arg)
+        elif command in ("show", "destroy") and len(args) <= 1:
+            getattr(self, "do_" + command)(
+                    " ".join([class_arg] + [quote(str(arg)) for arg in args]))
+        elif command == "update":
+            ids = [class_arg] + [str(arg) for arg in args[:1]]
+            if len(args) == 2 and isinstance(args[1], dict):
+                self._update(ids, list(args[1].items()))
             else:
-                print("*** Unknown syntax: {}".format(line))
-        except IndexError:
+                self._update(ids, list(zip(args[1::2], args[2::2])),
+                             len(args) > 1 and len(args) % 2 == 0)
+        else:
             print("*** Unknown syntax: {}".format(line))
 
+    def _arguments(self, text):
+        """
+        Returns the tuple of the comma separated arguments of text: Python
+        literals, or bare words taken as strings. Commas inside quotes or
+        brackets do not separate arguments.
+
+        Raises:
+            ValueError: If an argument is neither.
+        """
+        pieces = []
+        depth = start = 0
+        for token in re.finditer(
+                r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|[][(){},]", text):
+            if token.group() in ("(", "[", "{"):
+                depth += 1
+            elif token.group() in (")", "]", "}"):
+                depth -= 1
+            elif token.group() == "," and not depth:
+                pieces.append(text[start:token.start()])
+                start = token.end()
+        pieces.append(text[start:])
+        if len(pieces) == 1 and not pieces[0].strip():
+            return ()
+        args = []
+        for piece in pieces:
+            piece = piece.strip()
+            try:
+                args.append(ast.literal_eval(piece))
+            except (ValueError, SyntaxError):
+                if not re.fullmatch(r"[^'\"()\[\]{}]+", piece):
+                    raise ValueError(piece) from None
+                args.append(piece)
+        return tuple(args)
+
+    def _query(self, line):
+        """
+        Prints the instances matching the query line, one per line.
+        """
+        try:
+            query = parse_query(line)
+            class_type = HBNBCommand.class_mapping.get(query.class_name)
+            if class_type is None:
+                print("** class doesn't exist **")
+                return
+            for obj in query.run(storage, class_type):
+                print(query.format(obj))
+        except ValueError as e:
+            print("** {}".format(e))
+
 
 if __name__ == '__main__':
     HBNBCommand().cmdloop()
@@ -2,8 +2,26 @@
 """
 models package initializer
 """
-from models.engine.file_storage import FileStorage
+from os import getenv
 
+compact_models = getenv("HBNB_COMPACT_MODELS") == "1"
 
-storage = FileStorage()
+if getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage(getenv("HBNB_DB_PATH", "hbnb.db"))
+else:
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage(
+            journal=getenv("HBNB_STORAGE_JOURNAL") == "1",
+            compact_threshold=int(getenv("HBNB_JOURNAL_THRESHOLD", "1000")),
+            lazy=getenv("HBNB_STORAGE_LAZY") == "1",
+            codec=getenv("HBNB_STORAGE_FORMAT", "json"),
+            shards=int(getenv("HBNB_STORAGE_SHARDS", "0")),
+            workers=int(getenv("HBNB_RELOAD_WORKERS", "1")),
+            durability=getenv("HBNB_STORAGE_DURABILITY", "flush"),
+            commit_delay=int(getenv("HBNB_COMMIT_DELAY_MS", "0")) / 1000,
+            commit_size=int(getenv("HBNB_COMMIT_SIZE", "0")),
+            threadsafe=getenv("HBNB_STORAGE_THREADSAFE") == "1",
+            background=getenv("HBNB_STORAGE_BACKGROUND") == "1"
+            )
 storage.reload()
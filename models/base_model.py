@@ -5,13 +5,19 @@ The module that defines BaseModel class
 from uuid import uuid4
 from datetime import datetime
 from models import storage
+from models.compact import ModelType
+from models.engine.timestamps import parse_datetime, format_datetime
 
 
-class BaseModel:
+class BaseModel(metaclass=ModelType):
     """
     The BaseModel class defines all common attributes/methods
     for other classes
 
+    The attributes declared by the subclasses (as class attributes) are
+    stored in __slots__ when compact models are enabled; see
+    models.compact.
+
 
     Public instance attributes:
         id (str): A unique identifier for the instance.
@@ -20,10 +26,17 @@ class BaseModel:
 
     Methods:
         __int__(self, *args, **kwargs): The class constructor.
+        __setattr__(self, name, value): Sets an attribute and marks the
+                        instance as changed in storage
         save(self): Updates public instance "updated_at" with current time
         to_dict(self): Returns the dictionary representation the Class with
                         class name included
         __str__: Returns the string representation of BaseModel instance
+        declared_fields(cls): Returns the declared attributes and their
+                        defaults
+        field_types(cls): Returns the types of the declared attributes
+        coerce(cls, name, value): Converts value to the type of the
+                        declared attribute name
     """
 
     def __init__(self, *args, **kwargs):
@@ -34,24 +47,32 @@ class BaseModel:
         *args: Not used
         **kwargs: Dictionary representation of the instance
         """
+        # The instance is not in storage yet: set the attributes without
+        # marking it as changed
+        set_attribute = super().__setattr__
         if kwargs:
             for key, value in kwargs.items():
                 if key == '__class__':
                     continue
                 if key in ('created_at', 'updated_at') and\
                         isinstance(value, str):
-                    setattr(
-                            self, key,
-                            datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
-                            )
+                    set_attribute(key, parse_datetime(value))
                 else:
-                    setattr(self, key, value)
+                    set_attribute(key, value)
         else:
-            self.id = str(uuid4())
-            self.created_at = datetime.now()
-            self.updated_at = datetime.now()
+            set_attribute('id', str(uuid4()))
+            set_attribute('created_at', datetime.now())
+            set_attribute('updated_at', datetime.now())
             storage.new(self)
 
+    def __setattr__(self, name, value):
+        """
+        Sets the attribute and marks the instance as changed so that
+        storage re-serializes it on the next save
+        """
+        super().__setattr__(name, value)
+        storage.touch(self, name)
+
     def save(self):
         """
         Update public instance updated_at with current time
@@ -66,8 +87,8 @@ class BaseModel:
         """
         my_dict = self.__dict__.copy()
         my_dict['__class__'] = self.__class__.__name__
-        my_dict['created_at'] = self.created_at.isoformat()
-        my_dict['updated_at'] = self.updated_at.isoformat()
+        my_dict['created_at'] = format_datetime(self.created_at)
+        my_dict['updated_at'] = format_datetime(self.updated_at)
         return my_dict
 
     def __str__(self):
@@ -76,3 +97,37 @@ class BaseModel:
         """
         class_name = self.__class__.__name__
         return f"[{class_name}] ({self.id}) {self.__dict__}"
+
+    @classmethod
+    def declared_fields(cls):
+        """
+        Returns a new {name: default} dictionary of the attributes
+        declared on the class and its bases
+        """
+        return dict(cls._defaults)
+
+    @classmethod
+    def field_types(cls):
+        """
+        Returns a new {name: type} dictionary of the declared attributes,
+        the type of each being that of its default value
+        """
+        return dict(cls._types)
+
+    @classmethod
+    def coerce(cls, name, value):
+        """
+        Returns value converted to the type of the declared attribute
+        name with the coercer of the class (see models.schema); values of
+        other attributes are returned as is
+
+        Raises:
+            ValueError: If value cannot be converted
+        """
+        coercer = cls._coercers.get(name)
+        if coercer is None:
+            return value
+        try:
+            return coercer(value)
+        except ValueError as error:
+            raise ValueError("{}: {}".format(name, error)) from None
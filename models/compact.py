@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+module that defines the ModelType metaclass and the compact model layout
+
+Every model class records the attributes it declares (with their class
+attribute defaults) in _defaults, and their types and coercers (see
+models.schema) in _types and _coercers. When models.compact_models is set
+(HBNB_COMPACT_MODELS=1), the declared attributes become __slots__
+instead: instances have no __dict__, unset attributes read as their
+default, and the attributes that are not declared (e.g. set by the
+console update command) are kept in a small _extras dictionary created
+on first use.
+"""
+import models
+from models import schema
+
+
+class CompactModel:
+    """
+    Base class added to the models in compact mode.
+
+    Attributes:
+        _defaults (dict): Declared attribute name -> default value.
+        _slot_names (dict): The slot attribute names, in order.
+        _extras (dict): The attributes that are not declared, if any.
+
+    Methods:
+        __getattr__(self, name): Returns an unset or undeclared attribute.
+        __setattr__(self, name, value): Sets a slot or an extra attribute.
+        __delattr__(self, name): Removes a slot or an extra attribute.
+        __dict__: The attributes set on the instance, as a new dictionary.
+    """
+    __slots__ = ("id", "created_at", "updated_at", "_extras")
+    _slot_names = dict.fromkeys(("id", "created_at", "updated_at"))
+
+    def __getattr__(self, name):
+        """
+        Returns the extra attribute name, or the default of the declared
+        attribute name when it was not set on the instance.
+        """
+        if name != "_extras":
+            if name in self._defaults:
+                return self._defaults[name]
+            try:
+                return self._extras[name]
+            except (AttributeError, KeyError):
+                pass
+        raise AttributeError("{!r} object has no attribute {!r}".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """
+        Sets the slot name, or the extra attribute name if it is not a
+        declared attribute.
+        """
+        if name in self._slot_names:
+            object.__setattr__(self, name, value)
+            return
+        try:
+            self._extras[name] = value
+        except AttributeError:
+            object.__setattr__(self, "_extras", {name: value})
+
+    def __delattr__(self, name):
+        """
+        Removes the slot or the extra attribute name.
+        """
+        if name in self._slot_names:
+            object.__delattr__(self, name)
+            return
+        try:
+            del self._extras[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name) from None
+
+    @property
+    def __dict__(self):
+        """
+        A new dictionary of the attributes set on the instance: the slots
+        that are set, then the extra attributes. Changing it does not
+        change the instance.
+        """
+        obj_dict = {}
+        for name in self._slot_names:
+            try:
+                obj_dict[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+        try:
+            obj_dict.update(object.__getattribute__(self, "_extras"))
+        except AttributeError:
+            pass
+        return obj_dict
+
+
+class ModelType(type):
+    """
+    Metaclass of the models, recording their declared attributes with
+    their types and coercers (see models.schema) and making them compact
+    when models.compact_models is set.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        """
+        Creates the model class name. Its declared attributes are the
+        public class attributes of namespace that are not methods,
+        properties or other descriptors.
+        """
+        declared = {
+            key: value for key, value in namespace.items()
+            if not key.startswith('_') and not callable(value)
+            and not hasattr(value, '__get__')
+            }
+        defaults = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, "_defaults", {}))
+        defaults.update(declared)
+        namespace["_defaults"] = defaults
+        namespace["_types"] = schema.field_types(defaults)
+        namespace["_coercers"] = schema.coercer_table(defaults)
+
+        if models.compact_models:
+            for key in declared:
+                del namespace[key]
+            if not any(issubclass(base, CompactModel) for base in bases):
+                bases += (CompactModel,)
+            namespace["__slots__"] = tuple(declared)
+            slot_names = {}
+            for base in reversed(bases):
+                slot_names.update(getattr(base, "_slot_names", {}))
+            slot_names.update(dict.fromkeys(declared))
+            namespace["_slot_names"] = slot_names
+        return super().__new__(mcs, name, bases, namespace)
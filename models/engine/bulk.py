@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+module that defines the bulk import and export of objects
+
+Objects are streamed to and from NDJSON files (one JSON object of
+attributes per line) or CSV files (one column per attribute, with list
+and dictionary values written as JSON). The values of the attributes
+declared on a model class are converted to their type by the coercers
+of the class (see models.schema), which also parse CSV strings.
+"""
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from uuid import uuid4
+from models.engine.timestamps import format_datetime
+
+FORMATS = ("ndjson", "csv")
+BATCH_SIZE = 10000
+_HEADER = ("id", "created_at", "updated_at")
+
+
+def detect_format(path):
+    """
+    Returns the format of the file at path from its extension: csv for
+    .csv files, ndjson otherwise.
+    """
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def read_rows(file, file_format):
+    """
+    Yields the dictionary of attributes of each row of the text file.
+    Empty CSV cells are left out.
+    """
+    if file_format == "csv":
+        for row in csv.DictReader(file):
+            yield {name: value for name, value in row.items() if value}
+        return
+    for line in file:
+        if line.strip():
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+            yield row
+
+
+def build(class_type, row):
+    """
+    Returns the instance of class_type described by row, whose declared
+    attributes are coerced to their types. Missing ids and timestamps
+    are generated.
+    """
+    coerce = class_type.coerce
+    obj_data = {
+        name: coerce(name, value) for name, value in row.items()
+        if name != "__class__"
+        }
+    if "id" not in obj_data:
+        obj_data["id"] = str(uuid4())
+    for name in ("created_at", "updated_at"):
+        if name not in obj_data:
+            obj_data[name] = format_datetime(datetime.now())
+    return class_type(**obj_data)
+
+
+def import_objects(storage, class_type, file, file_format,
+                   batch_size=BATCH_SIZE):
+    """
+    Adds to storage an instance of class_type for each row of the text
+    file, saving them batch_size rows at a time. Returns the number of
+    rows imported.
+
+    Raises:
+        ValueError: With the line (or CSV record) number of the first
+                    invalid row. The rows before it are saved.
+    """
+    rows = enumerate(read_rows(file, file_format), 1)
+    count = 0
+    while True:
+        imported = count
+        with storage.batch():
+            for number, row in islice(rows, batch_size):
+                try:
+                    storage.new(build(class_type, row))
+                except (ValueError, TypeError) as error:
+                    raise ValueError("row {}: {}".format(number, error))
+                count += 1
+        if count - imported < batch_size:
+            return count
+
+
+def _cell(value):
+    """
+    Returns the CSV cell of an attribute value.
+    """
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def export_objects(storage, class_type, file, file_format):
+    """
+    Writes the attributes of each instance of class_type in storage to
+    the text file, one row per instance. Returns the number of rows.
+    """
+    objects = storage.all(class_type.__name__).values()
+    if file_format == "csv":
+        names = list(_HEADER) + sorted(class_type.declared_fields())
+        seen = set(names) | {"__class__"}
+        for obj in objects:
+            for name in obj.__dict__:
+                if name not in seen:
+                    seen.add(name)
+                    names.append(name)
+        writer = csv.DictWriter(file, names)
+        writer.writeheader()
+        for obj in objects:
+            obj_data = obj.to_dict()
+            del obj_data["__class__"]
+            writer.writerow({
+                name: _cell(value) for name, value in obj_data.items()
+                })
+        return len(objects)
+
+    for obj in objects:
+        obj_data = obj.to_dict()
+        del obj_data["__class__"]
+        file.write(json.dumps(obj_data))
+        file.write("\n")
+    return len(objects)
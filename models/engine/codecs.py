@@ -0,0 +1,389 @@
+#!/usr/bin/python3
+"""
+module that defines the serialization formats of the storage files
+
+A codec turns the dictionary of one object (as returned by to_dict()) into
+an encoded fragment, writes fragments as a whole file (a snapshot) or as
+appended records (a journal), and reads them back. JSON files have no
+header; binary files start with MAGIC followed by the codec's format id,
+which is how reload() detects the format of an existing file.
+"""
+import codecs
+import json
+import mmap
+import struct
+from models.engine import snapshot
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MAGIC = b"HBNB"
+CHUNK_SIZE = 1 << 16
+_LENGTH = struct.Struct(">I")
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_object(file, chunk_size=CHUNK_SIZE):
+    """
+    Yields the (key, value) pairs of the JSON object stored in the binary
+    file without parsing the whole document at once: the file is read in
+    chunks of chunk_size bytes and each value is decoded as soon as it is
+    complete, so memory use does not grow with the size of the file.
+
+    Raises:
+        ValueError: If the file is not a JSON object.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        """
+        Reads the next chunk, dropping what was already consumed.
+        Returns False at the end of the file.
+        """
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+        return True
+
+    def next_token():
+        """
+        Skips whitespace and returns the next character ('' at the end).
+        """
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return buffer[pos:pos + 1]
+
+    def next_value():
+        """
+        Decodes the JSON value starting at pos, reading more chunks until
+        it is complete.
+        """
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if not fill():
+                    raise
+                continue
+            # A number may continue in the next chunk
+            if end < len(buffer) or eof:
+                pos = end
+                return value
+            fill()
+
+    if next_token() != "{":
+        raise ValueError("expected a JSON object")
+    pos += 1
+    if next_token() == "}":
+        return
+    while True:
+        next_token()
+        key = next_value()
+        if next_token() != ":":
+            raise ValueError("expected ':' after key {!r}".format(key))
+        pos += 1
+        next_token()
+        yield key, next_value()
+        separator = next_token()
+        pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(
+                    "expected ',' or '}}' after key {!r}".format(key))
+
+
+class JSONCodec:
+    """
+    The default codec: a JSON object of all objects for snapshots and one
+    JSON array [key, value] per line for journals.
+    """
+    name = "json"
+    format_id = None
+
+    def encode(self, obj_dict):
+        """
+        Returns the encoded fragment of obj_dict.
+        """
+        return json.dumps(obj_dict).encode('utf-8')
+
+    def decode(self, fragment):
+        """
+        Returns the dictionary encoded in fragment.
+        """
+        return json.loads(fragment)
+
+    def write_snapshot(self, file, items):
+        """
+        Writes the (key, fragment) pairs of items to the binary file.
+        """
+        separator = b""
+        file.write(b"{")
+        for key, fragment in items:
+            file.write(b"".join((
+                separator, json.dumps(key).encode('utf-8'), b": ", fragment
+                )))
+            separator = b", "
+        file.write(b"}")
+
+    def read_snapshot(self, file):
+        """
+        Yields the (key, dictionary) pairs stored in the binary file,
+        streaming through it with iter_json_object().
+        """
+        yield from iter_json_object(file)
+
+    def start_journal(self, file):
+        """
+        Writes the header of a new journal file.
+        """
+
+    def write_record(self, file, key, fragment):
+        """
+        Appends one journal record; a fragment of None records a deletion.
+        """
+        file.write(b"".join((
+            b"[", json.dumps(key).encode('utf-8'), b", ",
+            b"null" if fragment is None else fragment, b"]\n"
+            )))
+
+    def read_records(self, file):
+        """
+        Yields (key, dictionary or None, end offset) for each complete
+        journal record of the binary file, stopping at a torn record.
+        """
+        offset = file.tell()
+        for line in file:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                key, obj_data = self.decode(line)
+            except ValueError:
+                return
+            offset += len(line)
+            yield key, obj_data, offset
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    The JSON format, encoded and decoded with orjson when it is installed.
+    """
+    name = "orjson"
+
+    def encode(self, obj_dict):
+        """
+        Returns the encoded fragment of obj_dict.
+        """
+        return orjson.dumps(obj_dict)
+
+    def decode(self, fragment):
+        """
+        Returns the dictionary encoded in fragment.
+        """
+        return orjson.loads(fragment)
+
+    def read_snapshot(self, file):
+        """
+        Yields the (key, dictionary) pairs stored in the binary file.
+        orjson has no incremental parser, so this trades the flat memory
+        use of the json codec for a faster parse of the whole file.
+        """
+        yield from orjson.loads(file.read()).items()
+
+
+class RecordCodec(JSONCodec):
+    """
+    Base class of the binary formats: MAGIC and a one byte format id,
+    then length-prefixed key and value records. An empty value records
+    a deletion in journals.
+    """
+    @property
+    def header(self):
+        """
+        The bytes every file of this codec starts with.
+        """
+        return MAGIC + bytes((self.format_id,))
+
+    def write_snapshot(self, file, items):
+        """
+        Writes the (key, fragment) pairs of items to the binary file.
+        """
+        file.write(self.header)
+        for key, fragment in items:
+            self.write_record(file, key, fragment)
+
+    def read_snapshot(self, file):
+        """
+        Yields the (key, dictionary) pairs stored in the binary file.
+        """
+        for key, obj_data, _ in self.read_records(file):
+            yield key, obj_data
+
+    def start_journal(self, file):
+        """
+        Writes the header of a new journal file.
+        """
+        file.write(self.header)
+
+    def write_record(self, file, key, fragment):
+        """
+        Appends one record; a fragment of None records a deletion.
+        """
+        key = key.encode('utf-8')
+        fragment = fragment or b""
+        file.write(b"".join((
+            _LENGTH.pack(len(key)), key, _LENGTH.pack(len(fragment)), fragment
+            )))
+
+    def read_records(self, file):
+        """
+        Yields (key, dictionary or None, end offset) for each complete
+        record of the binary file, stopping at a torn record. The header
+        is skipped when reading from the start of the file.
+        """
+        if file.tell() == 0:
+            file.seek(len(self.header))
+        offset = file.tell()
+        while True:
+            head = file.read(_LENGTH.size)
+            if len(head) < _LENGTH.size:
+                return
+            key = file.read(_LENGTH.unpack(head)[0])
+            head = file.read(_LENGTH.size)
+            if len(head) < _LENGTH.size:
+                return
+            size = _LENGTH.unpack(head)[0]
+            fragment = file.read(size)
+            if len(fragment) < size:
+                return
+            offset = file.tell()
+            obj_data = self.decode(fragment) if fragment else None
+            yield key.decode('utf-8'), obj_data, offset
+
+
+class MsgpackCodec(RecordCodec):
+    """
+    Binary records whose values are encoded with msgpack when it is
+    installed.
+    """
+    name = "msgpack"
+    format_id = 2
+
+    def encode(self, obj_dict):
+        """
+        Returns the encoded fragment of obj_dict.
+        """
+        return msgpack.packb(obj_dict)
+
+    def decode(self, fragment):
+        """
+        Returns the dictionary encoded in fragment.
+        """
+        return msgpack.unpackb(fragment)
+
+
+class SnapshotCodec(RecordCodec):
+    """
+    Compiled snapshots (see models.engine.snapshot) of compact JSON
+    values, which FileStorage memory-maps and reads without parsing the
+    whole file. Journals use the binary record format.
+    """
+    name = "snapshot"
+    format_id = 3
+
+    def encode(self, obj_dict):
+        """
+        Returns the encoded fragment of obj_dict.
+        """
+        return json.dumps(obj_dict, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, fragment):
+        """
+        Returns the dictionary encoded in fragment.
+        """
+        return json.loads(fragment)
+
+    def write_snapshot(self, file, items):
+        """
+        Writes the (key, fragment) pairs of items to the binary file,
+        sorted by key behind an index.
+        """
+        snapshot.write(file, self.header, items)
+
+    def read_snapshot(self, file):
+        """
+        Yields the (key, dictionary) pairs stored in the binary file.
+        """
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            buffer = file.read()
+        records = snapshot.Snapshot(buffer, len(self.header))
+        for key, fragment in records.items():
+            yield key, self.decode(fragment)
+
+    def open(self, path):
+        """
+        Returns the memory-mapped Snapshot of the file at path.
+        """
+        return snapshot.Snapshot.open(path, len(self.header))
+
+
+CODECS = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+    "snapshot": SnapshotCodec,
+}
+_MODULES = {"orjson": orjson, "msgpack": msgpack}
+
+
+def get_codec(name):
+    """
+    Returns an instance of the codec called name.
+
+    Raises:
+        ValueError: If there is no such codec or its module is not
+                    installed.
+    """
+    if name not in CODECS:
+        raise ValueError("unknown storage format: {}".format(name))
+    if name in _MODULES and _MODULES[name] is None:
+        raise ValueError("storage format {} needs the {} module".format(
+            name, name))
+    return CODECS[name]()
+
+
+def detect_codec(file, default):
+    """
+    Returns the codec of the binary file from its first bytes, leaving
+    the file position at the start. Empty and JSON files use default if
+    it is a JSON codec, or the json codec otherwise.
+    """
+    header = file.read(len(MAGIC) + 1)
+    file.seek(0)
+    if header[:len(MAGIC)] == MAGIC:
+        for codec_type in CODECS.values():
+            if codec_type.format_id == header[len(MAGIC)]:
+                return get_codec(codec_type.name)
+        raise ValueError("unknown storage format id: {}".format(header[-1]))
+    return default if default.format_id is None else JSONCodec()
@@ -0,0 +1,384 @@
+#!/usr/bin/python3
+"""
+module that defines the ColumnarView class
+
+A columnar view holds the declared number and string attributes of all
+the instances of one class as columns, one row per instance, so that
+filters, group-bys and aggregates run over flat arrays instead of model
+objects. Numbers are stored as float64 arrays (NaN when a value is not a
+number); strings are dictionary encoded as arrays of codes. The arrays
+are processed with NumPy when it is installed; it is only imported when
+a view is first queried, as it takes longer to import than the console
+takes to run most commands.
+
+FileStorage.columnar() keeps one view per class in sync as objects are
+added, changed and removed.
+"""
+import math
+import operator
+from array import array
+
+OPERATORS = {
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+}
+FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+
+def _numpy():
+    """
+    Returns the numpy module, imported on first use, or None if it is not
+    installed. It is then kept as the numpy attribute of this module.
+    """
+    global numpy
+    try:
+        return numpy
+    except NameError:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+        return module
+
+
+def __getattr__(name):
+    """
+    Returns the numpy attribute of this module, importing NumPy on first
+    access.
+    """
+    if name == "numpy":
+        return _numpy()
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
+
+
+class ColumnarView:
+    """
+    The columns of the instances of one class.
+
+    Attributes:
+        class_name (str): The name of the class of the rows.
+        numbers (tuple): Names of the number columns (int and float
+                         attributes).
+        strings (tuple): Names of the string columns.
+        __keys (list): Row -> key of the instance.
+        __rows (dict): Key -> row.
+        __numbers (dict): Column name -> array('d') of values.
+        __codes (dict): Column name -> array('q') of string codes.
+        __values (dict): Column name -> list of the strings of each code.
+        __lookup (dict): Column name -> {string: code}.
+
+    Methods:
+        observe(self, key, obj, name): Updates the row of key.
+        column(self, name): Returns the values of a column.
+        select(self, where): Returns the rows matching conditions.
+        aggregate(self, function, field, by, where): Computes count, sum,
+                                                     avg, min or max.
+    """
+
+    def __init__(self, class_type, objects=()):
+        """
+        Constructor for ColumnarView
+
+        Args:
+        class_type: The model class of the rows.
+        objects: The instances to add as the first rows.
+        """
+        self.class_name = class_type.__name__
+        types = class_type.field_types()
+        self.numbers = tuple(
+            name for name, kind in types.items() if kind in (int, float))
+        self.strings = tuple(
+            name for name, kind in types.items() if kind is str)
+        self.__prefix = self.class_name + "."
+        objects = list(objects)
+        self.__keys = [self.__prefix + obj.id for obj in objects]
+        self.__rows = {key: row for row, key in enumerate(self.__keys)}
+        self.__values = {name: [] for name in self.strings}
+        self.__lookup = {name: {} for name in self.strings}
+        # Built column by column rather than with observe() per object
+        self.__numbers = {
+            name: array('d', [
+                float(value) if type(value) in (int, float) else math.nan
+                for value in (getattr(obj, name, None) for obj in objects)
+                ])
+            for name in self.numbers
+            }
+        self.__codes = {
+            name: array('q', [
+                self._code(name, getattr(obj, name, "")) for obj in objects
+                ])
+            for name in self.strings
+            }
+
+    def __len__(self):
+        """
+        Returns the number of rows.
+        """
+        return len(self.__keys)
+
+    def _code(self, name, value):
+        """
+        Returns the code of the string value in column name, adding it to
+        the dictionary of the column if needed. Values that are not
+        strings are stored as their str().
+        """
+        value = value if isinstance(value, str) else str(value)
+        code = self.__lookup[name].get(value)
+        if code is None:
+            code = len(self.__values[name])
+            self.__lookup[name][value] = code
+            self.__values[name].append(value)
+        return code
+
+    def _number(self, value):
+        """
+        Returns value as a float, or NaN if it is not a number.
+        """
+        if type(value) in (int, float):
+            return float(value)
+        return math.nan
+
+    def observe(self, key, obj, name=None):
+        """
+        Updates the row of key from obj (None when it was removed), or
+        only its column name if given. This is the observer registered
+        with FileStorage.subscribe(); keys of other classes are ignored.
+        """
+        if not key.startswith(self.__prefix):
+            return
+        row = self.__rows.get(key)
+        if obj is None:
+            if row is not None:
+                self._remove(key, row)
+            return
+        if row is None:
+            self.__rows[key] = len(self.__keys)
+            self.__keys.append(key)
+            for column, values in self.__numbers.items():
+                values.append(self._number(getattr(obj, column, None)))
+            for column, codes in self.__codes.items():
+                codes.append(self._code(column, getattr(obj, column, "")))
+        elif name is None:
+            for column, values in self.__numbers.items():
+                values[row] = self._number(getattr(obj, column, None))
+            for column, codes in self.__codes.items():
+                codes[row] = self._code(column, getattr(obj, column, ""))
+        elif name in self.__numbers:
+            self.__numbers[name][row] = self._number(getattr(obj, name))
+        elif name in self.__codes:
+            self.__codes[name][row] = self._code(name, getattr(obj, name))
+
+    def _remove(self, key, row):
+        """
+        Removes the row of key, moving the last row into its place.
+        """
+        last = len(self.__keys) - 1
+        if row != last:
+            moved = self.__keys[last]
+            self.__keys[row] = moved
+            self.__rows[moved] = row
+            for columns in (self.__numbers, self.__codes):
+                for values in columns.values():
+                    values[row] = values[last]
+        self.__keys.pop()
+        del self.__rows[key]
+        for columns in (self.__numbers, self.__codes):
+            for values in columns.values():
+                values.pop()
+
+    def column(self, name):
+        """
+        Returns the values of column name, one per row: the array of a
+        number column, or a new list of strings.
+
+        Raises:
+            KeyError: If there is no such column.
+        """
+        if name in self.__numbers:
+            return self.__numbers[name]
+        values = self.__values[name]
+        return [values[code] for code in self.__codes[name]]
+
+    def _check(self, name):
+        """
+        Raises ValueError if there is no column name.
+        """
+        if name not in self.__numbers and name not in self.__codes:
+            raise ValueError("no column {} in {}".format(
+                name, self.class_name))
+
+    def select(self, where=()):
+        """
+        Returns the rows matching all the (column, operator, value)
+        conditions of where: a NumPy boolean mask, or a list of row
+        numbers without NumPy. Operators are the keys of OPERATORS.
+
+        Raises:
+            ValueError: If a column or an operator does not exist, or a
+                        value is not a number for a number column.
+        """
+        for name, op, _ in where:
+            self._check(name)
+            if op not in OPERATORS:
+                raise ValueError("unknown operator {}".format(op))
+        numpy = _numpy()
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype=bool)
+            for name, op, value in where:
+                mask &= OPERATORS[op](*self._operands(name, op, value))
+            return mask
+
+        rows = range(len(self))
+        for name, op, value in where:
+            compare = OPERATORS[op]
+            if name in self.__numbers:
+                column, value = self.__numbers[name], float(value)
+            else:
+                column, value = self.column(name), str(value)
+            rows = [row for row in rows if compare(column[row], value)]
+        return list(rows)
+
+    def _array(self, name):
+        """
+        Returns the NumPy array of column name: float64 values for number
+        columns, string codes otherwise. Number columns are not copied.
+        """
+        numpy = _numpy()
+        if name in self.__numbers:
+            return numpy.frombuffer(self.__numbers[name], dtype=numpy.float64)
+        return numpy.array(self.__codes[name], dtype=numpy.int64)
+
+    def _operands(self, name, op, value):
+        """
+        Returns the NumPy array of column name and the value to compare
+        it with: codes are compared for == and != on string columns, and
+        the strings themselves for the other operators.
+        """
+        if name in self.__numbers:
+            return self._array(name), float(value)
+        value = str(value)
+        if op in ("==", "!="):
+            return self._array(name), self.__lookup[name].get(value, -1)
+        strings = _numpy().array(self.__values[name] + [""], dtype=object)
+        return strings[self._array(name)], value
+
+    def aggregate(self, function, field=None, by=None, where=()):
+        """
+        Returns function ("count", "sum", "avg", "min" or "max") of the
+        number column field over the rows matching where. With by (a
+        string column), returns a {value: result} dictionary of the
+        groups that have matching rows.
+
+        Rows whose field is not a number are left out; count without a
+        field counts the rows. Results of empty selections are None,
+        except count which is 0.
+
+        Raises:
+            ValueError: If a column, operator or function does not exist.
+        """
+        if function not in FUNCTIONS:
+            raise ValueError("unknown function {}".format(function))
+        if field is None and function != "count":
+            raise ValueError("{} needs a number column".format(function))
+        if field is not None and field not in self.__numbers:
+            raise ValueError("no number column {} in {}".format(
+                field, self.class_name))
+        if by is not None and by not in self.__codes:
+            raise ValueError("no string column {} in {}".format(
+                by, self.class_name))
+        selection = self.select(where)
+        if _numpy() is not None:
+            return self._aggregate_arrays(function, field, by, selection)
+        return self._aggregate_rows(function, field, by, selection)
+
+    def _aggregate_arrays(self, function, field, by, mask):
+        """
+        aggregate() over the rows of the NumPy boolean mask.
+        """
+        numpy = _numpy()
+        if field is not None:
+            values = self._array(field)
+            mask = mask & ~numpy.isnan(values)
+            values = values[mask]
+        if by is None:
+            if function == "count":
+                return int(mask.sum())
+            if not len(values):
+                return None
+            return float({
+                "sum": numpy.sum, "avg": numpy.mean,
+                "min": numpy.min, "max": numpy.max,
+                }[function](values))
+
+        codes = self._array(by)[mask]
+        size = len(self.__values[by])
+        counts = numpy.bincount(codes, minlength=size)
+        if function == "count":
+            results = counts
+        elif function in ("sum", "avg"):
+            results = numpy.bincount(codes, weights=values, minlength=size)
+            if function == "avg":
+                results = results / numpy.maximum(counts, 1)
+        else:
+            fill = math.inf if function == "min" else -math.inf
+            results = numpy.full(size, fill)
+            reduce = numpy.minimum if function == "min" else numpy.maximum
+            reduce.at(results, codes, values)
+        strings = self.__values[by]
+        return {
+            strings[code]: (int(results[code]) if function == "count"
+                            else float(results[code]))
+            for code in numpy.flatnonzero(counts)
+            }
+
+    def _aggregate_rows(self, function, field, by, rows):
+        """
+        aggregate() over the list of row numbers, without NumPy.
+        """
+        if field is not None:
+            column = self.__numbers[field]
+            rows = [row for row in rows if not math.isnan(column[row])]
+        if by is None:
+            if function == "count":
+                return len(rows)
+            if not rows:
+                return None
+            values = [column[row] for row in rows]
+            if function in ("sum", "avg"):
+                total = math.fsum(values)
+                return total / len(values) if function == "avg" else total
+            return (min if function == "min" else max)(values)
+
+        codes = self.__codes[by]
+        size = len(self.__values[by])
+        counts = [0] * size
+        if function == "count":
+            for row in rows:
+                counts[codes[row]] += 1
+            results = counts
+        elif function in ("sum", "avg"):
+            results = [0.0] * size
+            for row in rows:
+                code = codes[row]
+                counts[code] += 1
+                results[code] += column[row]
+            if function == "avg":
+                results = [total / (count or 1)
+                           for total, count in zip(results, counts)]
+        else:
+            results = [None] * size
+            better = operator.lt if function == "min" else operator.gt
+            for row in rows:
+                code = codes[row]
+                counts[code] += 1
+                value = column[row]
+                if results[code] is None or better(value, results[code]):
+                    results[code] = value
+        strings = self.__values[by]
+        return {
+            strings[code]: results[code]
+            for code in range(size) if counts[code]
+            }
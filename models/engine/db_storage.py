@@ -0,0 +1,383 @@
+#!/usr/bin/python3
+"""
+module that defines the DBStorage class
+"""
+import importlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from models.engine.file_storage import FileStorage
+
+
+class DBStorage:
+    """
+    The DBStorage class stores instances in a SQLite database, with the
+    same interface as FileStorage.
+
+    Each model class has its own table with an id primary key, the
+    created_at and updated_at timestamps, one column per attribute
+    declared on the class and an extra column holding the other
+    attributes (and the values SQLite cannot store) as JSON. The
+    FileStorage.indexed_fields columns are indexed.
+
+    Changed objects are written row by row; like a database session,
+    writes are sent to SQLite before every query (so that queries see
+    them) and committed by save().
+
+    Attributes:
+        __path (str): The path to the database file.
+        __connection: The sqlite3 connection.
+        __objects (dict): Identity map of the objects read or added,
+                          by key <class name>.id.
+        __pending (dict): Keys changed since the last flush, mapped to the
+                          object to write or None for a deletion.
+        __columns (dict): Class name -> declared attribute columns.
+        indexed_fields (dict): Class name -> indexed columns.
+        column_types (tuple): Types of the values stored in columns rather
+                              than in extra.
+
+    Methods:
+        all(self, cls): Returns the objects of class cls, or every object.
+        get(self, cls, id): Returns the object of class cls with that id.
+        count(self, cls): Returns the number of objects (of class cls).
+        find(self, cls, **criteria): Returns the objects of class cls whose
+                                     attributes equal the given values.
+        columnar(self, cls): Returns a ColumnarView of class cls.
+        new(self, obj): Adds obj to the database.
+        delete(self, obj): Removes obj from the database.
+        touch(self, obj, name): Marks a stored obj as changed.
+        save(self): Commits all the changes, unless a batch is running.
+        flush(self): Commits all the changes.
+        begin(self): Starts a batch, during which save() commits nothing.
+        commit(self): Ends a batch, committing its changes.
+        batch(self): Context manager running its block as a batch.
+        reload(self): Creates the tables and forgets unchanged objects.
+    """
+    indexed_fields = FileStorage.indexed_fields
+    column_types = (str, int, float)
+    class_names = (
+        "BaseModel", "User", "Place", "State", "City", "Amenity", "Review"
+    )
+
+    def __init__(self, path="hbnb.db"):
+        """
+        Constructor for DBStorage
+
+        Args:
+        path (str): The path to the database file.
+        """
+        self.__path = path
+        self.__connection = None
+        self.__objects = {}
+        self.__pending = {}
+        self.__columns = {}
+        self.__class_types = {}
+        self.__batch_depth = 0
+
+    @property
+    def batching(self):
+        """
+        True while a batch started by begin() is running.
+        """
+        return self.__batch_depth > 0
+
+    @property
+    def dirty(self):
+        """
+        True while there are changes that are not committed yet.
+        """
+        return bool(self.__pending) or (
+            self.__connection is not None and
+            self.__connection.in_transaction)
+
+    def _class_type(self, class_name):
+        """
+        Returns the model class called class_name.
+        """
+        class_type = self.__class_types.get(class_name)
+        if class_type is None:
+            module = importlib.import_module(
+                    f"models.{class_name.lower()}"
+                    if class_name != "BaseModel"
+                    else 'models.base_model'
+                    )
+            class_type = getattr(module, class_name)
+            self.__class_types[class_name] = class_type
+        return class_type
+
+    def _columns(self, class_name):
+        """
+        Returns the attribute columns of the table of class_name: the
+        attributes declared on the class, by name.
+        """
+        columns = self.__columns.get(class_name)
+        if columns is None:
+            class_type = self._class_type(class_name)
+            columns = sorted(class_type.declared_fields())
+            self.__columns[class_name] = columns
+        return columns
+
+    def _create_table(self, class_name):
+        """
+        Creates the table of class_name and its indexes, adding the
+        columns of attributes declared since the table was created.
+        """
+        columns = self._columns(class_name)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY, '
+            'created_at TEXT, updated_at TEXT, extra TEXT)'.format(class_name)
+            )
+        existing = {
+            row[1] for row in self.__connection.execute(
+                'PRAGMA table_info("{}")'.format(class_name))
+            }
+        for column in columns:
+            if column not in existing:
+                self.__connection.execute(
+                    'ALTER TABLE "{}" ADD COLUMN "{}"'.format(
+                        class_name, column))
+        for column in self.indexed_fields.get(class_name, ()):
+            self.__connection.execute(
+                'CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}" ("{1}")'.format(
+                    class_name, column))
+
+    def reload(self):
+        """
+        Opens the database in WAL mode, creates the missing tables and
+        forgets the objects without pending changes so that they are read
+        again from the database.
+        """
+        if self.__connection is None:
+            self.__connection = sqlite3.connect(
+                self.__path, check_same_thread=False)
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+        for class_name in self.class_names:
+            self._create_table(class_name)
+        self.__connection.commit()
+        self.__objects = {
+            key: obj for key, obj in self.__objects.items()
+            if key in self.__pending
+            }
+
+    def new(self, obj):
+        """
+        Adds obj to the database on the next flush.
+        """
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        self.__objects[key] = obj
+        self.__pending[key] = obj
+
+    def delete(self, obj=None):
+        """
+        Removes obj from the database on the next flush.
+        """
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        self.__objects.pop(key, None)
+        self.__pending[key] = None
+
+    def touch(self, obj, name=None):
+        """
+        Marks obj as changed so that it is written on the next flush.
+        Objects that are not stored are ignored.
+        """
+        key = "{}.{}".format(obj.__class__.__name__, getattr(obj, "id", None))
+        if self.__objects.get(key) is obj:
+            self.__pending[key] = obj
+
+    def _flush(self):
+        """
+        Sends the pending changes to SQLite without committing them.
+        """
+        for key, obj in self.__pending.items():
+            class_name, _, obj_id = key.partition('.')
+            if obj is None:
+                self.__connection.execute(
+                    'DELETE FROM "{}" WHERE id = ?'.format(class_name),
+                    (obj_id,))
+                continue
+            columns = self._columns(class_name)
+            row = obj.to_dict()
+            del row['__class__']
+            values = [row.pop('id'), row.pop('created_at'),
+                      row.pop('updated_at')]
+            for column in columns:
+                if type(row.get(column)) in self.column_types:
+                    values.append(row.pop(column))
+                else:
+                    values.append(None)
+            values.append(json.dumps(row) if row else None)
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO "{}" (id, created_at, updated_at, {}'
+                'extra) VALUES ({})'.format(
+                    class_name,
+                    "".join('"{}", '.format(column) for column in columns),
+                    ", ".join("?" * len(values))),
+                values)
+        self.__pending.clear()
+
+    def save(self):
+        """
+        Writes the pending changes and commits them, unless a batch is
+        running.
+        """
+        if not self.__batch_depth:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending changes and commits them.
+        """
+        self._flush()
+        self.__connection.commit()
+
+    def begin(self):
+        """
+        Starts a batch: save() commits nothing until the matching commit().
+        Batches can be nested.
+        """
+        self.__batch_depth += 1
+
+    def commit(self):
+        """
+        Ends the batch started by the last begin(), committing its changes
+        when it is the outermost one.
+        """
+        if self.__batch_depth:
+            self.__batch_depth -= 1
+        if not self.__batch_depth:
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs the with block as a batch committed when it exits.
+        """
+        self.begin()
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def _build(self, class_name, row, names):
+        """
+        Returns the object of the database row, reusing the instance
+        already in the identity map if there is one.
+        """
+        key = "{}.{}".format(class_name, row[0])
+        obj = self.__objects.get(key)
+        if obj is None:
+            obj_data = {
+                name: value for name, value in zip(names, row)
+                if value is not None and name != 'extra'
+                }
+            if row[-1] is not None:
+                obj_data.update(json.loads(row[-1]))
+            obj = self._class_type(class_name)(**obj_data)
+            self.__objects[key] = obj
+        return obj
+
+    def _select(self, class_name, where="", parameters=()):
+        """
+        Returns a dictionary of the objects of class_name matching the
+        SQL where clause.
+        """
+        self._flush()
+        columns = self._columns(class_name)
+        names = ["id", "created_at", "updated_at"] + columns + ["extra"]
+        cursor = self.__connection.execute(
+            'SELECT {} FROM "{}" {}'.format(
+                ", ".join('"{}"'.format(name) for name in names),
+                class_name, where),
+            parameters)
+        objects = {}
+        for row in cursor:
+            obj = self._build(class_name, row, names)
+            objects["{}.{}".format(class_name, obj.id)] = obj
+        return objects
+
+    def all(self, cls=None):
+        """
+        Returns a dictionary of every object, or of the objects of class
+        cls (a class or a class name) if given.
+        """
+        if cls is not None:
+            name = cls if isinstance(cls, str) else cls.__name__
+            if name not in self.class_names:
+                return {}
+            return self._select(name)
+        objects = {}
+        for name in self.class_names:
+            objects.update(self._select(name))
+        return objects
+
+    def get(self, cls, id):
+        """
+        Returns the object of class cls (a class or a class name) with
+        the given id, or None if there is no such object.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        key = "{}.{}".format(name, id)
+        if key in self.__objects:
+            return self.__objects[key]
+        if name not in self.class_names:
+            return None
+        return self._select(name, "WHERE id = ?", (id,)).get(key)
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects in the database, or the number of
+        objects of class cls (a class or a class name) if given.
+        """
+        self._flush()
+        if cls is None:
+            names = self.class_names
+        else:
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        total = 0
+        for name in names:
+            if name in self.class_names:
+                total += self.__connection.execute(
+                    'SELECT COUNT(*) FROM "{}"'.format(name)).fetchone()[0]
+        return total
+
+    def columnar(self, cls):
+        """
+        Returns a ColumnarView of the objects of class cls (a class or a
+        class name) as they are now; unlike FileStorage views, it is not
+        kept in sync.
+        """
+        # Imported here, as in FileStorage.columnar()
+        from models.engine.columnar import ColumnarView
+
+        name = cls if isinstance(cls, str) else cls.__name__
+        return ColumnarView(self._class_type(name), self.all(name).values())
+
+    def find(self, cls, **criteria):
+        """
+        Returns a dictionary of the objects of class cls (a class or a
+        class name) whose attributes equal all the given criteria.
+
+        Criteria on the columns of the table are evaluated by SQLite; the
+        others are checked on the objects it returns.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in self.class_names:
+            return {}
+        columns = set(self._columns(name)) | {"id", "created_at",
+                                              "updated_at"}
+        clauses = []
+        parameters = []
+        for field, value in criteria.items():
+            if field in columns and type(value) in self.column_types:
+                clauses.append('"{}" = ?'.format(field))
+                parameters.append(value)
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        return {
+            key: obj
+            for key, obj in self._select(name, where, parameters).items()
+            if all(getattr(obj, field, None) == value
+                   for field, value in criteria.items())
+            }
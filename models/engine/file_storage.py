@@ -2,9 +2,43 @@
 """
 module that defines the FileStorage class
 """
-import json
-from datetime import datetime
+import os
+import atexit
 import importlib
+import multiprocessing
+import threading
+import zlib
+from time import monotonic
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from models.engine.codecs import get_codec, detect_codec, SnapshotCodec
+from models.engine.snapshot import SnapshotView
+from models.engine.rwlock import RWLock, NullLock
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def iter_file(path, default):
+    """
+    Yields the (key, dictionary) pairs of the snapshot file at path,
+    whose format is detected from its header (default is used for
+    JSON files).
+    """
+    with open(path, mode='rb') as file:
+        codec = detect_codec(file, default)
+        yield from codec.read_snapshot(file)
+
+
+def read_file(path, codec_name):
+    """
+    Returns the list of (key, dictionary) pairs of the snapshot file at
+    path. This is the function run by the reload() worker processes.
+    """
+    return list(iter_file(path, get_codec(codec_name)))
 
 
 class FileStorage:
@@ -15,65 +49,1067 @@ class FileStorage:
     Attributes:
         __file_path (str): The path to the JSON file.
         __objects (dict): A dictionary to store serialized objects.
+        __pending (dict): Keys changed since the last save, mapped to the
+                          object to write or None for a deletion.
+        __classes (dict): Per-class index mapping a class name to the
+                          {key: obj} dictionary of its instances.
+        __values (dict): Secondary indexes mapping (class name, field) to
+                         {value: {key: obj}} for the indexed_fields.
+        __indexed (dict): The indexed field values of each key, used to
+                          unindex an object when it changes or is deleted.
+        indexed_fields (dict): Class name -> fields kept in __values.
+        __raw (dict): In lazy mode, class name -> {key: dict} of the objects
+                      read by reload() but not built yet.
+        __cache (dict): The encoded fragment of each object as of its last
+                        save, reused by save() for objects that did not
+                        change. It starts empty after reload(), so the
+                        first whole-file save encodes every object again
+                        (but the records still mapped from a snapshot).
+        encoded_count (int): Number of objects re-encoded by the last save,
+                             built or not.
+        journal (bool): When True, save() appends one record per changed
+                        object to the journal file instead of rewriting
+                        the whole JSON file.
+        compact_threshold (int): Number of journal records after which the
+                                 journal is folded back into the JSON file.
+        lazy (bool): When True, reload() keeps the dictionaries read from
+                     the file and objects are only built when they are
+                     first returned by all(), get() or find().
+        codec: The models.engine.codecs codec used to write the files.
+        shards (int): When non zero, objects are kept in the shard_dir
+                      directory instead of the JSON file: one file per
+                      class, split into that many files per class by a
+                      hash of the id when greater than 1.
+        workers (int): When greater than 1 in sharded mode, reload()
+                       decodes the shard files in that many processes.
+        durability (str): How files are written: "none" overwrites them in
+                          place, "flush" writes a temporary file renamed
+                          over the old one, and "fsync" also forces the
+                          data (and journal appends) to disk.
+        commit_delay (float): Group commit window in seconds. When non
+                              zero, save() only writes once that long has
+                              passed since the first change it deferred.
+        commit_size (int): When non zero, save() defers writing until that
+                           many objects changed. With commit_delay, the
+                           first limit reached triggers the write.
+        threadsafe (bool): When True, the storage can be used by several
+                           threads at once (see below).
+        background (bool): When True, save() returns right away and a
+                           flusher thread writes the changes once the
+                           group commit window is over. Background
+                           storages are threadsafe.
+        batching (bool): True between begin() and the matching commit().
+        dirty (bool): True while there are changes not written yet.
+        __observers (list): Callables notified of the objects added,
+                            changed and removed in memory.
+        __columnar (dict): Class name -> ColumnarView kept in sync.
+        __rwlock (RWLock): Held by the methods of threadsafe storages.
+        __version (tuple): The state of the files (see _version()) when
+                           this process last read or wrote them, with
+                           every object in memory.
+
+    Several processes can share the files: save(), compact() and reload()
+    hold an advisory lock on lock_path while they run, and save() first
+    merges the changes written by other processes since this one last
+    read or wrote the files, so that it does not overwrite them.
+
+    Several threads can share a threadsafe storage: the methods that
+    only read (all(), get(), count() and find()) run at the same time,
+    while the others hold __rwlock alone, so that save() iterates over
+    objects nobody changes. all() returns a new dictionary rather than
+    __objects itself, and objects are built when they are read from the
+    files rather than on first access, as reads do not change memory.
 
     Methods:
-        all(self): Returns the dictionary __objects.
+        all(self, cls): Returns the dictionary __objects, or only the
+                        objects of class cls.
+        get(self, cls, id): Returns the object of class cls with that id.
+        count(self, cls): Returns the number of objects (of class cls).
+        find(self, cls, **criteria): Returns the objects of class cls whose
+                                     attributes equal the given values.
+        columnar(self, cls): Returns the ColumnarView of class cls.
+        subscribe(self, observer): Calls observer on every change.
+        unsubscribe(self, observer): Stops calling observer.
         new(self, obj): Sets in __objects the obj with key <obj class name>.id.
+        delete(self, obj): Removes obj from __objects.
+        touch(self, obj): Marks a stored obj as changed.
         save(self): Serializes __objects to the JSON file (path: __file_path).
-        reload(self): Deserializes the JSON file to __objects.
+        flush(self): Writes the deferred changes now.
+        close(self): Stops the flusher thread and writes its changes.
+        begin(self): Starts a batch, during which save() writes nothing.
+        commit(self): Ends a batch, writing its changes.
+        batch(self): Context manager running its block as a batch.
+        reload(self, classes): Deserializes the JSON file to __objects.
+        compact(self): Folds the journal back into the JSON file.
     """
     __file_path = "file.json"
     __objects = {}
+    __pending = {}
+    __classes = {}
+    __values = {}
+    __indexed = {}
+    __cache = {}
+    __cache_codec = None
+    __raw = {}
+    __class_types = {}
+    __observers = []
+    __columnar = {}
+    __rwlock = RWLock()
+    durability_levels = ("none", "flush", "fsync")
+    indexed_fields = {
+        "City": ("state_id",),
+        "Place": ("city_id", "user_id"),
+        "Review": ("place_id", "user_id"),
+    }
+
+    def __init__(self, journal=False, compact_threshold=1000, lazy=False,
+                 codec="json", shards=0, workers=1, durability="flush",
+                 commit_delay=0, commit_size=0, threadsafe=False,
+                 background=False):
+        """
+        Constructor for FileStorage
+
+        Args:
+        journal (bool): Enables the append-only journal mode.
+        compact_threshold (int): Journal records kept before compaction.
+        lazy (bool): Enables building objects on first access.
+        codec (str): Name of the format written by save(), one of
+                     models.engine.codecs.CODECS.
+        shards (int): 0 to keep every object in the JSON file, 1 for one
+                      shard file per class, or N for N shard files per
+                      class.
+        workers (int): Number of processes decoding shards in reload().
+        durability (str): One of durability_levels.
+        commit_delay (float): Seconds save() may defer writing for.
+        commit_size (int): Changed objects save() may defer writing for.
+        threadsafe (bool): Enables locking for use by several threads.
+        background (bool): Enables writing from a flusher thread.
+        """
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.lazy = lazy
+        self.codec = get_codec(codec)
+        self.shards = shards
+        self.workers = workers
+        if durability not in self.durability_levels:
+            raise ValueError("durability must be one of {}".format(
+                ", ".join(self.durability_levels)))
+        self.durability = durability
+        self.commit_delay = commit_delay
+        self.commit_size = commit_size
+        threadsafe = threadsafe or background
+        if threadsafe and lazy:
+            raise ValueError("lazy mode cannot be threadsafe")
+        self.threadsafe = threadsafe
+        self.background = background
+        self.__lock = self.__rwlock if threadsafe else NullLock()
+        self.__flusher = None
+        self.__flusher_pid = None
+        self.__wakeup = threading.Event()
+        self.__closing = False
+        self.__error = None
+        self.__batch_depth = 0
+        self.__deferred_since = None
+        self.__journal_records = 0
+        self.__reshard = False
+        self.__lock_file = None
+        self.__version = None
+        self.encoded_count = 0
+
+    @property
+    def journal_path(self):
+        """
+        Path of the journal file kept next to the JSON file.
+        """
+        return self.__file_path + ".journal"
+
+    @property
+    def shard_dir(self):
+        """
+        Path of the directory holding the shard files.
+        """
+        return self.__file_path + ".d"
+
+    @property
+    def lock_path(self):
+        """
+        Path of the file locked while the storage files are read or
+        written. It is never removed, as processes waiting for the lock
+        would otherwise lock different files.
+        """
+        return self.__file_path + ".lock"
 
-    def all(self):
+    @property
+    def batching(self):
         """
-        Returns the dictionary __objects.
+        True while a batch started by begin() is running.
         """
-        return self.__objects
+        return self.__batch_depth > 0
+
+    @property
+    def dirty(self):
+        """
+        True while there are changes that save() or flush() did not
+        write yet, e.g. during a batch.
+        """
+        return bool(self.__pending)
+
+    def all(self, cls=None):
+        """
+        Returns the dictionary __objects (a copy of it in threadsafe
+        mode).
+
+        If cls (a class or a class name) is given, returns a new dictionary
+        holding only the objects of exactly that class.
+        """
+        with self.__lock.reading():
+            if cls is None:
+                for name in list(self.__raw):
+                    self._hydrate(name)
+                if self.threadsafe:
+                    return dict(self.__objects)
+                return self.__objects
+            name = cls if isinstance(cls, str) else cls.__name__
+            self._hydrate(name)
+            return dict(self.__classes.get(name, {}))
+
+    def get(self, cls, id):
+        """
+        Returns the object of class cls (a class or a class name) with
+        the given id, or None if there is no such object.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        key = "{}.{}".format(name, id)
+        with self.__lock.reading():
+            obj_data = self.__raw.get(name, {}).pop(key, None)
+            if obj_data is not None:
+                self._build(key, obj_data)
+            return self.__objects.get(key)
+
+    def count(self, cls=None):
+        """
+        Returns the number of objects in storage, or the number of objects
+        of class cls (a class or a class name) if given.
+        """
+        name = cls if isinstance(cls, str) or cls is None else cls.__name__
+        with self.__lock.reading():
+            if name is None:
+                return len(self.__objects) + sum(map(len, self.__raw.values()))
+            return len(self.__classes.get(name, ())) + \
+                len(self.__raw.get(name, ()))
+
+    def find(self, cls, **criteria):
+        """
+        Returns a new dictionary of the objects of class cls (a class or a
+        class name) whose attributes equal all the given criteria.
+
+        The smallest secondary index match narrows the candidates when a
+        criterion is on one of the indexed_fields; otherwise all objects of
+        the class are checked.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock.reading():
+            self._hydrate(name)
+            matches = [
+                self.__values[(name, field)].get(value, {})
+                for field, value in criteria.items()
+                if (name, field) in self.__values
+                ]
+            if matches:
+                candidates = min(matches, key=len)
+            else:
+                candidates = self.__classes.get(name, {})
+            return {
+                key: obj for key, obj in candidates.items()
+                if all(getattr(obj, field, None) == value
+                       for field, value in criteria.items())
+                }
 
     def new(self, obj):
         """
         Sets in  __objects the obj with key <obj class name>.id
         """
         key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        with self.__lock.writing():
+            self._add(key, obj)
+            self.__pending[key] = obj
+
+    def delete(self, obj=None):
+        """
+        Removes obj from __objects if it is inside.
+        The removal is persisted on the next save().
+        """
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        with self.__lock.writing():
+            if self._remove(key) is not None:
+                self.__pending[key] = None
+
+    def columnar(self, cls):
+        """
+        Returns the ColumnarView of the objects of class cls (a class or
+        a class name), built on first use and then kept in sync with the
+        objects in memory.
+        """
+        # Imported here: NumPy is slow to import for the console commands
+        # that do not need it
+        from models.engine.columnar import ColumnarView
+
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock.writing():
+            self._hydrate(name)
+            view = self.__columnar.get(name)
+            if view is None:
+                view = ColumnarView(self._class_type(name),
+                                    self.__classes.get(name, {}).values())
+                self.__columnar[name] = view
+                self.subscribe(view.observe)
+            return view
+
+    def subscribe(self, observer):
+        """
+        Registers observer, called as observer(key, obj, name) when the
+        object obj is stored under key (name is None), when its attribute
+        name changes, and with obj None when key is removed.
+        """
+        with self.__lock.writing():
+            self.__observers.append(observer)
+
+    def unsubscribe(self, observer):
+        """
+        Stops calling observer.
+        """
+        with self.__lock.writing():
+            self.__observers.remove(observer)
+
+    def _add(self, key, obj):
+        """
+        Stores obj under key in __objects and in the per-class index.
+        """
         self.__objects[key] = obj
+        class_name = key.split('.', 1)[0]
+        self.__classes.setdefault(class_name, {})[key] = obj
+        self._index(key, obj)
+        raw = self.__raw.get(class_name)
+        if raw and key in raw:
+            del raw[key]
+        for observer in self.__observers:
+            observer(key, obj, None)
+
+    def _remove(self, key):
+        """
+        Removes key from __objects, the per-class index and the cache.
+        Returns the removed object, or None if key was not stored.
+        """
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            class_name = key.split('.', 1)[0]
+            self.__classes.get(class_name, {}).pop(key, None)
+            self.__cache.pop(key, None)
+            self._unindex(key)
+            for observer in self.__observers:
+                observer(key, None, None)
+        return obj
+
+    def _index(self, key, obj):
+        """
+        Adds obj to the secondary indexes of its class, replacing any
+        values previously indexed under key.
+        """
+        class_name = key.split('.', 1)[0]
+        fields = self.indexed_fields.get(class_name)
+        if not fields:
+            return
+        self._unindex(key)
+        indexed = {}
+        for field in fields:
+            value = getattr(obj, field, None)
+            try:
+                index = self.__values.setdefault((class_name, field), {})
+                index.setdefault(value, {})[key] = obj
+            except TypeError:
+                # Unhashable values are left out of the index
+                continue
+            indexed[field] = value
+        self.__indexed[key] = indexed
+
+    def _unindex(self, key):
+        """
+        Removes key from the secondary indexes of its class.
+        """
+        indexed = self.__indexed.pop(key, None)
+        if not indexed:
+            return
+        class_name = key.split('.', 1)[0]
+        for field, value in indexed.items():
+            matches = self.__values[(class_name, field)][value]
+            matches.pop(key, None)
+            if not matches:
+                del self.__values[(class_name, field)][value]
+
+    def touch(self, obj, name=None):
+        """
+        Marks obj as changed so that the next save() re-encodes it, and
+        reindexes it if the changed attribute name is an indexed field
+        (or if name is not given). Objects not in __objects are ignored.
+        """
+        class_name = obj.__class__.__name__
+        key = "{}.{}".format(class_name, getattr(obj, "id", None))
+        with self.__lock.writing():
+            if self.__objects.get(key) is not obj:
+                return
+            self.__pending[key] = obj
+            if name is None or name in self.indexed_fields.get(class_name, ()):
+                self._index(key, obj)
+            for observer in self.__observers:
+                observer(key, obj, name)
+
+    def _encode(self, key, obj):
+        """
+        Returns the encoded fragment of obj, re-encoding it only if it
+        changed since it was last encoded.
+        """
+        fragment = self.__cache.get(key)
+        if fragment is None or key in self.__pending:
+            fragment = self.codec.encode(obj.to_dict())
+            self.__cache[key] = fragment
+            self.encoded_count += 1
+        return fragment
+
+    def _encode_raw(self, key, obj_data):
+        """
+        Returns the encoded fragment of an object not built yet.
+        """
+        fragment = self.__cache.get(key)
+        if fragment is None:
+            fragment = self.codec.encode(obj_data)
+            self.__cache[key] = fragment
+            self.encoded_count += 1
+        return fragment
+
+    def _items(self):
+        """
+        Yields the (key, fragment) pairs of every stored object. Records
+        still mapped from a snapshot are copied as they are when the
+        snapshot format is used.
+        """
+        for key, obj in self.__objects.items():
+            yield key, self._encode(key, obj)
+        for objects in self.__raw.values():
+            if (isinstance(objects, SnapshotView)
+                    and self.codec.name == "snapshot"):
+                for key, fragment in objects.fragments():
+                    if fragment is None:
+                        fragment = self._encode_raw(key, objects[key])
+                    yield key, fragment
+                continue
+            for key, obj_data in objects.items():
+                yield key, self._encode_raw(key, obj_data)
+
+    def _use_codec(self):
+        """
+        Drops the cached fragments if they were encoded by another codec.
+        """
+        if FileStorage.__cache_codec != self.codec.name:
+            self.__cache.clear()
+            FileStorage.__cache_codec = self.codec.name
+
+    def _shard_name(self, key):
+        """
+        Returns the name of the shard file holding key: the class name,
+        followed by a hash bucket number when there are several shards
+        per class.
+        """
+        class_name, _, obj_id = key.partition('.')
+        if self.shards <= 1:
+            return class_name
+        bucket = zlib.crc32(obj_id.encode('utf-8')) % self.shards
+        return "{}.{}-{}".format(class_name, bucket, self.shards)
+
+    def _write_shards(self, names):
+        """
+        Rewrites the shard files whose names are in names from memory,
+        removing the ones left empty.
+        """
+        shards = {name: [] for name in names}
+        for class_name in {name.split('.', 1)[0] for name in names}:
+            for objects in (self.__classes.get(class_name, {}),
+                            self.__raw.get(class_name, {})):
+                for key in objects:
+                    shard = shards.get(self._shard_name(key))
+                    if shard is not None:
+                        shard.append(key)
+
+        os.makedirs(self.shard_dir, exist_ok=True)
+        for name, keys in shards.items():
+            path = os.path.join(self.shard_dir, name)
+            if not keys:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with self._open_for_write(path) as file:
+                self.codec.write_snapshot(file, self._shard_items(keys))
+
+    def _shard_items(self, keys):
+        """
+        Yields the (key, fragment) pairs of the stored objects in keys.
+        """
+        for key in keys:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                yield key, self._encode(key, obj)
+            else:
+                obj_data = self.__raw[key.split('.', 1)[0]][key]
+                yield key, self._encode_raw(key, obj_data)
+
+    @contextmanager
+    def _open_for_write(self, path):
+        """
+        Opens path for writing a whole file according to durability.
+
+        Unless durability is "none", the data is written to a temporary
+        file next to path which replaces path once complete, so that an
+        interrupted save leaves the previous file intact. With "fsync"
+        the data and the rename are also forced to disk.
+        """
+        if self.durability == "none":
+            with open(path, mode='wb') as file:
+                yield file
+            return
+
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            with open(temp_path, mode='wb') as file:
+                yield file
+                file.flush()
+                if self.durability == "fsync":
+                    os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        if self.durability == "fsync":
+            directory = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Holds the exclusive advisory lock of lock_path, waiting for other
+        processes to release it. Nested calls reuse the lock already held.
+        """
+        if self.__lock_file is not None or fcntl is None:
+            yield
+            return
+        with open(self.lock_path, mode='ab') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            self.__lock_file = lock_file
+            try:
+                yield
+            finally:
+                self.__lock_file = None
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _version(self):
+        """
+        Returns the state of the storage files: the inode, modification
+        time and size of the JSON file, of each shard file and of the
+        journal. Every save changes it, as files are either replaced or
+        appended to.
+        """
+        def state(path):
+            """
+            Returns the (inode, modification time, size) of path.
+            """
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                return None
+            return info.st_ino, info.st_mtime_ns, info.st_size
+
+        shards = ()
+        if os.path.isdir(self.shard_dir):
+            shards = tuple(
+                (name, state(os.path.join(self.shard_dir, name)))
+                for name in sorted(os.listdir(self.shard_dir))
+                )
+        return state(self.__file_path), shards, state(self.journal_path)
+
+    def _sync(self):
+        """
+        Merges the changes saved by other processes since this process
+        last read or wrote the files, keeping the pending changes of this
+        process on top of them.
+
+        When only records were appended to the journal they are replayed;
+        otherwise the objects are read again from the files, which drops
+        the ones other processes deleted.
+        """
+        version = self._version()
+        if version == self.__version:
+            return
+        pending = dict(self.__pending)
+        journal, known = version[2], None
+        if self.__version is not None and version[:2] == self.__version[:2]:
+            known = self.__version[2]
+        if journal and known and journal[0] == known[0] and \
+                journal[2] >= known[2]:
+            # Same journal file, grown by other processes
+            self._replay(known[2])
+        else:
+            if self.__observers:
+                for key in self.__objects:
+                    for observer in self.__observers:
+                        observer(key, None, None)
+            for objects in (self.__objects, self.__pending, self.__classes,
+                            self.__values, self.__indexed, self.__raw,
+                            self.__cache):
+                objects.clear()
+            self.reload()
+        for key, obj in pending.items():
+            self._remove(key)
+            self.__raw.get(key.split('.', 1)[0], {}).pop(key, None)
+            if obj is not None:
+                self._add(key, obj)
+            self.__pending[key] = obj
 
     def save(self):
         """
         Serializes __objects to the JSON file (path: __file_path).
+
+        In journal mode only the objects changed since the last save are
+        appended to the journal, and the journal is compacted once it
+        holds compact_threshold records. In sharded mode only the shard
+        files holding changed objects are rewritten.
+
+        Only objects created, deleted or touched since their last save are
+        re-encoded; attributes mutated in place (e.g. appending to a list)
+        must be followed by obj.save() or touch(obj) to be picked up.
+
+        The changes saved by other processes are merged first (see
+        _sync()); when two processes change the same object, the last
+        one to save wins.
+
+        During a batch nothing is written, and with group commit
+        (commit_delay or commit_size) the changes are only written once
+        the window is over; flush() writes them right away. In background
+        mode save() only wakes the flusher thread up, which writes them
+        once the window is over.
+
+        Raises:
+            Exception: The error of the last write of the flusher thread,
+                       if it failed. The changes are written again with
+                       the next ones.
         """
-        serialized_objects = {}
-        for key, obj in self.__objects.items():
-            serialized_objects[key] = obj.to_dict()
+        with self.__lock.writing():
+            if self.__error is not None:
+                error, self.__error = self.__error, None
+                raise error
+            if self.__batch_depth:
+                return
+            if self.background or self.commit_delay or self.commit_size:
+                if self.__deferred_since is None:
+                    self.__deferred_since = monotonic()
+                    # Nothing else writes the changes if the process
+                    # exits before the window is over
+                    atexit.unregister(self.close)
+                    atexit.register(self.close)
+                if self.background:
+                    self._start_flusher()
+                    self.__wakeup.set()
+                    return
+                if self._window_left(monotonic()) != 0:
+                    return
+            self.flush()
 
-        with open(self.__file_path, mode='w', encoding='utf-8') as file:
-            json.dump(serialized_objects, file)
+    def _window_left(self, now):
+        """
+        Returns the seconds left before the deferred changes are due: 0
+        once commit_size objects changed or commit_delay passed since the
+        first deferred change, or None if only commit_size bounds the
+        window.
+        """
+        if self.commit_size and len(self.__pending) >= self.commit_size:
+            return 0
+        if not self.commit_delay:
+            return None if self.commit_size else 0
+        return max(0, self.__deferred_since + self.commit_delay - now)
+
+    def _start_flusher(self):
+        """
+        Starts the flusher thread if it is not running (threads do not
+        survive a fork). It is stopped by close(), which save() registers
+        to run at exit.
+        """
+        if self.__flusher is None or self.__flusher_pid != os.getpid():
+            self.__wakeup = threading.Event()
+            self.__flusher = threading.Thread(
+                    target=self._flush_in_background,
+                    name="FileStorage flusher", daemon=True)
+            self.__flusher_pid = os.getpid()
+            self.__flusher.start()
+
+    def _flush_in_background(self):
+        """
+        Runs the flusher thread: waits for save() to defer changes, then
+        for the end of the group commit window, and writes them.
+        """
+        timeout = None
+        while not self.__closing:
+            self.__wakeup.wait(timeout)
+            self.__wakeup.clear()
+            with self.__lock.writing():
+                if self.__closing or self.__deferred_since is None:
+                    # Stopped, or flushed meanwhile
+                    timeout = None
+                    continue
+                timeout = self._window_left(monotonic())
+                if timeout == 0:
+                    timeout = None
+                    try:
+                        self.flush()
+                    except Exception as error:
+                        # Raised by the next save()
+                        self.__error = error
+
+    def close(self):
+        """
+        Stops the flusher thread, if any, then writes the changes deferred
+        by group commit or the flusher thread that are not written yet.
+        """
+        atexit.unregister(self.close)
+        flusher = self.__flusher
+        if flusher is not None:
+            self.__closing = True
+            self.__wakeup.set()
+            flusher.join()
+            self.__flusher = None
+            self.__closing = False
+        if self.__deferred_since is not None:
+            self.flush()
 
-    def reload(self):
+    def flush(self):
+        """
+        Writes the changes deferred by batches, group commit and the
+        flusher thread, as save() does outside of them. Nothing is
+        written if nothing changed; compact() rewrites the files anyway.
         """
-        Deserializes the JSON file to __objects.
+        with self.__lock.writing():
+            self.__deferred_since = None
+            self.__error = None
+            if not self.__pending:
+                self.encoded_count = 0
+                return
+        with self.__lock.writing(), self._locked():
+            self._sync()
+            self._write()
+            self.__version = self._version()
+
+    def begin(self):
         """
+        Starts a batch: save() writes nothing until the matching commit(),
+        so that a bulk load is written once. Batches can be nested.
+        """
+        with self.__lock.writing():
+            self.__batch_depth += 1
+
+    def commit(self):
+        """
+        Ends the batch started by the last begin(), writing its changes
+        when it is the outermost one.
+        """
+        with self.__lock.writing():
+            if self.__batch_depth:
+                self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs the with block as a batch. The changes are written when the
+        block exits, even on an exception, as they are already in memory.
+        """
+        self.begin()
         try:
-            with open(self.__file_path, mode='r', encoding='utf-8') as file:
-                data = json.load(file)
-                for key, obj_data in data.items():
-                    class_name, _ = key.split('.')
-                    module = importlib.import_module(
-                            f"models.{class_name.lower()}"
-                            if class_name != "BaseModel"
-                            else 'models.base_model'
-                            )
-
-                    class_type = getattr(module, class_name)
-                    if class_type:
-                        obj_data['created_at'] = datetime.strptime(
-                            obj_data['created_at'], '%Y-%m-%dT%H:%M:%S.%f'
-                        )
-                        obj_data['updated_at'] = datetime.strptime(
-                            obj_data['updated_at'], '%Y-%m-%dT%H:%M:%S.%f'
-                        )
-                        obj = class_type(**obj_data)
-                        # Directly update __objects dictionary
-                        self.__objects[key] = obj
+            yield self
+        finally:
+            self.commit()
+
+    def _write(self):
+        """
+        Writes the pending changes to the files of the current layout.
+        """
+        self.encoded_count = 0
+        if not self.journal:
+            if self.shards and not self.__reshard and \
+                    not os.path.exists(self.__file_path) and \
+                    not os.path.exists(self.journal_path):
+                self._use_codec()
+                self._write_shards({
+                    self._shard_name(key) for key in self.__pending
+                    })
+                self.__pending.clear()
+            else:
+                self._compact()
+            return
+
+        if not self.__pending:
+            return
+        self._use_codec()
+        with open(self.journal_path, mode='ab') as file:
+            if file.tell() == 0:
+                self.codec.start_journal(file)
+            for key, obj in self.__pending.items():
+                fragment = self._encode(key, obj) if obj is not None else None
+                self.codec.write_record(file, key, fragment)
+            if self.durability == "fsync":
+                file.flush()
+                os.fsync(file.fileno())
+        self.__journal_records += len(self.__pending)
+        self.__pending.clear()
+
+        if self.__journal_records >= self.compact_threshold:
+            self._compact()
+
+    def compact(self):
+        """
+        Rewrites the JSON file (or every shard file in sharded mode) from
+        __objects and drops the journal, whose records are now part of
+        the JSON file. Files of the other layout are removed.
+        """
+        with self.__lock.writing(), self._locked():
+            self._sync()
+            self._compact()
+            self.__version = self._version()
+
+    def _compact(self):
+        """
+        Rewrites the files of the current layout from memory.
+        """
+        self._use_codec()
+        for class_name, raw in self.__raw.items():
+            if isinstance(raw, SnapshotView) and self.durability == "none":
+                # Read the records before the mapped file is rewritten
+                self.__raw[class_name] = dict(raw.items())
+        if self.shards:
+            names = {self._shard_name(key) for key in self.__objects}
+            for objects in self.__raw.values():
+                names.update(self._shard_name(key) for key in objects)
+            self._write_shards(names)
+            for name in os.listdir(self.shard_dir):
+                if name not in names:
+                    os.remove(os.path.join(self.shard_dir, name))
+            try:
+                os.remove(self.__file_path)
+            except FileNotFoundError:
+                pass
+        else:
+            with self._open_for_write(self.__file_path) as file:
+                self.codec.write_snapshot(file, self._items())
+            if os.path.isdir(self.shard_dir):
+                for name in os.listdir(self.shard_dir):
+                    os.remove(os.path.join(self.shard_dir, name))
+                os.rmdir(self.shard_dir)
+
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self.__journal_records = 0
+        self.__reshard = False
+        self.__pending.clear()
+
+    def reload(self, classes=None):
+        """
+        Deserializes the JSON file (and the shard files, if any) to
+        __objects, then replays the journal (if any) on top of it.
+
+        If classes (an iterable of class names) is given, only the objects
+        of those classes are loaded; in sharded mode the shard files of
+        the other classes are not even read. The objects of the other
+        classes in memory may then be out of date, so the next save()
+        reads all the files again (see _sync()) rather than writing them
+        from memory.
+
+        The format of each file is detected from its header, so files
+        written with another codec are read too. A journal written with
+        another codec is compacted right away (or by the next save() when
+        only some classes were loaded) so that new records can be
+        appended to it.
+        """
+        with self.__lock.writing(), self._locked():
+            complete = classes is None or self.__version == self._version()
+            self._read(set(classes) if classes is not None else None,
+                       complete)
+            if complete:
+                self.__version = self._version()
+
+    def _read(self, classes, complete=True):
+        """
+        Loads the objects of the given class names (or all) from the
+        files, without locking them. complete tells whether every object
+        is in memory once they are loaded.
+        """
+
+        def wanted(key):
+            """
+            Returns True if the object stored under key is to be loaded.
+            """
+            return classes is None or key.split('.', 1)[0] in classes
+
+        try:
+            with open(self.__file_path, mode='rb') as file:
+                codec = detect_codec(file, self.codec)
+            if isinstance(codec, SnapshotCodec):
+                self._map_snapshot(codec, classes)
+            else:
+                for key, obj_data in iter_file(self.__file_path, codec):
+                    if wanted(key):
+                        self._load_object(key, obj_data)
+        except FileNotFoundError:
+            pass
+
+        paths = []
+        if os.path.isdir(self.shard_dir):
+            for name in sorted(os.listdir(self.shard_dir)):
+                if name.endswith(".tmp"):
+                    # Left by a save interrupted before its rename
+                    continue
+                class_name, _, bucket = name.partition('.')
+                if self.shards > 1:
+                    stale = not bucket.endswith("-{}".format(self.shards))
+                else:
+                    stale = bool(bucket)
+                if stale:
+                    # Written with another number of shards per class
+                    self.__reshard = True
+                if classes is None or class_name in classes:
+                    paths.append(os.path.join(self.shard_dir, name))
+
+        if self.workers > 1 and len(paths) > 1:
+            # Shards are decoded in worker processes and merged in order.
+            # Forked workers do not re-import models (and reload) again.
+            context = None
+            if "fork" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(self.workers, context) as executor:
+                for pairs in executor.map(read_file, paths,
+                                          repeat(self.codec.name)):
+                    for key, obj_data in pairs:
+                        self._load_object(key, obj_data)
+        else:
+            for path in paths:
+                for key, obj_data in iter_file(path, self.codec):
+                    self._load_object(key, obj_data)
+
+        self.__journal_records = 0
+        self._replay(0, wanted, complete)
+        if self.threadsafe:
+            # Reads cannot build objects, as they run at the same time
+            for class_name in list(self.__raw):
+                self._hydrate(class_name)
+
+    def _replay(self, start, wanted=None, complete=True):
+        """
+        Applies the journal records stored after offset start (or those
+        of the keys for which wanted returns True) to memory. A journal
+        written with another codec is compacted if complete, i.e. if
+        every object is in memory.
+        """
+        try:
+            with open(self.journal_path, mode='rb') as file:
+                codec = detect_codec(file, self.codec)
+                if start:
+                    file.seek(start)
+                offset = start
+                for key, obj_data, offset in codec.read_records(file):
+                    self.__journal_records += 1
+                    if wanted is not None and not wanted(key):
+                        continue
+                    if obj_data is None:
+                        self._remove(key)
+                        self.__pending.pop(key, None)
+                        self.__raw.get(key.split('.', 1)[0], {}).pop(key, None)
+                    else:
+                        self._load_object(key, obj_data)
+            if offset < os.path.getsize(self.journal_path):
+                # A torn last record left by an interrupted append
+                os.truncate(self.journal_path, offset)
+            if codec.name != self.codec.name and complete:
+                self._compact()
         except FileNotFoundError:
             pass
+
+    def _map_snapshot(self, codec, classes):
+        """
+        Memory-maps the JSON file, a compiled snapshot, and serves its
+        records (of the given class names, or all) through SnapshotViews
+        instead of decoding them: objects are built on first access.
+        """
+        snapshot = codec.open(self.__file_path)
+        for class_name in snapshot.classes:
+            if classes is not None and class_name not in classes:
+                continue
+            view = SnapshotView(snapshot, class_name, codec.decode)
+            for key in [key for key in self.__classes.get(class_name, {})
+                        if key in view]:
+                self._remove(key)
+                self.__pending.pop(key, None)
+            self.__raw[class_name] = view
+
+    def _load_object(self, key, obj_data):
+        """
+        Stores the object described by obj_data under key, replacing the
+        one in memory. In lazy mode the dictionary is kept as is and the
+        object is built on first access.
+        """
+        self._remove(key)
+        self.__pending.pop(key, None)
+        self.__cache.pop(key, None)
+        if self.lazy:
+            class_name = key.split('.', 1)[0]
+            self.__raw.setdefault(class_name, {})[key] = obj_data
+        else:
+            self._build(key, obj_data)
+
+    def _hydrate(self, class_name):
+        """
+        Builds all the objects of class_name still held as dictionaries.
+        """
+        objects = self.__raw.pop(class_name, None)
+        if objects:
+            for key, obj_data in objects.items():
+                self._build(key, obj_data)
+
+    def _build(self, key, obj_data):
+        """
+        Builds the instance described by obj_data and stores it under key.
+        """
+        class_type = self._class_type(key.split('.', 1)[0])
+        # BaseModel parses the timestamps with models.engine.timestamps
+        self._add(key, class_type(**obj_data))
+
+    def _class_type(self, class_name):
+        """
+        Returns the model class called class_name.
+        """
+        class_type = self.__class_types.get(class_name)
+        if class_type is None:
+            module = importlib.import_module(
+                    f"models.{class_name.lower()}"
+                    if class_name != "BaseModel"
+                    else 'models.base_model'
+                    )
+            class_type = getattr(module, class_name)
+            self.__class_types[class_name] = class_type
+        return class_type
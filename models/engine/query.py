@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""
+module that defines the queries of the console
+
+A query filters, sorts and projects the instances of one class:
+
+    Place.where(city_id == "c1", price_by_night >= 100)
+         .order_by(-price_by_night).limit(10).select(name, price_by_night)
+
+Each part is optional and may come in any order. The query is parsed as
+a Python expression, so values are Python literals; they are converted
+to the type of the attribute they are compared with (see models.schema).
+
+The equality conditions are handed to storage.find(), which narrows the
+candidates with its indexes (FileStorage.indexed_fields, or SQLite for
+DBStorage). The other conditions are checked on the candidates one at a
+time by generators, so that a limit without order_by stops as soon as
+enough rows matched, and order_by with a limit only keeps that many rows
+in a heap.
+"""
+import ast
+import heapq
+from itertools import islice
+from models.engine.columnar import OPERATORS
+
+PARTS = ("where", "select", "order_by", "limit")
+_OPERATORS = {
+    ast.Eq: "==", ast.NotEq: "!=",
+    ast.Lt: "<", ast.LtE: "<=",
+    ast.Gt: ">", ast.GtE: ">=",
+}
+
+
+class Query:
+    """
+    A query over the instances of one class.
+
+    Attributes:
+        class_name (str): The name of the class queried.
+        where (list): The (field, operator, value) conditions, operators
+                      being the keys of columnar.OPERATORS.
+        fields (list): The fields to show, or None for the whole objects.
+        order (tuple): The (field, descending) to sort by, or None.
+        limit (int): The number of rows to return at most, or None.
+
+    Methods:
+        run(self, storage, class_type): Yields the matching objects.
+        format(self, obj): Returns the line showing a matching object.
+    """
+
+    def __init__(self, class_name):
+        """
+        Constructor for Query
+
+        Args:
+        class_name (str): The name of the class queried.
+        """
+        self.class_name = class_name
+        self.where = []
+        self.fields = None
+        self.order = None
+        self.limit = None
+
+    def run(self, storage, class_type):
+        """
+        Yields the objects of class_type in storage matching the query,
+        in order.
+
+        Raises:
+            ValueError: If a value cannot be converted to the type of its
+                        field, or the values of the order_by field cannot
+                        be compared.
+        """
+        where = [(field, op, class_type.coerce(field, value))
+                 for field, op, value in self.where]
+        equal = {}
+        others = []
+        for field, op, value in where:
+            if op == "==" and field not in equal:
+                equal[field] = value
+            else:
+                others.append((field, op, value))
+        if equal:
+            candidates = storage.find(class_type, **equal).values()
+        else:
+            candidates = storage.all(class_type).values()
+        rows = (obj for obj in candidates if self._matches(obj, others))
+
+        if self.order is None:
+            yield from islice(rows, self.limit)
+            return
+        field, descending = self.order
+
+        def key(obj):
+            """
+            Returns the sort key of obj: missing values go last.
+            """
+            value = getattr(obj, field, None)
+            if value is None:
+                return (not descending,)
+            return descending, value
+
+        try:
+            if self.limit is None:
+                rows = sorted(rows, key=key, reverse=descending)
+            elif descending:
+                rows = heapq.nlargest(self.limit, rows, key=key)
+            else:
+                rows = heapq.nsmallest(self.limit, rows, key=key)
+        except TypeError:
+            raise ValueError(
+                    "{} values cannot be compared".format(field)) from None
+        yield from rows
+
+    def _matches(self, obj, conditions):
+        """
+        Returns True if obj meets all the (field, operator, value)
+        conditions. Values that cannot be compared do not match.
+        """
+        for field, op, value in conditions:
+            try:
+                if not OPERATORS[op](getattr(obj, field), value):
+                    return False
+            except (AttributeError, TypeError):
+                return False
+        return True
+
+    def format(self, obj):
+        """
+        Returns the line showing obj: its string representation, limited
+        to the selected fields if any.
+        """
+        if self.fields is None:
+            return str(obj)
+        obj_dict = obj.__dict__
+        return "[{}] ({}) {}".format(
+                self.class_name, obj.id,
+                {field: obj_dict[field] for field in self.fields
+                 if field in obj_dict})
+
+
+def _field(node, part):
+    """
+    Returns the field named by node: a name or a string.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    raise ValueError("{}() expects field names".format(part))
+
+
+def _condition(node):
+    """
+    Returns the (field, operator, value) of a where() comparison node.
+    """
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1 or \
+            type(node.ops[0]) not in _OPERATORS:
+        raise ValueError(
+            "where() expects conditions like field == value, using {}"
+            .format(", ".join(_OPERATORS.values())))
+    try:
+        value = ast.literal_eval(node.comparators[0])
+    except ValueError:
+        raise ValueError("where() expects literal values") from None
+    return _field(node.left, "where"), _OPERATORS[type(node.ops[0])], value
+
+
+def parse_query(line):
+    """
+    Returns the Query of line, <class name>.<part>(...)[.<part>(...)...]
+    where each part is one of PARTS.
+
+    Raises:
+        ValueError: If line is not a valid query.
+    """
+    try:
+        node = ast.parse(line.strip(), mode="eval").body
+    except SyntaxError:
+        raise ValueError("invalid query syntax") from None
+    parts = []
+    while isinstance(node, ast.Call) and \
+            isinstance(node.func, ast.Attribute):
+        parts.append(node)
+        node = node.func.value
+    if not isinstance(node, ast.Name) or not parts:
+        raise ValueError("invalid query syntax")
+
+    query = Query(node.id)
+    for call in reversed(parts):
+        part = call.func.attr
+        if part not in PARTS:
+            raise ValueError("unknown query part {}() (use {})".format(
+                part, ", ".join(PARTS)))
+        if call.keywords:
+            raise ValueError("{}() takes no keywords".format(part))
+        if part == "where":
+            query.where.extend(_condition(arg) for arg in call.args)
+        elif part == "select":
+            query.fields = [_field(arg, part) for arg in call.args]
+        elif part == "order_by":
+            if len(call.args) != 1:
+                raise ValueError("order_by() expects one field")
+            arg, descending = call.args[0], False
+            if isinstance(arg, ast.UnaryOp) and \
+                    isinstance(arg.op, ast.USub):
+                arg, descending = arg.operand, True
+            query.order = (_field(arg, part), descending)
+        else:
+            try:
+                (limit,) = [ast.literal_eval(arg) for arg in call.args]
+            except ValueError:
+                limit = None
+            if type(limit) is not int or limit < 0:
+                raise ValueError("limit() expects a number of rows")
+            query.limit = limit
+    return query
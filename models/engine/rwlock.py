@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""
+module that defines the RWLock class
+
+A readers-writer lock lets many threads read the objects in storage at
+once while changes are made by one thread at a time. NullLock has the
+same interface and does no locking, for storages used by one thread.
+"""
+import os
+import threading
+import weakref
+from contextlib import contextmanager, nullcontext
+
+_locks = weakref.WeakSet()
+
+
+class RWLock:
+    """
+    A readers-writer lock: many threads can hold it for reading at once,
+    or one thread for writing.
+
+    Waiting writers go before new readers, so that a steady flow of
+    readers cannot starve them. The thread holding the lock for writing
+    can take it again for reading or writing, and a thread reading can
+    read again, but it cannot start writing.
+
+    In a forked process, the holds of the threads that did not survive
+    the fork are dropped.
+
+    Attributes:
+        __condition (threading.Condition): Guards the counters below.
+        __readers (int): Number of reads in progress.
+        __writer (int): Identifier of the writing thread, or None.
+        __depth (int): Number of nested holds of the writing thread.
+        __waiting (int): Number of threads waiting to write.
+        __local (threading.local): The number of reads of each thread.
+
+    Methods:
+        reading(self): Context manager holding the lock for reading.
+        writing(self): Context manager holding the lock for writing.
+        after_fork(self): Drops the holds of the threads lost by a fork.
+    """
+
+    def __init__(self):
+        """
+        Constructor for RWLock
+        """
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__depth = 0
+        self.__waiting = 0
+        self.__local = threading.local()
+        _locks.add(self)
+
+    @contextmanager
+    def reading(self):
+        """
+        Holds the lock for reading, waiting for the writing thread and the
+        waiting writers (unless this thread already holds the lock).
+        """
+        if self.__writer == threading.get_ident():
+            yield
+            return
+        reads = getattr(self.__local, "reads", 0)
+        with self.__condition:
+            if not reads:
+                while self.__writer is not None or self.__waiting:
+                    self.__condition.wait()
+            self.__readers += 1
+        self.__local.reads = reads + 1
+        try:
+            yield
+        finally:
+            self.__local.reads = reads
+            with self.__condition:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """
+        Holds the lock for writing, waiting for the reads in progress.
+
+        Raises:
+            RuntimeError: If this thread holds the lock for reading, as
+                          it would wait for itself.
+        """
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__writer != me:
+                if getattr(self.__local, "reads", 0):
+                    raise RuntimeError("cannot write while reading")
+                self.__waiting += 1
+                try:
+                    while self.__writer is not None or self.__readers:
+                        self.__condition.wait()
+                finally:
+                    self.__waiting -= 1
+                self.__writer = me
+            self.__depth += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__depth -= 1
+                if not self.__depth:
+                    self.__writer = None
+                    self.__condition.notify_all()
+
+    def after_fork(self):
+        """
+        Drops the holds of the threads lost by a fork, in the child
+        process: only the thread that forked is left.
+        """
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = getattr(self.__local, "reads", 0)
+        if self.__writer != threading.get_ident():
+            self.__writer = None
+            self.__depth = 0
+        self.__waiting = 0
+
+
+class NullLock:
+    """
+    A lock with the interface of RWLock that does not lock.
+
+    Methods:
+        reading(self): Returns a context manager doing nothing.
+        writing(self): Returns a context manager doing nothing.
+    """
+    __context = nullcontext()
+
+    def reading(self):
+        """
+        Returns a context manager doing nothing.
+        """
+        return self.__context
+
+    def writing(self):
+        """
+        Returns a context manager doing nothing.
+        """
+        return self.__context
+
+
+def _after_fork():
+    """
+    Resets the locks of a forked process.
+    """
+    for lock in list(_locks):
+        lock.after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
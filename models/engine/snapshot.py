@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+"""
+module that defines the compiled snapshot file layout
+
+A snapshot holds encoded records sorted by key behind a fixed size
+index, so that it can be memory-mapped and queried without being parsed:
+
+    header                      (given by the caller)
+    number of classes           (u32)
+    per class, sorted by name:  name length (u16), name, first index
+                                position (u32), number of records (u32)
+    number of records           (u32)
+    index, sorted by key:       record offset (u64), key length (u32),
+                                value length (u32)
+    records:                    key bytes followed by value bytes
+
+Looking up a key is a binary search over the index entries of its class,
+and counting the objects of a class only reads the class table.
+"""
+import mmap
+import struct
+from collections.abc import MutableMapping
+
+_COUNT = struct.Struct(">I")
+_NAME = struct.Struct(">H")
+_CLASS = struct.Struct(">II")
+_ENTRY = struct.Struct(">QII")
+
+
+def write(file, header, items):
+    """
+    Writes the (key, fragment) pairs of items to the binary file as a
+    snapshot starting with header.
+    """
+    records = sorted(
+        (tuple(key.split('.', 1)), fragment) for key, fragment in items
+        )
+    classes = {}
+    for position, ((class_name, _), _) in enumerate(records):
+        first, count = classes.get(class_name, (position, 0))
+        classes[class_name] = (first, count + 1)
+
+    table = [_COUNT.pack(len(classes))]
+    for class_name, (first, count) in classes.items():
+        name = class_name.encode('utf-8')
+        table.extend((_NAME.pack(len(name)), name, _CLASS.pack(first, count)))
+    table.append(_COUNT.pack(len(records)))
+    table = b"".join(table)
+
+    offset = len(header) + len(table) + _ENTRY.size * len(records)
+    keys = []
+    index = []
+    for (class_name, obj_id), fragment in records:
+        key = "{}.{}".format(class_name, obj_id).encode('utf-8')
+        keys.append(key)
+        index.append(_ENTRY.pack(offset, len(key), len(fragment)))
+        offset += len(key) + len(fragment)
+
+    file.write(header)
+    file.write(table)
+    file.write(b"".join(index))
+    for key, (_, fragment) in zip(keys, records):
+        file.write(key)
+        file.write(fragment)
+
+
+class Snapshot:
+    """
+    Read access to a snapshot held in a buffer (usually a memory map).
+
+    Attributes:
+        classes (dict): Class name -> (first index position, count).
+    """
+
+    def __init__(self, buffer, header_size):
+        """
+        Constructor for Snapshot
+
+        Args:
+        buffer: The bytes-like snapshot, header included.
+        header_size (int): Length of the header written before the table.
+        """
+        self.__buffer = buffer
+        position = header_size
+        class_count, = _COUNT.unpack_from(buffer, position)
+        position += _COUNT.size
+        self.classes = {}
+        for _ in range(class_count):
+            length, = _NAME.unpack_from(buffer, position)
+            position += _NAME.size
+            name = bytes(buffer[position:position + length]).decode('utf-8')
+            position += length
+            self.classes[name] = _CLASS.unpack_from(buffer, position)
+            position += _CLASS.size
+        self.__count, = _COUNT.unpack_from(buffer, position)
+        self.__index = position + _COUNT.size
+
+    @classmethod
+    def open(cls, path, header_size):
+        """
+        Returns the Snapshot of the file at path, memory-mapped read only.
+        """
+        with open(path, mode='rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, header_size)
+
+    def __len__(self):
+        """
+        Returns the number of records.
+        """
+        return self.__count
+
+    def key_at(self, position):
+        """
+        Returns the key of the record at index position.
+        """
+        offset, key_size, _ = _ENTRY.unpack_from(
+            self.__buffer, self.__index + _ENTRY.size * position)
+        return bytes(self.__buffer[offset:offset + key_size]).decode('utf-8')
+
+    def value_at(self, position):
+        """
+        Returns the encoded value of the record at index position.
+        """
+        offset, key_size, value_size = _ENTRY.unpack_from(
+            self.__buffer, self.__index + _ENTRY.size * position)
+        offset += key_size
+        return bytes(self.__buffer[offset:offset + value_size])
+
+    def find(self, key):
+        """
+        Returns the index position of key, or None if it is not stored.
+        """
+        first, count = self.classes.get(key.split('.', 1)[0], (0, 0))
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = self.key_at(middle)
+            if middle_key == key:
+                return middle
+            if middle_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def items(self):
+        """
+        Yields the (key, encoded value) pairs of every record.
+        """
+        for position in range(self.__count):
+            yield self.key_at(position), self.value_at(position)
+
+
+class SnapshotView(MutableMapping):
+    """
+    The {key: dictionary} mapping of the records of one class of a
+    snapshot. Records are decoded when they are read; removed keys and
+    added dictionaries are kept aside, the snapshot is never modified.
+    """
+
+    def __init__(self, snapshot, class_name, decode):
+        """
+        Constructor for SnapshotView
+
+        Args:
+        snapshot (Snapshot): The snapshot holding the records.
+        class_name (str): The class whose records are viewed.
+        decode (callable): Turns an encoded value into a dictionary.
+        """
+        self.__snapshot = snapshot
+        self.__prefix = class_name + "."
+        self.__first, self.__count = snapshot.classes.get(class_name, (0, 0))
+        self.__decode = decode
+        self.__removed = set()
+        self.__added = {}
+
+    def _position(self, key):
+        """
+        Returns the index position of key if it is still in the view.
+        """
+        if key in self.__removed or not key.startswith(self.__prefix):
+            return None
+        return self.__snapshot.find(key)
+
+    def __getitem__(self, key):
+        """
+        Returns the dictionary stored under key.
+        """
+        if key in self.__added:
+            return self.__added[key]
+        position = self._position(key)
+        if position is None:
+            raise KeyError(key)
+        return self.__decode(self.__snapshot.value_at(position))
+
+    def __contains__(self, key):
+        """
+        Returns True if key is in the view, without decoding it.
+        """
+        return key in self.__added or self._position(key) is not None
+
+    def __setitem__(self, key, obj_data):
+        """
+        Stores obj_data under key, hiding the record of the snapshot.
+        """
+        if self._position(key) is not None:
+            self.__removed.add(key)
+        self.__added[key] = obj_data
+
+    def __delitem__(self, key):
+        """
+        Removes key from the view.
+        """
+        if key in self.__added:
+            del self.__added[key]
+        elif self._position(key) is not None:
+            self.__removed.add(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        """
+        Yields the keys of the view.
+        """
+        for position in range(self.__first, self.__first + self.__count):
+            key = self.__snapshot.key_at(position)
+            if key not in self.__removed:
+                yield key
+        yield from list(self.__added)
+
+    def __len__(self):
+        """
+        Returns the number of keys in the view.
+        """
+        return self.__count - len(self.__removed) + len(self.__added)
+
+    def items(self):
+        """
+        Yields the (key, dictionary) pairs in index order, without looking
+        each key up again.
+        """
+        for position in range(self.__first, self.__first + self.__count):
+            key = self.__snapshot.key_at(position)
+            if key not in self.__removed:
+                yield key, self.__decode(self.__snapshot.value_at(position))
+        yield from list(self.__added.items())
+
+    def fragments(self):
+        """
+        Yields the (key, encoded value) pairs in index order without
+        decoding them; the value is None for the dictionaries added since
+        the snapshot was written, which have no encoded value.
+        """
+        for position in range(self.__first, self.__first + self.__count):
+            key = self.__snapshot.key_at(position)
+            if key not in self.__removed:
+                yield key, self.__snapshot.value_at(position)
+        for key in list(self.__added):
+            yield key, None
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+"""
+module that defines the codec used for the created_at and updated_at
+timestamps by BaseModel and the storage engines
+"""
+from datetime import datetime
+
+
+def parse_datetime(value):
+    """
+    Returns the datetime encoded in value, an ISO 8601 string such as the
+    ones written by BaseModel.to_dict().
+
+    datetime.fromisoformat is implemented in C and is much faster than
+    datetime.strptime; it also accepts timestamps without microseconds,
+    which isoformat() writes when the microsecond is 0.
+    """
+    return datetime.fromisoformat(value)
+
+
+def format_datetime(value):
+    """
+    Returns the ISO 8601 string of the datetime value.
+    """
+    return value.isoformat()
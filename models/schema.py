@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""
+module that defines the field types of the models and their coercers
+
+The fields of a model are the attributes it declares as class
+attributes, and the type of each field is the type of its default value
+(Place.number_rooms = 0 makes number_rooms an int). ModelType builds the
+table of the coercer of each field once per class, so that converting a
+value (e.g. a string typed in the console) is one dictionary lookup and
+one call.
+"""
+import json
+
+
+def _expected(kind, value):
+    """
+    Returns the ValueError raised when value cannot become a kind.
+    """
+    return ValueError("expected {}, got {!r}".format(kind.__name__, value))
+
+
+def to_int(value):
+    """
+    Returns value as an int: ints are kept, strings are parsed and floats
+    without a fractional part are converted.
+    """
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    elif type(value) is float and value.is_integer():
+        return int(value)
+    raise _expected(int, value)
+
+
+def to_float(value):
+    """
+    Returns value as a float: floats are kept, ints are converted and
+    strings are parsed.
+    """
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise _expected(float, value)
+
+
+def to_str(value):
+    """
+    Returns value if it is a string.
+    """
+    if isinstance(value, str):
+        return value
+    raise _expected(str, value)
+
+
+def _to_container(kind):
+    """
+    Returns the coercer of kind (list or dict): values of that type are
+    kept and strings are parsed as JSON.
+    """
+    def coerce(value):
+        """
+        Returns value as a {}.
+        """
+        if type(value) is kind:
+            return value
+        if isinstance(value, str):
+            try:
+                parsed = json.loads(value)
+            except ValueError:
+                pass
+            else:
+                if type(parsed) is kind:
+                    return parsed
+        raise _expected(kind, value)
+
+    coerce.__doc__ = coerce.__doc__.format(kind.__name__)
+    return coerce
+
+
+COERCERS = {
+    int: to_int,
+    float: to_float,
+    str: to_str,
+    list: _to_container(list),
+    dict: _to_container(dict),
+}
+
+
+def field_types(defaults):
+    """
+    Returns the {name: type} of the fields whose defaults are given as a
+    {name: default} dictionary.
+    """
+    return {name: type(default) for name, default in defaults.items()}
+
+
+def coercer_table(defaults):
+    """
+    Returns the {name: coercer} of the fields whose defaults are given as
+    a {name: default} dictionary. Fields of other types have none.
+    """
+    return {
+        name: COERCERS[type(default)] for name, default in defaults.items()
+        if type(default) in COERCERS
+        }
@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+"""
+module that defines the network server of the command interpreter
+
+The server accepts the commands of the console (create, show, update,
+<class_name>.all(), ...) from many clients at once over TCP or a Unix
+socket, one command per line. Every client shares the storage loaded
+once by the server process, and the output of each command is sent back
+followed by the prompt, which clients can wait for to know the command
+is done. import and export are not available, as they would let clients
+read and write the files of the server.
+
+Commands run one at a time in the event loop, so they never see each
+other's changes half done. Their saves are not written right away: the
+server keeps the storage in a batch and a single writer task flushes the
+changes interval seconds after the first one, so that the changes of
+many commands are written at once.
+
+Usage: ./server.py [--host HOST] [--port PORT] [--unix PATH]
+                   [--interval MS]
+"""
+import argparse
+import asyncio
+import io
+import signal
+import sys
+from contextlib import redirect_stdout
+from console import HBNBCommand
+from models import storage
+
+
+class ServerCommand(HBNBCommand):
+    """
+    Command interpreter of one server client.
+
+    Methods:
+    - do_quit(arg): Closes the connection.
+    - do_EOF(arg): Closes the connection.
+    - do_begin(arg): Not available, as the server batches the changes.
+    - do_commit(arg): Not available, as the server batches the changes.
+    - do_import(arg): Not available, as clients cannot use server files.
+    - do_export(arg): Not available, as clients cannot use server files.
+    """
+
+    def do_quit(self, arg):
+        """
+        Quit command to close the connection
+        """
+        if arg.strip() == "":
+            return True
+        print("** Invalid command for quit. Type 'quit' to exit.")
+        return False
+
+    def do_EOF(self, _):
+        """
+        EOF command to close the connection
+        """
+        return True
+
+    def do_begin(self, _):
+        """
+        Not available on the server, which writes the changes of all the
+        clients at once.
+        """
+        print("** batches are not available on the server **")
+
+    do_commit = do_begin
+
+    def do_import(self, _):
+        """
+        Not available on the server: clients could read, or with export
+        overwrite, any file the server process can access.
+        """
+        print("** import and export are not available on the server **")
+
+    do_export = do_import
+
+
+class HBNBServer:
+    """
+    Network front-end of the command interpreter.
+
+    Attributes:
+        interval (float): Seconds the writer waits after a change before
+                          flushing the storage.
+        prompt (str): Sent after the output of each command.
+        line_limit (int): Longest command line accepted, in bytes.
+        clients (int): Number of connected clients.
+        __changed (asyncio.Event): Set when a command left changes to
+                                   write.
+        __writer (asyncio.Task): The writer task.
+
+    Methods:
+        execute(self, command, line): Runs a command line and returns its
+                                      output and whether to disconnect.
+        start(self, host, port, path): Starts listening and writing.
+        close(self): Stops writing, after writing the last changes.
+        serve(self, host, port, path): Serves clients until cancelled.
+    """
+    prompt = HBNBCommand.prompt
+    line_limit = 2 ** 20
+
+    def __init__(self, interval=0.05):
+        """
+        Constructor for HBNBServer
+
+        Args:
+        interval (float): Seconds the changes may wait before the writer
+                          flushes them.
+        """
+        self.interval = interval
+        self.clients = 0
+        self.__changed = None
+        self.__writer = None
+
+    def execute(self, command, line):
+        """
+        Runs line with the ServerCommand command and returns what it
+        printed, and whether the client asked to quit.
+        """
+        output = io.StringIO()
+        command.stdout = output
+        with redirect_stdout(output):
+            try:
+                stop = command.onecmd(line)
+            except Exception as e:
+                print("** {}".format(e))
+                stop = False
+        if storage.dirty:
+            self.__changed.set()
+        return output.getvalue(), stop
+
+    async def _handle(self, reader, writer):
+        """
+        Serves one client: runs each line it sends as a command.
+        """
+        self.clients += 1
+        command = ServerCommand()
+        try:
+            writer.write(self.prompt.encode())
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b"** line too long **\n")
+                    break
+                if not line:
+                    break
+                output, stop = self.execute(
+                        command,
+                        line.decode("utf-8", "replace").rstrip("\r\n"))
+                writer.write(output.encode())
+                if stop:
+                    break
+                writer.write(self.prompt.encode())
+                await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _write_changes(self):
+        """
+        Flushes the storage interval seconds after a command changed it,
+        so that the changes of the commands run meanwhile are written
+        with it.
+        """
+        while True:
+            await self.__changed.wait()
+            await asyncio.sleep(self.interval)
+            self.__changed.clear()
+            try:
+                storage.flush()
+            except Exception as e:
+                # The changes are kept and written with the next ones
+                print("** could not save: {}".format(e), file=sys.stderr)
+
+    async def start(self, host=None, port=0, path=None):
+        """
+        Starts the writer and returns the asyncio server listening on the
+        Unix socket path if given, or on host and port.
+        """
+        self.__changed = asyncio.Event()
+        storage.begin()
+        self.__writer = asyncio.create_task(self._write_changes())
+        if path is not None:
+            return await asyncio.start_unix_server(
+                    self._handle, path, limit=self.line_limit)
+        return await asyncio.start_server(
+                self._handle, host, port, limit=self.line_limit)
+
+    async def close(self):
+        """
+        Stops the writer, then writes the changes left.
+        """
+        self.__writer.cancel()
+        try:
+            await self.__writer
+        except asyncio.CancelledError:
+            pass
+        storage.commit()
+
+    async def serve(self, host=None, port=0, path=None):
+        """
+        Serves clients until cancelled (e.g. by Ctrl-C or SIGTERM), then
+        writes the changes left.
+        """
+        server = await self.start(host, port, path)
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass
+        try:
+            for sock in server.sockets:
+                print("Listening on {}".format(sock.getsockname()))
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+            description="Serves the console commands over the network.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--unix", metavar="PATH",
+                        help="listen on a Unix socket instead")
+    parser.add_argument("--interval", type=int, default=50, metavar="MS",
+                        help="milliseconds changes wait to be written")
+    options = parser.parse_args()
+    try:
+        asyncio.run(HBNBServer(options.interval / 1000).serve(
+            options.host, options.port, options.unix))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
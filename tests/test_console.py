@@ -0,0 +1,416 @@
+#!/usr/bin/python3
+"""
+Unittest for the console module (HBNBCommand Class)
+"""
+import unittest
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.user import User
+from models.place import Place
+from models import storage
+
+
+class TestHBNBCommand(unittest.TestCase):
+    """
+    Test case class for the command interpreter.
+
+    Methods:
+        setUp(self): Set up a clean environment before each test.
+        tearDown(self): Clean up the environment after each test.
+        run_command(self, line): Runs a console command and returns
+                                 what it printed.
+        test_show(self): Test the show command.
+        test_destroy(self): Test the destroy command.
+        test_all(self): Test the all command.
+        test_all_pages(self): Test listing instances by page and as
+                              NDJSON.
+        test_count(self): Test the count command.
+        test_update_types(self): Test that update converts declared
+                                 attributes to their type.
+        test_update_many(self): Test updating several attributes with one
+                                command.
+        test_begin_commit(self): Test saving a batch of commands at once.
+        test_import_export(self): Test the import and export commands.
+        test_stats(self): Test the stats command.
+        test_query(self): Test the where, select, order_by and limit
+                          queries.
+        test_read_only_session(self): Test that a session changing
+                                      nothing leaves the file as is.
+    """
+    def setUp(self):
+        """
+        Set up a clean environment before each test.
+        """
+        storage.reload()
+        self.user = User()
+        self.user.save()
+
+    def tearDown(self):
+        """
+        Clean up the environment after each test.
+        """
+        try:
+            os.remove("file.json")
+        except FileNotFoundError:
+            pass
+
+    def run_command(self, line):
+        """
+        Runs a console command and returns what it printed.
+        """
+        with patch('sys.stdout', new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue().strip()
+
+    def test_show(self):
+        """
+        Test the show command.
+        """
+        self.assertEqual(
+                self.run_command("show User {}".format(self.user.id)),
+                str(self.user)
+                )
+        self.assertEqual(
+                self.run_command('User.show("{}")'.format(self.user.id)),
+                str(self.user)
+                )
+        self.assertEqual(
+                self.run_command("show BaseModel {}".format(self.user.id)),
+                "** no instance found **"
+                )
+        self.assertEqual(
+                self.run_command("show Unknown 1"),
+                "** class doesn't exist **"
+                )
+        self.assertEqual(
+                self.run_command("User.show()"),
+                "** instance id missing **"
+                )
+
+    def test_destroy(self):
+        """
+        Test the destroy command.
+        """
+        self.run_command("destroy User {}".format(self.user.id))
+        self.assertIsNone(storage.get(User, self.user.id))
+        self.assertEqual(
+                self.run_command("destroy User {}".format(self.user.id)),
+                "** no instance found **"
+                )
+        self.assertEqual(
+                self.run_command("User.destroy()"),
+                "** instance id missing **"
+                )
+
+    def test_all(self):
+        """
+        Test the all command.
+        """
+        output = self.run_command("all User")
+        self.assertIn(str(self.user), output)
+        self.assertNotIn("[BaseModel]", output)
+        self.assertEqual(
+                self.run_command("all Unknown"),
+                "** class doesn't exist **"
+                )
+
+    def test_all_pages(self):
+        """
+        Test listing instances by page and as NDJSON.
+        """
+        self.assertEqual(
+                self.run_command("all User"),
+                str([str(obj) for obj in storage.all(User).values()]))
+        users = [User(id="page-{}".format(i), created_at=self.user.created_at,
+                      updated_at=self.user.updated_at) for i in range(5)]
+        for user in users:
+            storage.new(user)
+        after = "--cursor User.page-"
+        self.assertEqual(
+                self.run_command("all User --limit 2 " + after),
+                "{}\n** next cursor: User.page-1 **".format(
+                    [str(users[0]), str(users[1])]))
+        self.assertEqual(
+                self.run_command("all User --limit 2 --cursor User.page-1"),
+                "{}\n** next cursor: User.page-3 **".format(
+                    [str(users[2]), str(users[3])]))
+        self.assertEqual(
+                self.run_command("all User --limit=2 --page=3 " + after),
+                str([str(users[4])]))
+        self.assertEqual(self.run_command("all User " + after),
+                         str([str(user) for user in users]))
+        lines = self.run_command(
+                "all User --limit 2 --format ndjson " + after).split("\n")
+        self.assertEqual([json.loads(line) for line in lines],
+                         [users[0].to_dict(), users[1].to_dict(),
+                          {"next_cursor": "User.page-1"}])
+        self.assertEqual(self.run_command("all User --page 2"),
+                         "** --page needs --limit **")
+        self.assertEqual(self.run_command("all User --limit -1"),
+                         "** --limit and --page need whole numbers **")
+        self.assertEqual(self.run_command("all --sort id"),
+                         "** unknown option --sort **")
+        self.assertEqual(self.run_command("all User --format xml"),
+                         "** unknown format (use list or ndjson) **")
+        for user in users:
+            storage.delete(user)
+        storage.save()
+
+    def test_count(self):
+        """
+        Test the count command.
+        """
+        self.assertEqual(
+                self.run_command("count User"),
+                str(len(storage.all(User)))
+                )
+        self.assertEqual(
+                self.run_command("User.count()"),
+                str(len(storage.all(User)))
+                )
+
+    def test_update_types(self):
+        """
+        Test that update converts declared attributes to their type.
+        """
+        place = Place()
+        place.save()
+        self.run_command("update Place {} number_rooms 3".format(place.id))
+        self.run_command("update Place {} latitude 1.5".format(place.id))
+        self.run_command('Place.update("{}", "max_guest", "4")'.format(
+            place.id))
+        self.run_command("update Place {} pets yes".format(place.id))
+        self.assertEqual(place.number_rooms, 3)
+        self.assertEqual(place.latitude, 1.5)
+        self.assertEqual(place.max_guest, 4)
+        self.assertEqual(place.pets, "yes")
+        self.assertEqual(
+                self.run_command(
+                    "update Place {} max_guest many".format(place.id)),
+                "** max_guest: expected int, got 'many'")
+        self.assertEqual(place.max_guest, 4)
+        storage.delete(place)
+        storage.save()
+
+    def test_update_many(self):
+        """
+        Test updating several attributes with one command.
+        """
+        place = Place()
+        place.save()
+        with patch.object(Place, "save", autospec=True,
+                          side_effect=Place.save) as save:
+            self.run_command(
+                    'Place.update("{}", {{"name": "Loft, big.", '
+                    '"max_guest": "4", "latitude": 1}})'.format(place.id))
+            self.assertEqual(save.call_count, 1)
+            self.run_command(
+                    'Place.update({}, "description", "a (nice) place", '
+                    '"number_rooms", 2)'.format(place.id))
+            self.assertEqual(save.call_count, 2)
+            self.run_command(
+                    'update Place {} {{"price_by_night": 80}}'.format(
+                        place.id))
+            self.run_command(
+                    "update Place {} number_bathrooms 1 city_id c1".format(
+                        place.id))
+            self.assertEqual(save.call_count, 4)
+            self.assertEqual(
+                    self.run_command(
+                        'Place.update("{}", "max_guest", "many", '
+                        '"name", "other")'.format(place.id)),
+                    "** max_guest: expected int, got 'many'")
+            self.assertEqual(save.call_count, 4)
+        self.assertEqual(place.name, "Loft, big.")
+        self.assertEqual(place.max_guest, 4)
+        self.assertEqual(place.latitude, 1.0)
+        self.assertEqual(place.description, "a (nice) place")
+        self.assertEqual(place.number_rooms, 2)
+        self.assertEqual(place.price_by_night, 80)
+        self.assertEqual(place.number_bathrooms, 1)
+        self.assertEqual(place.city_id, "c1")
+        self.assertEqual(
+                self.run_command('Place.update("{}", "name")'.format(
+                    place.id)),
+                "** value missing **")
+        self.assertEqual(
+                self.run_command(
+                    "update Place {} number_rooms 5 extra".format(place.id)),
+                "** value missing **")
+        self.assertEqual(place.number_rooms, 2)
+        self.run_command("Place.update({}, name, Loft, city_id, {})".format(
+            place.id, place.id))
+        self.assertEqual(place.name, "Loft")
+        self.assertEqual(place.city_id, place.id)
+        self.run_command("Place.update({}, max_guest, 6)".format(place.id))
+        self.assertEqual(place.max_guest, 6)
+        self.assertEqual(self.run_command("Unknown.update(\"x\", {})"),
+                         "** class doesn't exist **")
+        self.assertEqual(
+                self.run_command('Place.update("{}", {{"a": }})'.format(
+                    place.id)),
+                '*** Unknown syntax: Place.update("{}", {{"a": }})'.format(
+                    place.id))
+        self.assertEqual(self.run_command("Place.rename()"),
+                         "*** Unknown syntax: Place.rename()")
+        storage.delete(place)
+        storage.save()
+
+    def test_begin_commit(self):
+        """
+        Test saving a batch of commands at once.
+        """
+        self.assertEqual(self.run_command("commit"), "** no batch started **")
+        storage.flush()  # Leave the flusher thread nothing to write
+        with patch.object(storage, "flush", wraps=storage.flush) as flush:
+            self.run_command("begin")
+            self.assertEqual(self.run_command("begin"),
+                             "** batch already started **")
+            user_id = self.run_command("create User")
+            self.run_command(
+                    'update User {} first_name "Betty"'.format(user_id))
+            self.assertEqual(flush.call_count, 0)
+            self.run_command("commit")
+            self.assertEqual(flush.call_count, 1)
+        self.assertEqual(storage.get(User, user_id).first_name, "Betty")
+
+    def test_import_export(self):
+        """
+        Test the import and export commands.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "users.csv")
+        self.assertRegex(self.run_command("export User " + path),
+                         r"^\d+ rows in [\d.]+ s \(\d+ rows/s\)$")
+        self.run_command("destroy User {}".format(self.user.id))
+        self.assertIn("rows/s", self.run_command("import User " + path))
+        self.assertEqual(storage.get(User, self.user.id).to_dict(),
+                         self.user.to_dict())
+
+        with open(path, mode="w", encoding="utf-8") as file:
+            file.write('{"first_name": 1}\n')
+        self.assertEqual(
+                self.run_command("import User {} ndjson".format(path)),
+                "** row 1: first_name: expected str, got 1")
+        self.assertEqual(self.run_command("import User {} xml".format(path)),
+                         "** unknown format (use ndjson or csv) **")
+        self.assertEqual(self.run_command("import User"),
+                         "** file name missing **")
+        self.assertEqual(self.run_command("export Unknown " + path),
+                         "** class doesn't exist **")
+
+    def test_stats(self):
+        """
+        Test the stats command.
+        """
+        places = []
+        for city, price in (("stats-a", 100), ("stats-a", 200),
+                            ("stats-b", 50)):
+            place = Place()
+            place.city_id = city
+            place.price_by_night = price
+            place.save()
+            places.append(place)
+        self.assertEqual(
+                self.run_command("stats Place sum price_by_night "
+                                 "where city_id == stats-a"),
+                "300.0")
+        self.assertIn(
+                "stats-a: 150.0\nstats-b: 50.0",
+                self.run_command("stats Place avg price_by_night by city_id"))
+        self.assertEqual(
+                self.run_command("stats Place count where city_id == stats-b "
+                                 "price_by_night > 10"),
+                "1")
+        self.assertEqual(self.run_command("stats Unknown count"),
+                         "** class doesn't exist **")
+        self.assertEqual(self.run_command("stats Place median"),
+                         "** function missing (use count, sum, avg, min, "
+                         "max) **")
+        self.assertEqual(self.run_command("stats Place sum city_id"),
+                         "** no number column city_id in Place")
+        self.assertEqual(self.run_command("stats Place count where x"),
+                         "** invalid syntax near: x **")
+        for place in places:
+            storage.delete(place)
+        storage.save()
+
+
+    def test_query(self):
+        """
+        Test the where, select, order_by and limit queries.
+        """
+        places = []
+        for name, price in (("Query a", 30), ("Query b", 10),
+                            ("Query c", 20)):
+            place = Place()
+            place.name = name
+            place.price_by_night = price
+            place.save()
+            places.append(place)
+        self.assertEqual(
+                self.run_command(
+                    'Place.where(name >= "Query", price_by_night > 15)'
+                    '.order_by(price_by_night).select(name)'),
+                "[Place] ({}) {{'name': 'Query c'}}\n"
+                "[Place] ({}) {{'name': 'Query a'}}".format(
+                    places[2].id, places[0].id))
+        self.assertEqual(
+                self.run_command('Place.where(name == "Query b")'),
+                str(places[1]))
+        self.assertEqual(
+                self.run_command('Place.where(name >= "Query").limit(2)')
+                .count("\n"),
+                1)
+        self.assertEqual(self.run_command("Nope.where(a == 1)"),
+                         "** class doesn't exist **")
+        self.assertEqual(self.run_command("Place.where(a = 1)"),
+                         "** where() takes no keywords")
+        for place in places:
+            storage.delete(place)
+        storage.save()
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "db",
+                     "storage is a DBStorage")
+    def test_read_only_session(self):
+        """
+        Test that a session changing nothing leaves the file as is, even
+        when it is not in the default format.
+        """
+        environment = {name: value for name, value in os.environ.items()
+                       if not name.startswith(("HBNB_STORAGE_", "HBNB_COMMIT_",
+                                               "HBNB_JOURNAL_",
+                                               "HBNB_RELOAD_"))}
+        for file_format in ("json", "snapshot"):
+            with self.subTest(file_format=file_format):
+                subprocess.run(
+                        [sys.executable, "-c",
+                         "from models.user import User; User().save()"],
+                        env=dict(environment,
+                                 HBNB_STORAGE_FORMAT=file_format),
+                        check=True)
+                before = os.stat("file.json")
+                with open("file.json", "rb") as file:
+                    data = file.read()
+                for commands in ("count User\nall User\n",
+                                 "count User\nquit\n"):
+                    subprocess.run([sys.executable, "console.py"],
+                                   input=commands, env=environment,
+                                   capture_output=True, text=True,
+                                   check=True)
+                after = os.stat("file.json")
+                self.assertEqual(after.st_ino, before.st_ino)
+                self.assertEqual(after.st_mtime_ns, before.st_mtime_ns)
+                with open("file.json", "rb") as file:
+                    self.assertEqual(file.read(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
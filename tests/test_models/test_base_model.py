@@ -3,8 +3,10 @@
 Unittest for the BaseModel module (Base Class)
 """
 import unittest
+from unittest.mock import patch
 from datetime import datetime
 from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
 from models import storage
 
 
@@ -18,6 +20,22 @@ class TestBaseModel(unittest.TestCase):
 
     To run these tests, use `python3 -m unittest test_base_model.py`.
     """
+    deferring = ("commit_delay", "commit_size", "background")
+
+    def setUp(self):
+        """Make save() write right away, as several tests reload after it."""
+        self.settings = {}
+        if isinstance(storage, FileStorage):
+            storage.close()  # Stop the flusher thread, if any
+            defaults = FileStorage()
+            for name in self.deferring:
+                self.settings[name] = getattr(storage, name)
+                setattr(storage, name, getattr(defaults, name))
+
+    def tearDown(self):
+        """Restore the storage settings changed by setUp."""
+        for name, value in self.settings.items():
+            setattr(storage, name, value)
 
     def test_instance_creation(self):
         """Test the creation of a BaseModel instance."""
@@ -103,6 +121,36 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(reloaded_model.updated_at, updated_model.updated_at)
         self.assertEqual(reloaded_model.name, updated_model.name)
 
+    def test_save_deleted(self):
+        """Test that saving a deleted instance does not store it again."""
+        my_model = BaseModel()
+        my_model.save()
+        key = f"BaseModel.{my_model.id}"
+        storage.delete(my_model)
+        storage.save()
+        my_model.save()
+        self.assertNotIn(key, storage.all())
+        storage.reload()
+        self.assertNotIn(key, storage.all())
+
+    def test_save_copy(self):
+        """Test that saving a copy keeps the stored instance."""
+        my_model = BaseModel()
+        my_model.save()
+        copy = BaseModel(**my_model.to_dict())
+        copy.save()
+        self.assertIs(storage.all()[f"BaseModel.{my_model.id}"], my_model)
+
+    def test_init_not_tracked(self):
+        """Test that building an instance does not mark it as changed."""
+        my_dict = BaseModel().to_dict()
+        with patch.object(storage, "touch") as touch:
+            my_model = BaseModel(**my_dict)
+            BaseModel()
+            touch.assert_not_called()
+            my_model.name = "Test"
+            touch.assert_called_once_with(my_model, "name")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Unittest for the compact module (ModelType and CompactModel classes)
+"""
+import unittest
+import functools
+import os
+import subprocess
+import sys
+import models
+from models.base_model import BaseModel
+from models.place import Place
+from models.user import User
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def in_compact_mode(test):
+    """
+    Decorator running the test method in a new interpreter with
+    HBNB_COMPACT_MODELS=1, unless compact models are already enabled.
+    """
+    @functools.wraps(test)
+    def wrapper(self):
+        """
+        Runs test, or the unittest command running it in compact mode.
+        """
+        if models.compact_models:
+            return test(self)
+        environment = dict(os.environ, HBNB_COMPACT_MODELS="1")
+        result = subprocess.run(
+                [sys.executable, "-m", "unittest", "-k", test.__name__,
+                 os.path.relpath(os.path.abspath(__file__), ROOT)],
+                cwd=ROOT, env=environment, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Ran 1 test", result.stderr)
+    return wrapper
+
+
+class TestCompactModels(unittest.TestCase):
+    """
+    Test case class for the declared attributes and the compact models.
+    The tests of the slots run in a new interpreter with
+    HBNB_COMPACT_MODELS=1 unless it is already set.
+
+    Methods:
+        test_declared_fields(self): Test the attributes recorded per class.
+        test_compact_layout(self): Test that compact instances have no
+                                   __dict__, in a new interpreter.
+        test_defaults(self): Test reading attributes that were not set.
+        test_extras(self): Test setting and removing undeclared
+                           attributes.
+        test_to_dict_and_str(self): Test the dictionary and string of a
+                                    compact instance.
+    """
+    def test_declared_fields(self):
+        """
+        Test the attributes recorded per class.
+        """
+        self.assertEqual(BaseModel.declared_fields(), {})
+        fields = Place.declared_fields()
+        self.assertEqual(fields["number_rooms"], 0)
+        self.assertEqual(fields["amenity_ids"], [])
+        self.assertNotIn("save", fields)
+        self.assertEqual(set(User.declared_fields()),
+                         {"email", "password", "first_name", "last_name"})
+
+    def test_compact_layout(self):
+        """
+        Test that compact instances have no __dict__, in a new interpreter.
+        """
+        script = (
+            "from models.place import Place; "
+            "place = Place(); "
+            "assert Place.__dictoffset__ == 0; "
+            "assert place.number_rooms == 0"
+            )
+        environment = dict(os.environ, HBNB_COMPACT_MODELS="1")
+        subprocess.run([sys.executable, "-c", script], env=environment,
+                       check=True)
+
+    @in_compact_mode
+    def test_defaults(self):
+        """
+        Test reading attributes that were not set.
+        """
+        place = Place()
+        self.assertEqual(place.max_guest, 0)
+        self.assertNotIn("max_guest", place.__dict__)
+        place.max_guest = 4
+        self.assertEqual(place.__dict__["max_guest"], 4)
+        del place.max_guest
+        self.assertEqual(place.max_guest, 0)
+        self.assertFalse(hasattr(place, "pets"))
+
+    @in_compact_mode
+    def test_extras(self):
+        """
+        Test setting and removing undeclared attributes.
+        """
+        place = Place()
+        place.pets = "yes"
+        self.assertEqual(place.pets, "yes")
+        self.assertEqual(place.__dict__["pets"], "yes")
+        del place.pets
+        self.assertFalse(hasattr(place, "pets"))
+        with self.assertRaises(AttributeError):
+            del place.pets
+
+    @in_compact_mode
+    def test_to_dict_and_str(self):
+        """
+        Test the dictionary and string of a compact instance.
+        """
+        place = Place()
+        place.name = "Loft"
+        place.pets = "yes"
+        obj_dict = place.to_dict()
+        self.assertEqual(obj_dict["name"], "Loft")
+        self.assertEqual(obj_dict["pets"], "yes")
+        self.assertNotIn("number_rooms", obj_dict)
+        self.assertEqual(Place(**obj_dict).to_dict(), obj_dict)
+        self.assertIn("'name': 'Loft'", str(place))
+
+
+if __name__ == "__main__":
+    unittest.main()
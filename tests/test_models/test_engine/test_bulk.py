@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Unittest for the bulk module (import and export of objects)
+"""
+import unittest
+import io
+import json
+from unittest.mock import patch
+from models.engine import bulk
+from models.place import Place
+from models import storage
+
+
+class TestBulk(unittest.TestCase):
+    """
+    Test case class for the bulk import and export.
+
+    Methods:
+        setUp(self): Remember the objects stored before each test.
+        tearDown(self): Remove the objects imported by each test.
+        test_ndjson_round_trip(self): Test exporting then importing NDJSON.
+        test_csv_round_trip(self): Test exporting then importing CSV.
+        test_invalid_row(self): Test rejecting a row of the wrong type.
+        test_batches(self): Test saving once per batch of rows.
+    """
+    def setUp(self):
+        """
+        Remember the objects stored before each test.
+        """
+        self.keys = set(storage.all(Place))
+
+    def tearDown(self):
+        """
+        Remove the objects imported by each test.
+        """
+        for key, obj in storage.all(Place).items():
+            if key not in self.keys:
+                storage.delete(obj)
+        storage.save()
+
+    def import_rows(self, text, file_format, batch_size=bulk.BATCH_SIZE):
+        """
+        Imports Places from text and returns the number of rows.
+        """
+        return bulk.import_objects(storage, Place, io.StringIO(text),
+                                   file_format, batch_size)
+
+    def round_trip(self, file_format):
+        """
+        Exports the stored Places, removes them, imports them back and
+        checks they are unchanged.
+        """
+        place = Place()
+        place.name = "Loft"
+        place.number_rooms = 3
+        place.amenity_ids = ["a", "b"]
+        place.pets = "yes"
+        place.save()
+        expected = {key: obj.to_dict()
+                    for key, obj in storage.all(Place).items()}
+        output = io.StringIO()
+        count = bulk.export_objects(storage, Place, output, file_format)
+        self.assertEqual(count, len(expected))
+        for obj in storage.all(Place).values():
+            storage.delete(obj)
+        self.assertEqual(self.import_rows(output.getvalue(), file_format),
+                         count)
+        imported = storage.get(Place, place.id).to_dict()
+        self.assertEqual(imported, expected["Place." + place.id])
+        self.assertEqual(set(storage.all(Place)), set(expected))
+
+    def test_ndjson_round_trip(self):
+        """
+        Test exporting then importing NDJSON.
+        """
+        self.round_trip("ndjson")
+
+    def test_csv_round_trip(self):
+        """
+        Test exporting then importing CSV.
+        """
+        self.round_trip("csv")
+
+    def test_invalid_row(self):
+        """
+        Test rejecting a row of the wrong type.
+        """
+        rows = [{"name": "Imported loft"}, {"number_rooms": "many"}]
+        with self.assertRaisesRegex(ValueError, "row 2: number_rooms"):
+            self.import_rows(
+                    "\n".join(json.dumps(row) for row in rows), "ndjson")
+        self.assertEqual(len(storage.find(Place, name="Imported loft")), 1)
+
+    def test_batches(self):
+        """
+        Test saving once per batch of rows.
+        """
+        text = "name,max_guest\n" + "".join(
+                "Place {0},{0}\n".format(number) for number in range(5))
+        with patch.object(storage, "flush", wraps=storage.flush) as flush:
+            self.assertEqual(self.import_rows(text, "csv", 2), 5)
+        self.assertEqual(flush.call_count, 3)
+        self.assertEqual(storage.find(Place, name="Place 4")
+                         .popitem()[1].max_guest, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
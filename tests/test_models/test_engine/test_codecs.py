@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+"""
+Unittest for the codecs module (storage file formats)
+"""
+import unittest
+import json
+from io import BytesIO
+from models.engine import codecs
+from models.engine.codecs import get_codec, detect_codec, iter_json_object
+
+
+class TestCodecs(unittest.TestCase):
+    """
+    Test case class for the storage codecs.
+
+    Methods:
+        available_codecs(self): Returns the codecs usable here.
+        test_snapshot_round_trip(self): Test writing then reading a
+                                        snapshot with every codec.
+        test_journal_round_trip(self): Test appending then reading journal
+                                       records with every codec.
+        test_torn_record(self): Test that reading stops at a torn record.
+        round_trip(self, codec): Test writing then reading a snapshot and
+                                 a journal with codec.
+        test_orjson(self): Test the orjson codec, if orjson is installed.
+        test_msgpack(self): Test the msgpack codec, if msgpack is
+                            installed.
+        test_detect_codec(self): Test detecting the format of a file.
+        test_unknown_codec(self): Test asking for an unknown codec.
+        test_iter_json_object(self): Test streaming through a JSON object
+                                     read in small chunks.
+        test_iter_json_object_errors(self): Test streaming through
+                                            documents that are not JSON
+                                            objects.
+    """
+    objects = {
+        "User.1": {"id": "1", "__class__": "User", "email": "a@b.c"},
+        "Place.2": {"id": "2", "__class__": "Place", "number_rooms": 3,
+                    "latitude": 1.5, "amenity_ids": ["x", "y"]},
+    }
+
+    def available_codecs(self):
+        """
+        Returns the codecs whose optional modules are installed.
+        """
+        available = []
+        for name in codecs.CODECS:
+            try:
+                available.append(get_codec(name))
+            except ValueError:
+                pass
+        return available
+
+    def test_snapshot_round_trip(self):
+        """
+        Test writing then reading a snapshot with every codec.
+        """
+        for codec in self.available_codecs():
+            with self.subTest(codec=codec.name):
+                file = BytesIO()
+                codec.write_snapshot(file, (
+                    (key, codec.encode(value))
+                    for key, value in self.objects.items()
+                    ))
+                file.seek(0)
+                self.assertEqual(dict(codec.read_snapshot(file)),
+                                 self.objects)
+
+    def test_journal_round_trip(self):
+        """
+        Test appending then reading journal records with every codec.
+        """
+        for codec in self.available_codecs():
+            with self.subTest(codec=codec.name):
+                file = BytesIO()
+                codec.start_journal(file)
+                codec.write_record(file, "User.1",
+                                   codec.encode(self.objects["User.1"]))
+                codec.write_record(file, "User.1", None)
+                file.seek(0)
+                records = list(codec.read_records(file))
+                self.assertEqual(records[0][:2],
+                                 ("User.1", self.objects["User.1"]))
+                self.assertEqual(records[1][:2], ("User.1", None))
+                self.assertEqual(records[1][2], len(file.getvalue()))
+
+    def test_torn_record(self):
+        """
+        Test that reading stops at a torn record.
+        """
+        for codec in self.available_codecs():
+            with self.subTest(codec=codec.name):
+                file = BytesIO()
+                codec.start_journal(file)
+                codec.write_record(file, "User.1",
+                                   codec.encode(self.objects["User.1"]))
+                end = file.tell()
+                codec.write_record(file, "Place.2",
+                                   codec.encode(self.objects["Place.2"]))
+                file = BytesIO(file.getvalue()[:-3])
+                records = list(codec.read_records(file))
+                self.assertEqual(len(records), 1)
+                self.assertEqual(records[0][2], end)
+
+    def round_trip(self, codec):
+        """
+        Test writing then reading a snapshot and a journal with codec.
+        """
+        file = BytesIO()
+        codec.write_snapshot(file, (
+            (key, codec.encode(value)) for key, value in self.objects.items()
+            ))
+        file.seek(0)
+        self.assertEqual(dict(codec.read_snapshot(file)), self.objects)
+        file = BytesIO()
+        codec.start_journal(file)
+        for key, value in self.objects.items():
+            codec.write_record(file, key, codec.encode(value))
+        codec.write_record(file, "User.1", None)
+        file.seek(0)
+        self.assertEqual(
+                [record[:2] for record in codec.read_records(file)],
+                list(self.objects.items()) + [("User.1", None)])
+
+    @unittest.skipIf(codecs.orjson is None, "orjson is not installed")
+    def test_orjson(self):
+        """
+        Test the orjson codec, if orjson is installed.
+        """
+        codec = get_codec("orjson")
+        self.assertIsNone(codec.format_id)
+        self.round_trip(codec)
+
+    @unittest.skipIf(codecs.msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        """
+        Test the msgpack codec, if msgpack is installed.
+        """
+        codec = get_codec("msgpack")
+        file = BytesIO()
+        codec.write_snapshot(file, ())
+        file.seek(0)
+        self.assertEqual(detect_codec(file, get_codec("json")).name,
+                         "msgpack")
+        self.round_trip(codec)
+
+    def test_detect_codec(self):
+        """
+        Test detecting the format of a file.
+        """
+        binary_codec = get_codec("snapshot")
+        file = BytesIO()
+        binary_codec.write_snapshot(file, ())
+        file.seek(0)
+        self.assertEqual(detect_codec(file, get_codec("json")).name,
+                         "snapshot")
+        self.assertEqual(file.tell(), 0)
+        self.assertEqual(detect_codec(BytesIO(b"{}"), binary_codec).name,
+                         "json")
+        self.assertEqual(
+                detect_codec(BytesIO(b"{}"), get_codec("json")).name, "json")
+
+    def test_unknown_codec(self):
+        """
+        Test asking for an unknown codec.
+        """
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    def test_iter_json_object(self):
+        """
+        Test streaming through a JSON object read in small chunks.
+        """
+        document = json.dumps({
+            "User.1": {"name": "Zoë ✓", "n": 12345678, "f": -1.5e3},
+            "Place.2": {"ids": ["a", "b"], "nested": {"x": None}},
+            "num": 1234567890,
+            }, indent=2).encode('utf-8')
+        for chunk_size in (1, 3, 7, 64, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                pairs = list(iter_json_object(BytesIO(document), chunk_size))
+                self.assertEqual(dict(pairs), json.loads(document))
+        self.assertEqual(list(iter_json_object(BytesIO(b" { } "))), [])
+
+    def test_iter_json_object_errors(self):
+        """
+        Test streaming through documents that are not JSON objects.
+        """
+        for document, message in (
+                (b"", "expected a JSON object"),
+                (b"[1, 2]", "expected a JSON object"),
+                (b'{"a": 1', "expected ',' or '}' after key 'a'"),
+                (b'{"a" 1}', "expected ':' after key 'a'"),
+                (b'{"a": 1 "b": 2}', "expected ',' or '}' after key 'a'")):
+            with self.subTest(document=document):
+                with self.assertRaises(ValueError) as context:
+                    list(iter_json_object(BytesIO(document), 2))
+                self.assertEqual(str(context.exception), message)
+
+
+if __name__ == "__main__":
+    unittest.main()
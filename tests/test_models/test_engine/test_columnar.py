@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+"""
+Unittest for the columnar module (ColumnarView Class)
+"""
+import unittest
+import math
+import subprocess
+import sys
+from unittest.mock import patch
+from models.engine import columnar
+from models.engine.columnar import ColumnarView
+from models.place import Place
+from models.review import Review
+from models import storage
+
+
+class TestColumnarView(unittest.TestCase):
+    """
+    Test case class for the columnar views. Every test runs with and
+    without NumPy (when it is installed).
+
+    Methods:
+        setUp(self): Build a view of a few places.
+        run_both(self, test): Runs test with and without NumPy.
+        test_columns(self): Test the number and string columns.
+        test_select(self): Test filtering rows with conditions.
+        test_aggregate(self): Test the aggregates of a whole column.
+        test_group_by(self): Test the aggregates per group.
+        test_observe(self): Test updating and removing rows.
+        test_invalid(self): Test rejecting unknown columns and functions.
+        test_storage_sync(self): Test that storage keeps its views in sync.
+        test_lazy_numpy(self): Test that NumPy is only imported by the
+                               views.
+    """
+    def setUp(self):
+        """
+        Build a view of a few places.
+        """
+        self.places = []
+        for city, price, rooms in (("a", 100, 1), ("a", 200, 2),
+                                   ("b", 50, 3), ("b", "free", 4)):
+            place = Place()
+            place.city_id = city
+            place.price_by_night = price
+            place.number_rooms = rooms
+            self.places.append(place)
+        self.view = ColumnarView(Place, self.places)
+
+    def tearDown(self):
+        """
+        Remove the places of the test from storage.
+        """
+        for place in self.places:
+            storage.delete(place)
+
+    def run_both(self, test):
+        """
+        Runs test with and without NumPy.
+        """
+        modes = [None] if columnar.numpy is None else [columnar.numpy, None]
+        for numpy in modes:
+            with self.subTest(numpy=numpy is not None):
+                with patch.object(columnar, "numpy", numpy):
+                    test()
+
+    def test_columns(self):
+        """
+        Test the number and string columns.
+        """
+        self.assertIn("latitude", self.view.numbers)
+        self.assertIn("city_id", self.view.strings)
+        self.assertNotIn("amenity_ids", self.view.numbers + self.view.strings)
+        self.assertEqual(len(self.view), 4)
+        self.assertEqual(self.view.column("city_id"), ["a", "a", "b", "b"])
+        prices = self.view.column("price_by_night")
+        self.assertEqual(list(prices[:3]), [100.0, 200.0, 50.0])
+        self.assertTrue(math.isnan(prices[3]))
+
+    def test_select(self):
+        """
+        Test filtering rows with conditions.
+        """
+        def test():
+            """
+            Checks the selected rows.
+            """
+            for where, rows in (
+                    ([("city_id", "==", "a")], [0, 1]),
+                    ([("city_id", "!=", "a"), ("number_rooms", ">", 3)], [3]),
+                    ([("city_id", ">=", "b")], [2, 3]),
+                    ([("price_by_night", "<", "150")], [0, 2]),
+                    ([("city_id", "==", "z")], [])):
+                selection = self.view.select(where)
+                if columnar.numpy is not None:
+                    selection = list(columnar.numpy.flatnonzero(selection))
+                self.assertEqual(selection, rows)
+        self.run_both(test)
+
+    def test_aggregate(self):
+        """
+        Test the aggregates of a whole column.
+        """
+        def test():
+            """
+            Checks the aggregates.
+            """
+            view = self.view
+            self.assertEqual(view.aggregate("count"), 4)
+            self.assertEqual(view.aggregate("count", "price_by_night"), 3)
+            self.assertEqual(view.aggregate("sum", "price_by_night"), 350)
+            self.assertEqual(view.aggregate("min", "price_by_night"), 50)
+            self.assertEqual(view.aggregate("max", "price_by_night"), 200)
+            self.assertEqual(view.aggregate(
+                "avg", "number_rooms", where=[("city_id", "==", "b")]), 3.5)
+            self.assertIsNone(view.aggregate(
+                "avg", "number_rooms", where=[("city_id", "==", "z")]))
+        self.run_both(test)
+
+    def test_group_by(self):
+        """
+        Test the aggregates per group.
+        """
+        def test():
+            """
+            Checks the grouped aggregates.
+            """
+            view = self.view
+            self.assertEqual(view.aggregate("count", by="city_id"),
+                             {"a": 2, "b": 2})
+            self.assertEqual(
+                    view.aggregate("avg", "price_by_night", by="city_id"),
+                    {"a": 150.0, "b": 50.0})
+            self.assertEqual(
+                    view.aggregate("max", "number_rooms", by="city_id",
+                                   where=[("number_rooms", "<", 4)]),
+                    {"a": 2.0, "b": 3.0})
+        self.run_both(test)
+
+    def test_observe(self):
+        """
+        Test updating and removing rows.
+        """
+        first, second = self.places[:2]
+        first.price_by_night = 10
+        self.view.observe("Place." + first.id, first, "price_by_night")
+        self.assertEqual(self.view.column("price_by_night")[0], 10)
+        self.view.observe("Place." + first.id, None)
+        self.assertEqual(len(self.view), 3)
+        self.assertEqual(self.view.column("city_id"), ["b", "a", "b"])
+        self.view.observe("Place." + first.id, None)
+        self.view.observe("Review." + first.id, Review())
+        self.assertEqual(len(self.view), 3)
+        self.view.observe("Place." + second.id, None)
+        self.assertEqual(self.view.aggregate("sum", "number_rooms"), 7)
+
+    def test_invalid(self):
+        """
+        Test rejecting unknown columns and functions.
+        """
+        for args in (("median", "number_rooms"), ("sum",),
+                     ("sum", "city_id"), ("count", None, "number_rooms"),
+                     ("count", None, None, [("name", "~", "a")]),
+                     ("count", None, None, [("unknown", "==", "a")])):
+            with self.assertRaises(ValueError):
+                self.view.aggregate(*args)
+
+    def test_storage_sync(self):
+        """
+        Test that storage keeps its views in sync.
+        """
+        if not hasattr(storage, "subscribe"):
+            self.skipTest("storage views are not kept in sync")
+        where = [("city_id", "==", "sync")]
+        view = storage.columnar(Place)
+        self.assertIs(storage.columnar("Place"), view)
+        place = Place()
+        self.places.append(place)
+        place.city_id = "sync"
+        place.price_by_night = 80
+        self.assertEqual(view.aggregate("sum", "price_by_night", where=where),
+                         80)
+        place.price_by_night = 90
+        self.assertEqual(view.aggregate("sum", "price_by_night", where=where),
+                         90)
+        storage.delete(place)
+        self.assertEqual(view.aggregate("count", where=where), 0)
+
+    def test_lazy_numpy(self):
+        """
+        Test that NumPy is only imported by the views, not by the console
+        commands that do not use them.
+        """
+        script = (
+            "import sys, console; "
+            "from models import storage; "
+            "storage.count(); "
+            "assert 'numpy' not in sys.modules"
+            )
+        subprocess.run([sys.executable, "-c", script], check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
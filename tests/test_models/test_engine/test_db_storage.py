@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""
+Unittest for the DBStorage module (DBStorage Class)
+"""
+import unittest
+import os
+import shutil
+import tempfile
+from models.engine.db_storage import DBStorage
+from models.user import User
+from models.place import Place
+from models.review import Review
+
+
+class TestDBStorage(unittest.TestCase):
+    """
+    Test case class for the SQLite storage engine.
+
+    Methods:
+        setUp(self): Set up a clean database before each test.
+        tearDown(self): Remove the database after each test.
+        reopen(self): Returns a new DBStorage on the same database.
+        test_save_and_reload(self): Test saving and reading back objects.
+        test_attribute_types(self): Test that attribute values keep their
+                                    types.
+        test_delete(self): Test removing objects.
+        test_all_get_count(self): Test listing, looking up and counting.
+        test_find(self): Test querying objects by attribute values.
+        test_uncommitted_changes(self): Test that queries see changes not
+                                        saved yet.
+        test_wal_and_indexes(self): Test the journal mode and the
+                                    foreign-key indexes.
+        test_batch(self): Test committing saves at the end of a batch.
+    """
+    def setUp(self):
+        """
+        Set up a clean database before each test.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "hbnb.db")
+        self.db = self.reopen()
+
+    def tearDown(self):
+        """
+        Remove the database after each test.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def reopen(self):
+        """
+        Returns a new DBStorage on the same database.
+        """
+        db = DBStorage(self.path)
+        db.reload()
+        return db
+
+    def test_save_and_reload(self):
+        """
+        Test saving and reading back objects.
+        """
+        user = User()
+        user.first_name = "Betty"
+        self.db.new(user)
+        self.db.save()
+        reloaded = self.reopen().get(User, user.id)
+        self.assertIsNot(reloaded, user)
+        self.assertEqual(reloaded.to_dict(), user.to_dict())
+
+    def test_attribute_types(self):
+        """
+        Test that attribute values keep their types.
+        """
+        place = Place()
+        place.number_rooms = 3
+        place.latitude = 1.5
+        place.amenity_ids = ["a", "b"]
+        place.custom = {"x": None}
+        place.flag = True
+        self.db.new(place)
+        self.db.save()
+        reloaded = self.reopen().get("Place", place.id)
+        self.assertEqual(reloaded.to_dict(), place.to_dict())
+        self.assertIs(reloaded.flag, True)
+        self.assertNotIn("description", reloaded.__dict__)
+
+    def test_delete(self):
+        """
+        Test removing objects.
+        """
+        user = User()
+        self.db.new(user)
+        self.db.save()
+        self.db.delete(user)
+        self.db.save()
+        self.assertIsNone(self.reopen().get(User, user.id))
+
+    def test_all_get_count(self):
+        """
+        Test listing, looking up and counting.
+        """
+        users = [User() for _ in range(3)]
+        place = Place()
+        for obj in users + [place]:
+            self.db.new(obj)
+        self.db.save()
+        db = self.reopen()
+        self.assertEqual(db.count(User), 3)
+        self.assertEqual(db.count(), 4)
+        self.assertEqual(set(db.all("User")),
+                         {"User." + user.id for user in users})
+        self.assertEqual(len(db.all()), 4)
+        self.assertIs(db.get(User, users[0].id), db.all(User)[
+            "User." + users[0].id])
+        self.assertEqual(db.all("Unknown"), {})
+        self.assertIsNone(db.get("Unknown", "1"))
+
+    def test_find(self):
+        """
+        Test querying objects by attribute values.
+        """
+        reviews = [Review() for _ in range(3)]
+        for number, review in enumerate(reviews):
+            review.place_id = "db-place-{}".format(number % 2)
+            review.text = "text-{}".format(number)
+            self.db.new(review)
+        self.db.save()
+        db = self.reopen()
+        self.assertEqual(
+                set(db.find(Review, place_id="db-place-0")),
+                {"Review." + reviews[0].id, "Review." + reviews[2].id})
+        self.assertEqual(
+                list(db.find(Review, place_id="db-place-0", text="text-2")),
+                ["Review." + reviews[2].id])
+
+    def test_uncommitted_changes(self):
+        """
+        Test that queries see changes not saved yet.
+        """
+        user = User()
+        self.db.new(user)
+        self.assertEqual(self.db.count(User), 1)
+        self.assertIsNone(self.reopen().get(User, user.id))
+        self.db.save()
+        self.assertIsNotNone(self.reopen().get(User, user.id))
+
+    def test_wal_and_indexes(self):
+        """
+        Test the journal mode and the foreign-key indexes.
+        """
+        import sqlite3
+        connection = sqlite3.connect(self.path)
+        self.assertEqual(
+                connection.execute("PRAGMA journal_mode").fetchone()[0],
+                "wal")
+        indexes = {
+            row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")
+            }
+        self.assertIn("Review_place_id", indexes)
+        self.assertIn("City_state_id", indexes)
+        connection.close()
+
+    def test_batch(self):
+        """
+        Test committing saves at the end of a batch.
+        """
+        with self.db.batch():
+            user = User()
+            self.db.new(user)
+            self.db.save()
+            self.assertTrue(self.db.batching)
+            self.assertIsNone(self.reopen().get(User, user.id))
+        self.assertIsNotNone(self.reopen().get(User, user.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,835 @@
+#!/usr/bin/python3
+"""
+Unittest for the FileStorage module (FileStorage Class)
+"""
+import unittest
+import os
+import json
+import shutil
+import subprocess
+import sys
+import multiprocessing
+import threading
+import time
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.user import User
+from models.review import Review
+from models.place import Place
+from models.engine.codecs import get_codec, MAGIC
+from models.engine.file_storage import FileStorage
+from models import storage
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "db",
+                 "storage is a DBStorage")
+class TestFileStorage(unittest.TestCase):
+    """
+    Test case class for the FileStorage engine.
+
+    Methods:
+        setUp(self): Set up a clean environment before each test.
+        tearDown(self): Clean up the environment after each test.
+        test_new_and_all(self): Test registering objects in storage.
+        test_delete(self): Test removing objects from storage.
+        test_all_by_class(self): Test listing the objects of one class.
+        test_get(self): Test looking up one object by class and id.
+        test_count(self): Test counting objects per class.
+        test_find(self): Test querying objects by attribute values.
+        test_find_follows_updates(self): Test that the secondary indexes
+                                         follow updates and deletions.
+        test_lazy_reload(self): Test building objects on first access.
+        test_lazy_save(self): Test saving objects that were never built.
+        test_binary_format(self): Test saving and reloading a binary file.
+        test_binary_journal(self): Test journal mode with a binary format.
+        test_shards_per_class(self): Test keeping one file per class.
+        test_shards_rewrite_changed_only(self): Test that save() only
+                                                rewrites changed shards.
+        test_hash_shards(self): Test splitting classes into hash shards.
+        test_reload_classes(self): Test reloading only some classes.
+        test_reload_classes_save(self): Test that saving after reloading
+                                        some classes keeps the others.
+        test_parallel_reload(self): Test decoding shards in worker
+                                    processes.
+        test_snapshot_reload(self): Test serving reads from a memory-mapped
+                                    snapshot.
+        test_snapshot_journal(self): Test replaying a journal on top of a
+                                     snapshot, then compacting it.
+        test_snapshot_copy(self): Test that saving copies the records still
+                                  mapped instead of re-encoding them.
+        test_atomic_save(self): Test that a failed save keeps the previous
+                            file.
+        test_fsync_save(self): Test saving with the fsync durability level.
+        test_durability_levels(self): Test rejecting unknown durability
+                                      levels.
+        test_concurrent_writers(self): Test that processes saving at the
+                                       same time keep each other's objects.
+        test_merge_deletions(self): Test that save() keeps the deletions
+                                    saved by another process.
+        test_batch(self): Test deferring saves until the end of a batch.
+        test_group_commit_size(self): Test coalescing saves until enough
+                                      objects changed.
+        test_group_commit_delay(self): Test coalescing saves within a time
+                                       window.
+        test_group_commit_exit(self): Test that the deferred changes are
+                                      written when the process exits.
+        test_threads(self): Test sharing a threadsafe storage between
+                            threads.
+        test_background(self): Test writing the changes from a flusher
+                               thread.
+        test_journal_append(self): Test that journal mode appends records.
+        test_journal_replay(self): Test replaying the journal on reload.
+        test_journal_compaction(self): Test folding the journal back into
+                                       the JSON file.
+        test_journal_torn_record(self): Test ignoring a torn journal record.
+        test_save_reencodes_dirty_only(self): Test that save() only
+                                              re-encodes changed objects.
+        test_save_reencodes_raw(self): Test that encoded_count counts the
+                                       objects not built yet.
+        test_touch_unstored_object(self): Test that touching an object
+                                          outside storage is ignored.
+    """
+    modes = ("journal", "compact_threshold", "lazy", "codec", "shards",
+             "workers", "durability", "commit_delay", "commit_size",
+             "background")
+
+    def setUp(self):
+        """
+        Set up a clean environment before each test: the storage runs
+        with the default settings, whatever the HBNB_STORAGE_* variables.
+        """
+        storage.close()  # Stop the flusher thread, if any
+        self.saved_modes = {name: getattr(storage, name)
+                            for name in self.modes}
+        defaults = FileStorage()
+        for name in self.modes:
+            setattr(storage, name, getattr(defaults, name))
+        storage.reload()
+        storage.compact()  # Write what other tests left in memory
+
+    def tearDown(self):
+        """
+        Clean up the environment after each test.
+        """
+        storage.close()
+        for name, value in self.saved_modes.items():
+            setattr(storage, name, value)
+        for path in ("file.json", storage.journal_path, storage.lock_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        shutil.rmtree(storage.shard_dir, ignore_errors=True)
+
+    def test_new_and_all(self):
+        """
+        Test registering objects in storage.
+        """
+        model = BaseModel()
+        self.assertIs(storage.all()["BaseModel." + model.id], model)
+
+    def test_delete(self):
+        """
+        Test removing objects from storage.
+        """
+        model = BaseModel()
+        model.save()
+        storage.delete(model)
+        storage.save()
+        self.assertNotIn("BaseModel." + model.id, storage.all())
+        with open("file.json", encoding="utf-8") as file:
+            self.assertNotIn("BaseModel." + model.id, json.load(file))
+
+    def test_all_by_class(self):
+        """
+        Test listing the objects of one class.
+        """
+        model = BaseModel()
+        user = User()
+        by_class = storage.all(User)
+        self.assertIn("User." + user.id, by_class)
+        self.assertNotIn("BaseModel." + model.id, by_class)
+        self.assertEqual(by_class, storage.all("User"))
+        self.assertEqual(storage.all("Unknown"), {})
+
+    def test_get(self):
+        """
+        Test looking up one object by class and id.
+        """
+        user = User()
+        self.assertIs(storage.get(User, user.id), user)
+        self.assertIs(storage.get("User", user.id), user)
+        self.assertIsNone(storage.get(BaseModel, user.id))
+        storage.delete(user)
+        self.assertIsNone(storage.get(User, user.id))
+
+    def test_count(self):
+        """
+        Test counting objects per class.
+        """
+        count = storage.count(User)
+        total = storage.count()
+        user = User()
+        self.assertEqual(storage.count(User), count + 1)
+        self.assertEqual(storage.count("User"), count + 1)
+        self.assertEqual(storage.count(), total + 1)
+        storage.delete(user)
+        self.assertEqual(storage.count(User), count)
+
+    def test_find(self):
+        """
+        Test querying objects by attribute values.
+        """
+        first = Review()
+        first.place_id = "place-1"
+        first.user_id = "user-1"
+        second = Review()
+        second.place_id = "place-1"
+        second.user_id = "user-2"
+        self.assertEqual(
+                set(storage.find(Review, place_id="place-1")),
+                {"Review." + first.id, "Review." + second.id}
+                )
+        self.assertEqual(
+                list(storage.find("Review", place_id="place-1",
+                                  user_id="user-2")),
+                ["Review." + second.id]
+                )
+        second.text = "Great"
+        self.assertEqual(
+                list(storage.find(Review, text="Great")),
+                ["Review." + second.id]
+                )
+
+    def test_find_follows_updates(self):
+        """
+        Test that the secondary indexes follow updates and deletions.
+        """
+        review = Review()
+        review.place_id = "place-2"
+        review.place_id = "place-3"
+        self.assertEqual(storage.find(Review, place_id="place-2"), {})
+        self.assertIn("Review." + review.id,
+                      storage.find(Review, place_id="place-3"))
+        storage.delete(review)
+        self.assertEqual(storage.find(Review, place_id="place-3"), {})
+
+    def test_lazy_reload(self):
+        """
+        Test building objects on first access.
+        """
+        user = User()
+        user.first_name = "Betty"
+        user.save()
+        count = storage.count(User)
+        storage.lazy = True
+        storage.reload()
+        self.assertEqual(storage.count(User), count)
+        reloaded = storage.get(User, user.id)
+        self.assertIsNot(reloaded, user)
+        self.assertEqual(reloaded.first_name, "Betty")
+        self.assertIs(storage.get(User, user.id), reloaded)
+        self.assertIs(storage.all()["User." + user.id], reloaded)
+
+    def test_lazy_save(self):
+        """
+        Test saving objects that were never built.
+        """
+        user = User()
+        user.save()
+        storage.lazy = True
+        storage.reload()
+        other = User()
+        other.save()
+        with open("file.json", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertIn("User." + user.id, data)
+        self.assertIn("User." + other.id, data)
+        self.assertEqual(storage.get(User, user.id).id, user.id)
+
+    def test_binary_format(self):
+        """
+        Test saving and reloading a binary file.
+        """
+        storage.codec = get_codec("snapshot")
+        user = User()
+        user.first_name = "Betty"
+        user.save()
+        with open("file.json", "rb") as file:
+            self.assertEqual(file.read(len(MAGIC)), MAGIC)
+        storage.codec = get_codec("json")
+        storage.lazy = True
+        storage.reload()
+        self.assertEqual(storage.get(User, user.id).first_name, "Betty")
+
+    def test_binary_journal(self):
+        """
+        Test journal mode with a binary format.
+        """
+        storage.codec = get_codec("snapshot")
+        storage.journal = True
+        user = User()
+        user.save()
+        storage.delete(user)
+        storage.save()
+        storage.new(user)
+        storage.reload()
+        self.assertIsNone(storage.get(User, user.id))
+
+    def test_shards_per_class(self):
+        """
+        Test keeping one file per class.
+        """
+        storage.shards = 1
+        user = User()
+        user.save()
+        place = Place()
+        place.save()
+        self.assertFalse(os.path.exists("file.json"))
+        shard = os.path.join(storage.shard_dir, "User")
+        with open(shard, encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertIn("User." + user.id, data)
+        self.assertNotIn("Place." + place.id, data)
+
+        storage.delete(user)
+        storage.save()
+        with open(shard, encoding="utf-8") as file:
+            self.assertNotIn("User." + user.id, json.load(file))
+
+    def test_shards_rewrite_changed_only(self):
+        """
+        Test that save() only rewrites changed shards.
+        """
+        storage.shards = 1
+        User().save()
+        place = Place()
+        place.save()
+        user_shard = os.path.join(storage.shard_dir, "User")
+        place_shard = os.path.join(storage.shard_dir, "Place")
+        user_inode = os.stat(user_shard).st_ino
+        place_inode = os.stat(place_shard).st_ino
+        place.name = "Loft"
+        place.save()
+        self.assertEqual(os.stat(user_shard).st_ino, user_inode)
+        self.assertNotEqual(os.stat(place_shard).st_ino, place_inode)
+
+    def test_hash_shards(self):
+        """
+        Test splitting classes into hash shards.
+        """
+        storage.shards = 4
+        users = [User() for _ in range(20)]
+        storage.save()
+        names = os.listdir(storage.shard_dir)
+        self.assertTrue(all(name.endswith("-4") for name in names))
+        self.assertGreater(len([n for n in names if n.startswith("User.")]),
+                           1)
+
+        storage.shards = 2
+        storage.reload()
+        storage.get(User, users[0].id).save()
+        names = os.listdir(storage.shard_dir)
+        self.assertTrue(all(name.endswith("-2") for name in names))
+
+    def test_reload_classes(self):
+        """
+        Test reloading only some classes.
+        """
+        storage.shards = 1
+        user = User()
+        user.save()
+        place = Place()
+        place.save()
+        storage.delete(user)
+        storage.delete(place)
+        storage.reload(classes=["Place"])
+        self.assertIsNone(storage.get(User, user.id))
+        self.assertIsNotNone(storage.get(Place, place.id))
+
+    def test_reload_classes_save(self):
+        """
+        Test that saving after reloading some classes keeps the others,
+        saved meanwhile by another process.
+        """
+        def create(index):
+            """
+            Saves a user and a place in another process.
+            """
+            user = User()
+            user.save()
+            place = Place()
+            place.save()
+            ids.put((user.id, place.id))
+
+        for shards in (0, 1):
+            with self.subTest(shards=shards):
+                storage.shards = shards
+                storage.save()
+                ids = multiprocessing.get_context("fork").Queue()
+                self.run_processes(create, 1)
+                user_id, place_id = ids.get()
+                storage.reload(classes=["User"])
+                self.assertIsNone(storage.get(Place, place_id))
+                user = storage.get(User, user_id)
+                user.first_name = "Betty"
+                user.save()
+                Place().save()
+                storage.compact()
+                storage.reload()
+                self.assertIsNotNone(storage.get(Place, place_id))
+                self.assertEqual(storage.get(User, user_id).first_name,
+                                 "Betty")
+
+    def test_parallel_reload(self):
+        """
+        Test decoding shards in worker processes.
+        """
+        storage.shards = 2
+        users = [User() for _ in range(10)]
+        places = [Place() for _ in range(10)]
+        storage.save()
+        for obj in users + places:
+            obj.name = "stale"
+        storage.workers = 2
+        storage.reload()
+        for obj in users + places:
+            reloaded = storage.get(type(obj), obj.id)
+            self.assertIsNot(reloaded, obj)
+            self.assertNotEqual(getattr(reloaded, "name", ""), "stale")
+
+    def test_snapshot_reload(self):
+        """
+        Test serving reads from a memory-mapped snapshot.
+        """
+        storage.codec = get_codec("snapshot")
+        users = [User() for _ in range(5)]
+        users[0].first_name = "Betty"
+        storage.save()
+        count = storage.count(User)
+        storage.reload()
+        self.assertEqual(storage.count(User), count)
+        reloaded = storage.get(User, users[0].id)
+        self.assertIsNot(reloaded, users[0])
+        self.assertEqual(reloaded.first_name, "Betty")
+        self.assertEqual(len(storage.all(User)), count)
+        self.assertTrue(all(storage.get(User, user.id) for user in users))
+
+    def test_snapshot_journal(self):
+        """
+        Test replaying a journal on top of a snapshot, then compacting it.
+        """
+        storage.codec = get_codec("snapshot")
+        kept = User()
+        gone = User()
+        storage.save()
+        storage.journal = True
+        storage.reload()
+        storage.delete(storage.get(User, gone.id))
+        reloaded = storage.get(User, kept.id)
+        reloaded.first_name = "Betty"
+        storage.save()
+        storage.reload()
+        self.assertIsNone(storage.get(User, gone.id))
+        self.assertEqual(storage.get(User, kept.id).first_name, "Betty")
+        storage.compact()
+        storage.reload()
+        self.assertIsNone(storage.get(User, gone.id))
+        self.assertEqual(storage.get(User, kept.id).first_name, "Betty")
+
+    def test_snapshot_copy(self):
+        """
+        Test that saving copies the records still mapped from a snapshot
+        instead of decoding and re-encoding them.
+        """
+        snapshots = FileStorage(codec="snapshot")  # Not threadsafe
+        users = [User() for _ in range(3)]
+        snapshots.save()
+        snapshots.reload()
+        snapshots.get(User, users[0].id).first_name = "Betty"
+        with patch.object(snapshots.codec, "encode",
+                          wraps=snapshots.codec.encode) as encode:
+            snapshots.save()
+        self.assertEqual(encode.call_count, 1)
+        snapshots.reload()
+        self.assertEqual(snapshots.get(User, users[0].id).first_name,
+                         "Betty")
+        self.assertTrue(all(snapshots.get(User, user.id) for user in users))
+
+    def test_atomic_save(self):
+        """
+        Test that a failed save keeps the previous file.
+        """
+        user = User()
+        user.save()
+        with open("file.json", "rb") as file:
+            previous = file.read()
+        user.first_name = object()
+        with self.assertRaises(TypeError):
+            storage.save()
+        with open("file.json", "rb") as file:
+            self.assertEqual(file.read(), previous)
+        self.assertEqual(
+                [name for name in os.listdir(".") if name.endswith(".tmp")],
+                [])
+        user.first_name = "Betty"
+        storage.save()
+
+    def test_fsync_save(self):
+        """
+        Test saving with the fsync durability level.
+        """
+        storage.durability = "fsync"
+        user = User()
+        user.save()
+        storage.journal = True
+        user.first_name = "Betty"
+        user.save()
+        storage.reload()
+        self.assertEqual(storage.get(User, user.id).first_name, "Betty")
+
+    def test_durability_levels(self):
+        """
+        Test rejecting unknown durability levels.
+        """
+        with self.assertRaises(ValueError):
+            FileStorage(durability="always")
+
+    def run_processes(self, target, count):
+        """
+        Runs target(index) in count forked processes at the same time.
+        """
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=target, args=(index,))
+                     for index in range(count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+    def test_concurrent_writers(self):
+        """
+        Test that processes saving at the same time keep each other's
+        objects.
+        """
+        def create_users(index):
+            """
+            Saves users one by one, as the console does.
+            """
+            for number in range(20):
+                user = User()
+                user.first_name = "{}-{}".format(index, number)
+                user.save()
+
+        for journal in (False, True):
+            with self.subTest(journal=journal):
+                storage.journal = journal
+                storage.compact_threshold = 15
+                storage.save()
+                before = storage.count(User)
+                self.run_processes(create_users, 4)
+                storage.reload()
+                self.assertEqual(storage.count(User), before + 80)
+
+    def test_merge_deletions(self):
+        """
+        Test that save() keeps the deletions saved by another process.
+        """
+        user = User()
+        user.save()
+
+        def delete_user(index):
+            """
+            Deletes user in another process.
+            """
+            storage.delete(storage.get(User, user.id))
+            storage.save()
+
+        self.run_processes(delete_user, 1)
+        Place().save()
+        with open("file.json", encoding="utf-8") as file:
+            self.assertNotIn("User." + user.id, json.load(file))
+        self.assertIsNone(storage.get(User, user.id))
+
+    def saved_keys(self):
+        """
+        Returns the keys stored in the JSON file, if any.
+        """
+        try:
+            with open("file.json", encoding="utf-8") as file:
+                return set(json.load(file))
+        except FileNotFoundError:
+            return set()
+
+    def test_batch(self):
+        """
+        Test deferring saves until the end of a batch.
+        """
+        with storage.batch():
+            users = [User() for _ in range(3)]
+            for user in users:
+                user.save()
+                with storage.batch():
+                    user.first_name = "Betty"
+                    user.save()
+            self.assertTrue(storage.batching)
+            self.assertFalse(
+                    {"User." + user.id for user in users} & self.saved_keys())
+        self.assertFalse(storage.batching)
+        self.assertLessEqual({"User." + user.id for user in users},
+                             self.saved_keys())
+
+        storage.begin()
+        user = User()
+        user.save()
+        self.assertNotIn("User." + user.id, self.saved_keys())
+        storage.commit()
+        self.assertIn("User." + user.id, self.saved_keys())
+
+    def test_group_commit_size(self):
+        """
+        Test coalescing saves until enough objects changed.
+        """
+        storage.commit_size = 3
+        users = [User() for _ in range(2)]
+        for user in users:
+            user.save()
+        self.assertFalse(
+                {"User." + user.id for user in users} & self.saved_keys())
+        users.append(User())
+        users[-1].save()
+        self.assertLessEqual({"User." + user.id for user in users},
+                             self.saved_keys())
+
+        user = User()
+        user.save()
+        self.assertNotIn("User." + user.id, self.saved_keys())
+        storage.flush()
+        self.assertIn("User." + user.id, self.saved_keys())
+
+    def test_group_commit_delay(self):
+        """
+        Test coalescing saves within a time window.
+        """
+        storage.commit_delay = 0.05
+        user = User()
+        user.save()
+        self.assertNotIn("User." + user.id, self.saved_keys())
+        time.sleep(0.05)
+        place = Place()
+        place.save()
+        self.assertLessEqual({"User." + user.id, "Place." + place.id},
+                             self.saved_keys())
+
+    def test_group_commit_exit(self):
+        """
+        Test that the deferred changes are written when the process
+        exits, even when it is interrupted.
+        """
+        script = (
+            "from models.user import User; "
+            "user = User(); "
+            "user.save(); "
+            "print(user.id); "
+            "raise KeyboardInterrupt"
+            )
+        # The child process writes with the default settings too
+        environment = {name: value for name, value in os.environ.items()
+                       if not name.startswith(("HBNB_STORAGE_", "HBNB_COMMIT_",
+                                               "HBNB_JOURNAL_",
+                                               "HBNB_RELOAD_"))}
+        environment["HBNB_COMMIT_DELAY_MS"] = "60000"
+        result = subprocess.run([sys.executable, "-c", script],
+                                env=environment, capture_output=True,
+                                text=True)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("User." + result.stdout.strip(), self.saved_keys())
+
+    def test_threads(self):
+        """
+        Test sharing a threadsafe storage between threads.
+        """
+        shared = FileStorage(threadsafe=True)
+        count = shared.count(User)
+        errors = []
+
+        def work():
+            """
+            Creates and saves users while reading the others.
+            """
+            try:
+                for i in range(25):
+                    user = User()
+                    user.first_name = str(i)
+                    user.save()
+                    for obj in shared.all().values():
+                        str(obj)
+                    self.assertIs(shared.get(User, user.id), user)
+                    self.assertIn("User." + user.id,
+                                  shared.find(User, first_name=str(i)))
+            except Exception as error:
+                errors.append(error)
+
+        with patch("models.base_model.storage", shared):
+            threads = [threading.Thread(target=work) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(shared.count(User), count + 200)
+        self.assertEqual(len({key for key in self.saved_keys()
+                              if key.startswith("User.")}), count + 200)
+        with self.assertRaises(ValueError):
+            FileStorage(lazy=True, threadsafe=True)
+
+    def test_background(self):
+        """
+        Test writing the changes from a flusher thread.
+        """
+        shared = FileStorage(background=True, commit_delay=0.05)
+        self.addCleanup(shared.close)
+        self.assertTrue(shared.threadsafe)
+        with patch("models.base_model.storage", shared):
+            users = [User() for _ in range(3)]
+            for user in users:
+                user.save()
+            keys = {"User." + user.id for user in users}
+            self.assertFalse(keys & self.saved_keys())
+            time.sleep(0.3)
+            self.assertLessEqual(keys, self.saved_keys())
+            self.assertFalse(shared.dirty)
+
+            user = User()
+            user.save()
+            shared.close()
+            self.assertIn("User." + user.id, self.saved_keys())
+
+            shared.commit_delay = 0
+            with patch.object(shared, "_write",
+                              side_effect=OSError("disk full")):
+                user.save()
+                time.sleep(0.1)
+                with self.assertRaisesRegex(OSError, "disk full"):
+                    user.save()
+            user.first_name = "Betty"
+            user.save()
+            shared.close()
+        with open("file.json", encoding="utf-8") as file:
+            self.assertEqual(
+                    json.load(file)["User." + user.id]["first_name"],
+                    "Betty")
+
+    def test_journal_append(self):
+        """
+        Test that journal mode appends records.
+        """
+        storage.journal = True
+        model = BaseModel()
+        model.save()
+        model.name = "Betty"
+        model.save()
+        with open(storage.journal_path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[-1][0], "BaseModel." + model.id)
+        self.assertEqual(records[-1][1]["name"], "Betty")
+
+    def test_journal_replay(self):
+        """
+        Test replaying the journal on reload.
+        """
+        storage.journal = True
+        kept = BaseModel()
+        kept.save()
+        gone = BaseModel()
+        gone.save()
+        storage.delete(gone)
+        storage.save()
+
+        storage.delete(kept)
+        storage.new(gone)
+        storage.reload()
+        storage.save()  # Flush changes left pending by other tests
+        self.assertIn("BaseModel." + kept.id, storage.all())
+        self.assertNotIn("BaseModel." + gone.id, storage.all())
+
+    def test_journal_compaction(self):
+        """
+        Test folding the journal back into the JSON file.
+        """
+        storage.journal = True
+        storage.compact_threshold = 2
+        first = BaseModel()
+        first.save()
+        self.assertTrue(os.path.exists(storage.journal_path))
+        second = BaseModel()
+        second.save()
+        self.assertFalse(os.path.exists(storage.journal_path))
+        with open("file.json", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertIn("BaseModel." + first.id, data)
+        self.assertIn("BaseModel." + second.id, data)
+
+    def test_journal_torn_record(self):
+        """
+        Test ignoring a torn journal record.
+        """
+        storage.journal = True
+        model = BaseModel()
+        model.save()
+        with open(storage.journal_path, "a", encoding="utf-8") as file:
+            file.write('["BaseModel.torn", {"id": ')
+        storage.reload()
+        storage.save()  # Flush changes left pending by other tests
+        self.assertIn("BaseModel." + model.id, storage.all())
+        with open(storage.journal_path, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 1)
+
+    def test_save_reencodes_dirty_only(self):
+        """
+        Test that save() only re-encodes changed objects.
+        """
+        models = [BaseModel() for _ in range(3)]
+        storage.save()
+        models[1].name = "Changed"
+        storage.save()
+        self.assertEqual(storage.encoded_count, 1)
+        storage.save()
+        self.assertEqual(storage.encoded_count, 0)
+        with open("file.json", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data["BaseModel." + models[1].id]["name"], "Changed")
+        self.assertIn("BaseModel." + models[2].id, data)
+
+    def test_save_reencodes_raw(self):
+        """
+        Test that encoded_count counts the objects not built yet, which
+        are all encoded again by the first save after reload().
+        """
+        storage.lazy = True
+        BaseModel()
+        storage.save()
+        storage.reload()
+        count = storage.count()
+        BaseModel()
+        storage.save()
+        self.assertEqual(storage.encoded_count, count + 1)
+        BaseModel()
+        storage.save()
+        self.assertEqual(storage.encoded_count, 1)
+
+    def test_touch_unstored_object(self):
+        """
+        Test that touching an object outside storage is ignored.
+        """
+        model = BaseModel(id="detached")
+        storage.touch(model)
+        storage.save()
+        self.assertEqual(storage.encoded_count, 0)
+        self.assertNotIn("BaseModel.detached", storage.all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""
+Unittest for the query module (Query Class)
+"""
+import unittest
+from unittest.mock import patch
+from models.engine.query import parse_query
+from models.place import Place
+from models import storage
+
+
+class TestQuery(unittest.TestCase):
+    """
+    Test case class for the console queries.
+
+    Methods:
+        setUp(self): Store a few places.
+        tearDown(self): Remove the places of the test from storage.
+        names(self, line): Returns the names of the places of a query.
+        test_parse(self): Test parsing the parts of a query.
+        test_parse_errors(self): Test rejecting invalid queries.
+        test_where(self): Test filtering with conditions.
+        test_order_limit(self): Test sorting and limiting the rows.
+        test_plan(self): Test that equality conditions use find().
+        test_lazy(self): Test that a limit stops reading candidates.
+        test_format(self): Test showing the selected fields.
+    """
+    def setUp(self):
+        """
+        Store a few places.
+        """
+        self.places = []
+        for name, city, price in (("q-a", "query-1", 100),
+                                  ("q-b", "query-1", 300),
+                                  ("q-c", "query-2", 200),
+                                  ("q-d", "query-2", None)):
+            place = Place()
+            place.name = name
+            place.city_id = city
+            if price is not None:
+                place.price_by_night = price
+            place.save()
+            self.places.append(place)
+
+    def tearDown(self):
+        """
+        Remove the places of the test from storage.
+        """
+        for place in self.places:
+            storage.delete(place)
+        storage.save()
+
+    def names(self, line):
+        """
+        Returns the names of the places returned by the query line,
+        among the places of the test.
+        """
+        return [place.name for place in
+                parse_query(line).run(storage, Place)
+                if place.name.startswith("q-")]
+
+    def test_parse(self):
+        """
+        Test parsing the parts of a query.
+        """
+        query = parse_query(
+                'Place.where(city_id == "c", price_by_night >= -1)'
+                '.order_by(-name).limit(3).select(name, "city_id")')
+        self.assertEqual(query.class_name, "Place")
+        self.assertEqual(query.where, [("city_id", "==", "c"),
+                                       ("price_by_night", ">=", -1)])
+        self.assertEqual(query.order, ("name", True))
+        self.assertEqual(query.limit, 3)
+        self.assertEqual(query.fields, ["name", "city_id"])
+        self.assertIsNone(parse_query("Place.limit(1)").order)
+
+    def test_parse_errors(self):
+        """
+        Test rejecting invalid queries.
+        """
+        for line, message in (
+                ("Place.where(", "invalid query syntax"),
+                ("Place.where(a < b)", "literal values"),
+                ("Place.where(1 < a < 2)", "conditions like"),
+                ("Place.where(a == 1).count()", "unknown query part"),
+                ("Place.limit(-1)", "number of rows"),
+                ("Place.limit(1, 2)", "number of rows"),
+                ("Place.order_by(a, b)", "one field"),
+                ("Place.select(1)", "field names"),
+                ("Place", "invalid query syntax")):
+            with self.subTest(line=line):
+                with self.assertRaisesRegex(ValueError, message):
+                    parse_query(line)
+
+    def test_where(self):
+        """
+        Test filtering with conditions.
+        """
+        self.assertEqual(
+                sorted(self.names('Place.where(city_id == "query-1")')),
+                ["q-a", "q-b"])
+        self.assertEqual(
+                sorted(self.names('Place.where(city_id == "query-2", '
+                                  'price_by_night > "150")')),
+                ["q-c"])
+        self.assertEqual(
+                sorted(self.names('Place.where(name != "q-a", '
+                                  'name < "q-c")')),
+                ["q-b"])
+        with self.assertRaisesRegex(ValueError, "expected int"):
+            self.names("Place.where(price_by_night > 'x')")
+
+    def test_order_limit(self):
+        """
+        Test sorting and limiting the rows.
+        """
+        line = 'Place.where(name >= "q-", name < "q-z")'
+        self.assertEqual(self.names(line + ".order_by(price_by_night)"),
+                         ["q-d", "q-a", "q-c", "q-b"])
+        self.assertEqual(self.names(line + ".order_by(-price_by_night)"),
+                         ["q-b", "q-c", "q-a", "q-d"])
+        self.assertEqual(
+                self.names(line + ".order_by(-name).limit(2)"),
+                ["q-d", "q-c"])
+        self.assertEqual(self.names(line + ".order_by(name).limit(0)"), [])
+        self.assertEqual(len(self.names(line + ".limit(3)")), 3)
+        self.places[0].rank = 2
+        self.places[2].rank = 1
+        for order in ("rank", "-rank"):
+            with self.subTest(order=order):
+                names = self.names(line + ".order_by({})".format(order))
+                self.assertEqual(names[:2], ["q-c", "q-a"] if order == "rank"
+                                 else ["q-a", "q-c"])
+                self.assertEqual(sorted(names[2:]), ["q-b", "q-d"])
+                self.assertEqual(
+                        self.names(line + ".order_by({}).limit(3)".format(
+                            order)),
+                        names[:3])
+
+    def test_plan(self):
+        """
+        Test that equality conditions use find().
+        """
+        with patch.object(storage, "find", wraps=storage.find) as find:
+            self.names('Place.where(city_id == "query-1", '
+                       'city_id == "query-2", price_by_night > 0)')
+            find.assert_called_once_with(Place, city_id="query-1")
+        self.assertEqual(
+                self.names('Place.where(city_id == "query-1", '
+                           'city_id == "query-2")'),
+                [])
+
+    def test_lazy(self):
+        """
+        Test that a limit stops reading candidates.
+        """
+        read = []
+
+        def candidates(cls):
+            """
+            Returns the places of the test, recording those read.
+            """
+            for place in self.places:
+                read.append(place)
+                yield place
+
+        with patch.object(storage, "all") as all_objects:
+            all_objects.return_value.values = lambda: candidates(Place)
+            rows = parse_query("Place.limit(2)").run(storage, Place)
+            self.assertEqual(read, [])
+            self.assertEqual(list(rows), self.places[:2])
+            self.assertEqual(read, self.places[:2])
+
+    def test_format(self):
+        """
+        Test showing the selected fields.
+        """
+        place = self.places[0]
+        self.assertEqual(parse_query("Place.limit(1)").format(place),
+                         str(place))
+        self.assertEqual(
+                parse_query("Place.select(name, nope)").format(place),
+                "[Place] ({}) {{'name': 'q-a'}}".format(place.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
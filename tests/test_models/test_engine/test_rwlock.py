@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Unittest for the rwlock module (RWLock Class)
+"""
+import threading
+import time
+import unittest
+from models.engine.rwlock import RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """
+    Test case class for the readers-writer lock.
+
+    Methods:
+        start(self, target): Starts a daemon thread running target.
+        test_readers_share(self): Test that threads read at once.
+        test_writer_excludes(self): Test that a writer waits for readers
+                                    and blocks them.
+        test_writer_first(self): Test that waiting writers go before new
+                                 readers.
+        test_reentrant(self): Test taking the lock again in one thread.
+    """
+    def start(self, target):
+        """
+        Starts a daemon thread running target and returns it.
+        """
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_share(self):
+        """
+        Test that threads read at once.
+        """
+        lock = RWLock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            """
+            Waits for the other readers while reading.
+            """
+            with lock.reading():
+                barrier.wait()
+
+        threads = [self.start(read) for _ in range(2)]
+        with lock.reading():
+            barrier.wait()
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+    def test_writer_excludes(self):
+        """
+        Test that a writer waits for readers and blocks them.
+        """
+        lock = RWLock()
+        events = []
+        reading = threading.Event()
+
+        def write():
+            """
+            Writes once the main thread is reading.
+            """
+            reading.wait(5)
+            with lock.writing():
+                events.append("write")
+                time.sleep(0.05)
+                events.append("written")
+
+        writer = self.start(write)
+        with lock.reading():
+            reading.set()
+            time.sleep(0.05)
+            events.append("read")
+        time.sleep(0.01)
+        with lock.reading():
+            events.append("read again")
+        writer.join(5)
+        self.assertEqual(events, ["read", "write", "written", "read again"])
+
+    def test_writer_first(self):
+        """
+        Test that waiting writers go before new readers.
+        """
+        lock = RWLock()
+        events = []
+
+        def write():
+            """
+            Writes after the main thread.
+            """
+            with lock.writing():
+                events.append("write")
+
+        def read():
+            """
+            Reads after the writers.
+            """
+            with lock.reading():
+                events.append("read")
+
+        with lock.writing():
+            writer = self.start(write)
+            time.sleep(0.05)
+            reader = self.start(read)
+            time.sleep(0.05)
+        writer.join(5)
+        reader.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        """
+        Test taking the lock again in one thread.
+        """
+        lock = RWLock()
+        with lock.writing():
+            with lock.writing(), lock.reading():
+                pass
+        with lock.reading():
+            with lock.reading():
+                pass
+            with self.assertRaises(RuntimeError):
+                with lock.writing():
+                    pass
+        with lock.writing():
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
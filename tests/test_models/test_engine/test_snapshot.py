@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+"""
+Unittest for the snapshot module (compiled snapshot files)
+"""
+import unittest
+import os
+import json
+import tempfile
+from io import BytesIO
+from models.engine.snapshot import write, Snapshot, SnapshotView
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test case class for compiled snapshots.
+
+    Methods:
+        setUp(self): Write a snapshot before each test.
+        test_classes(self): Test the per-class table.
+        test_find(self): Test looking keys up.
+        test_items(self): Test reading every record.
+        test_open(self): Test memory-mapping a snapshot file.
+        test_view(self): Test reading and changing a class view.
+    """
+    header = b"TEST"
+    records = {
+        "User.b": {"id": "b"},
+        "Place.1": {"id": "1", "name": "Loft"},
+        "User.a": {"id": "a", "email": "é@x"},
+        "User.c": {"id": "c"},
+    }
+
+    def setUp(self):
+        """
+        Write a snapshot before each test.
+        """
+        file = BytesIO()
+        write(file, self.header, (
+            (key, json.dumps(value).encode('utf-8'))
+            for key, value in self.records.items()
+            ))
+        self.data = file.getvalue()
+        self.snapshot = Snapshot(self.data, len(self.header))
+
+    def test_classes(self):
+        """
+        Test the per-class table.
+        """
+        self.assertEqual(self.snapshot.classes, {"Place": (0, 1),
+                                                 "User": (1, 3)})
+        self.assertEqual(len(self.snapshot), 4)
+
+    def test_find(self):
+        """
+        Test looking keys up.
+        """
+        for key in self.records:
+            position = self.snapshot.find(key)
+            self.assertEqual(self.snapshot.key_at(position), key)
+            self.assertEqual(json.loads(self.snapshot.value_at(position)),
+                             self.records[key])
+        self.assertIsNone(self.snapshot.find("User.d"))
+        self.assertIsNone(self.snapshot.find("Place.b"))
+        self.assertIsNone(self.snapshot.find("City.1"))
+
+    def test_items(self):
+        """
+        Test reading every record.
+        """
+        self.assertEqual(
+                [key for key, _ in self.snapshot.items()],
+                ["Place.1", "User.a", "User.b", "User.c"])
+
+    def test_open(self):
+        """
+        Test memory-mapping a snapshot file.
+        """
+        descriptor, path = tempfile.mkstemp()
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(self.data)
+        try:
+            snapshot = Snapshot.open(path, len(self.header))
+            self.assertEqual(snapshot.classes, self.snapshot.classes)
+            self.assertEqual(json.loads(snapshot.value_at(
+                snapshot.find("User.a"))), self.records["User.a"])
+        finally:
+            os.remove(path)
+
+    def test_view(self):
+        """
+        Test reading and changing a class view.
+        """
+        view = SnapshotView(self.snapshot, "User", json.loads)
+        self.assertEqual(len(view), 3)
+        self.assertIn("User.a", view)
+        self.assertNotIn("Place.1", view)
+        self.assertEqual(view["User.a"], self.records["User.a"])
+        self.assertEqual(view.pop("User.b"), self.records["User.b"])
+        self.assertNotIn("User.b", view)
+        view["User.c"] = {"id": "c", "name": "new"}
+        view["User.d"] = {"id": "d"}
+        self.assertEqual(len(view), 3)
+        self.assertEqual(dict(view.items()), {
+            "User.a": self.records["User.a"],
+            "User.c": {"id": "c", "name": "new"},
+            "User.d": {"id": "d"},
+            })
+        self.assertEqual(list(view.fragments()), [
+            ("User.a", json.dumps(self.records["User.a"]).encode('utf-8')),
+            ("User.c", None),
+            ("User.d", None),
+            ])
+        del view["User.d"]
+        with self.assertRaises(KeyError):
+            del view["User.d"]
+        self.assertEqual(list(view), ["User.a", "User.c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Unittest for the timestamps module (timestamp codec)
+"""
+import unittest
+from datetime import datetime
+from models.engine.timestamps import parse_datetime, format_datetime
+
+
+class TestTimestamps(unittest.TestCase):
+    """
+    Test case class for the timestamp codec.
+
+    Methods:
+        test_round_trip(self): Test encoding then decoding a datetime.
+        test_strptime_format(self): Test decoding the format historically
+                                    parsed with strptime.
+        test_without_microseconds(self): Test decoding a timestamp whose
+                                         microsecond is 0.
+    """
+    def test_round_trip(self):
+        """
+        Test encoding then decoding a datetime.
+        """
+        now = datetime.now()
+        self.assertEqual(parse_datetime(format_datetime(now)), now)
+
+    def test_strptime_format(self):
+        """
+        Test decoding the format historically parsed with strptime.
+        """
+        value = "2017-09-28T21:05:54.119427"
+        self.assertEqual(
+                parse_datetime(value),
+                datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
+                )
+
+    def test_without_microseconds(self):
+        """
+        Test decoding a timestamp whose microsecond is 0.
+        """
+        value = datetime(2017, 9, 28, 21, 5, 54)
+        self.assertEqual(parse_datetime(format_datetime(value)), value)
+
+
+if __name__ == "__main__":
+    unittest.main()
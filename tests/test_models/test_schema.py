@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Unittest for the schema module (field types and coercers)
+"""
+import unittest
+from models import schema
+from models.base_model import BaseModel
+from models.place import Place
+from models.user import User
+
+
+class TestSchema(unittest.TestCase):
+    """
+    Test case class for the field types and coercers of the models.
+
+    Methods:
+        test_coercers(self): Test converting values to each type.
+        test_invalid_values(self): Test rejecting values of another type.
+        test_field_types(self): Test the types declared by the models.
+        test_coerce(self): Test coercing through a model class.
+    """
+    def test_coercers(self):
+        """
+        Test converting values to each type.
+        """
+        for kind, value, expected in (
+                (int, "3", 3), (int, 3, 3), (int, 4.0, 4),
+                (float, "1.5", 1.5), (float, 2, 2.0), (float, 2.5, 2.5),
+                (str, "Loft", "Loft"),
+                (list, '["a"]', ["a"]), (list, ["a"], ["a"]),
+                (dict, '{"a": 1}', {"a": 1})):
+            with self.subTest(kind=kind, value=value):
+                result = schema.COERCERS[kind](value)
+                self.assertEqual(result, expected)
+                self.assertIs(type(result), kind)
+
+    def test_invalid_values(self):
+        """
+        Test rejecting values of another type.
+        """
+        for kind, value in ((int, "x"), (int, True), (int, 1.5),
+                            (float, "x"), (str, 3), (list, "{}"),
+                            (list, "["), (dict, None)):
+            with self.subTest(kind=kind, value=value):
+                with self.assertRaisesRegex(ValueError, "expected"):
+                    schema.COERCERS[kind](value)
+
+    def test_field_types(self):
+        """
+        Test the types declared by the models.
+        """
+        self.assertEqual(BaseModel.field_types(), {})
+        types = Place.field_types()
+        self.assertIs(types["number_rooms"], int)
+        self.assertIs(types["latitude"], float)
+        self.assertIs(types["amenity_ids"], list)
+        self.assertIs(types["city_id"], str)
+        self.assertEqual(set(User.field_types()), set(User.declared_fields()))
+
+    def test_coerce(self):
+        """
+        Test coercing through a model class.
+        """
+        self.assertEqual(Place.coerce("number_rooms", "3"), 3)
+        self.assertEqual(Place.coerce("latitude", "1.5"), 1.5)
+        self.assertEqual(Place.coerce("pets", "yes"), "yes")
+        with self.assertRaisesRegex(ValueError, "^max_guest: expected int"):
+            Place.coerce("max_guest", "many")
+
+
+if __name__ == "__main__":
+    unittest.main()
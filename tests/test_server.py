@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""
+Unittest module for the network server
+"""
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+from models import storage
+from models.user import User
+from server import HBNBServer
+
+
+class TestHBNBServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Test case class for the network server.
+
+    Methods:
+        asyncSetUp(self): Starts a server on a free port.
+        asyncTearDown(self): Stops the server and removes the JSON file.
+        connect(self): Opens a client connection.
+        run_command(self, client, line): Sends a command and returns its
+                                         output.
+        test_shared_storage(self): Test that clients share the objects.
+        test_writer(self): Test that the changes are written at once.
+        test_quit(self): Test that quit closes the connection.
+        test_no_files(self): Test that clients cannot import or export
+                             files.
+    """
+    async def asyncSetUp(self):
+        """
+        Starts a server on a free port.
+        """
+        storage.reload()
+        self.server = HBNBServer(interval=0.01)
+        self.listener = await self.server.start("127.0.0.1", 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.writers = []
+
+    async def asyncTearDown(self):
+        """
+        Stops the server and removes the JSON file.
+        """
+        for writer in self.writers:
+            writer.close()
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.close()
+        try:
+            os.remove("file.json")
+        except FileNotFoundError:
+            pass
+
+    async def connect(self):
+        """
+        Opens a client connection and returns its reader and writer.
+        """
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writers.append(writer)
+        await reader.readuntil(HBNBServer.prompt.encode())
+        return reader, writer
+
+    async def run_command(self, client, line):
+        """
+        Sends line from client and returns the output of the command.
+        """
+        reader, writer = client
+        writer.write(line.encode() + b"\n")
+        output = await reader.readuntil(HBNBServer.prompt.encode())
+        return output[:-len(HBNBServer.prompt)].decode().strip()
+
+    async def test_shared_storage(self):
+        """
+        Test that clients share the objects.
+        """
+        first, second = await self.connect(), await self.connect()
+        user_id = await self.run_command(first, "create User")
+        await self.run_command(
+                first, 'User.update("{}", "first_name", "Ada")'.format(
+                    user_id))
+        self.assertIn("'first_name': 'Ada'", await self.run_command(
+            second, "show User {}".format(user_id)))
+        self.assertEqual(
+                await self.run_command(second, "show Nope 1"),
+                "** class doesn't exist **")
+        self.assertEqual(
+                await self.run_command(second, "begin"),
+                "** batches are not available on the server **")
+        self.assertEqual(self.server.clients, 2)
+        await self.run_command(second, "destroy User {}".format(user_id))
+
+    async def test_writer(self):
+        """
+        Test that the changes of several commands are written at once.
+        """
+        client = await self.connect()
+        self.server.interval = 0.2
+        with patch.object(storage, "flush", wraps=storage.flush) as flush:
+            ids = [await self.run_command(client, "create User")
+                   for _ in range(3)]
+            self.assertEqual(flush.call_count, 0)
+            self.assertTrue(storage.dirty)
+            await asyncio.sleep(0.4)
+            self.assertEqual(flush.call_count, 1)
+            self.assertFalse(storage.dirty)
+            await self.run_command(client, "show User {}".format(ids[0]))
+            await asyncio.sleep(0.4)
+            self.assertEqual(flush.call_count, 1)
+        for user_id in ids:
+            storage.delete(storage.get(User, user_id))
+
+    async def test_quit(self):
+        """
+        Test that quit closes the connection.
+        """
+        reader, writer = await self.connect()
+        writer.write(b"quit\n")
+        self.assertEqual(await reader.read(), b"")
+        await asyncio.sleep(0)
+        self.assertEqual(self.server.clients, 0)
+
+    async def test_no_files(self):
+        """
+        Test that clients cannot import or export files of the server.
+        """
+        client = await self.connect()
+        for line in ("export User exported.json",
+                     "import User file.json ndjson"):
+            with self.subTest(line=line):
+                self.assertEqual(
+                        await self.run_command(client, line),
+                        "** import and export are not available on the "
+                        "server **")
+        self.assertFalse(os.path.exists("exported.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()